@@ -19,13 +19,19 @@ This file, and the template folder, are the main ways to customize PyPlate.
 # ------------------------------------------------------------------------------
 
 # system imports
+from concurrent.futures import ThreadPoolExecutor, wait
 from datetime import datetime
 import gettext
+import hashlib
 import locale
-from pathlib import Path
+import os
+from pathlib import Path, PurePosixPath
 import re
 import shutil
+import subprocess
 import sys
+import tempfile
+import threading
 
 # venv imports
 from cnlib import cnfunctions as F  # type: ignore
@@ -70,6 +76,35 @@ B_DEBUG = False
 # global error flag
 B_ERROR = False
 
+# ------------------------------------------------------------------------------
+# Counters
+# ------------------------------------------------------------------------------
+
+# global counts of files written/skipped by PP.write_if_changed
+I_FILES_WRITTEN = 0
+I_FILES_SKIPPED = 0
+# global counts of files/lines read by the fixers, and lines that needed work
+I_FILES_SCANNED = 0
+I_LINES_SCANNED = 0
+I_LINES_TOUCHED = 0
+# NB: files may be written/fixed from more than one thread
+LOCK_WRITE = threading.Lock()
+
+# ------------------------------------------------------------------------------
+# Objects
+# ------------------------------------------------------------------------------
+
+# global index of project dirs/files (see PP.make_index/PP.get_index)
+INDEX_PRJ = None
+
+# global timings for --profile (see PP.PyPlateProfile/PP.profile)
+# NB: None if not profiling
+PROF = None
+
+# actions started in the background and not shown yet (see _action_start)
+# NB: each item is ((key, msg, action_func, quit), future)
+L_ACT_BG = []
+
 # ------------------------------------------------------------------------------
 # ------------------------------------------------------------------------------
 # Start customization
@@ -84,6 +119,31 @@ B_ERROR = False
 I_LOG_SIZE = 2097152  # max log file size in bytes (2 Mb)
 I_LOG_COUNT = 5  # max number of log files
 
+# files bigger than this are fixed line by line, instead of read into memory
+I_STREAM_SIZE = 8388608  # in bytes (8 Mb)
+
+# how many bytes to read when checking if a file is binary
+I_BIN_SNIFF = 8192
+
+# default number of workers for fixing file contents (1 = no pool)
+I_JOBS_DEF = 1
+
+# number of workers for copying template files
+I_COPY_JOBS = 8
+
+# number of workers for running actions (see D_ACT_IO)
+I_ACT_JOBS = 4
+
+# number of workers for compressing dist (if the codec can use them)
+I_DIST_JOBS = 4
+
+# size of each block for the parallel gzip codec (see PP.PyPlateGzip)
+I_DIST_BLOCK = 131072  # in bytes (128 Kb)
+
+# mtime of all files in the dist archive, so it is the same every time
+# NB: SOURCE_DATE_EPOCH in the env wins, if set (see PP.get_archive_mtime)
+I_DIST_MTIME = 0
+
 # ------------------------------------------------------------------------------
 # Strings
 # ------------------------------------------------------------------------------
@@ -181,6 +241,9 @@ S_ERR_PRJ_DIR_IS_PP = _("Cannot run pymaker in PyPlate dir")
 # NB: format params are S_FILE_DSK_TMP and __PP_FILE_DESK__
 # I18N: we want i18n but the template desktop doesn't exist
 S_ERR_DESK_NO_TEMP = _("Warning: file '{}' does not exist, using '{}'")
+# NB: format param is S_DIST_MODE
+# I18N: dist archive codec is not known or its module is not installed
+S_ERR_CODEC = _("Archive codec '{}' is not available")
 # NB: format param is item in L_CATS
 # I18N: invalid desktop category
 S_ERR_DESK_CAT = _(
@@ -236,6 +299,17 @@ S_CMD_GIT_CREATE = "cd {}; git init -q"
 S_CMD_VENV_INST_SELF = "cd {};. {}/bin/activate;python -m pip install -e ."
 # NB: format params are prj dir, venv name, and reqs file
 S_CMD_VENV_INST_REQS = "cd {};. {}/bin/activate;python -m pip install -r {}"
+# NB: format params are prj dir, venv name, reqs file, and wheel dir
+S_CMD_VENV_WHEEL = "cd {};. {}/bin/activate;python -m pip wheel -r {} -w {}"
+S_CMD_VENV_INST_WHEEL = (
+    "cd {};. {}/bin/activate;"
+    "python -m pip install --no-index -r {} --find-links {}"
+)
+# python code to get the tags of wheels a venv can use (see _get_wheel_dir)
+S_PY_WHEEL_TAG = (
+    "import sys, sysconfig; "
+    "print(sys.implementation.cache_tag, sysconfig.get_platform())"
+)
 # mkdocs commands
 S_CMD_DOC_DEPLOY = "mkdocs gh-deploy"
 
@@ -339,6 +413,25 @@ S_KEY_ACT_DOCS_DEPLOY = "ACT_DEPLOY_DOCS"
 S_KEY_ACT_COMPRESS = "ACT_COMPRESS"
 S_KEY_ACT_REM_DIST = "ACT_REM_DIST"
 
+# the things actions read/write, for D_ACT_IO
+S_RES_ALL = "*"
+S_RES_VENV = "venv"
+S_RES_REQS = "reqs"
+S_RES_GIT = "git"
+S_RES_INST = "inst"
+S_RES_SRC = "src"
+S_RES_I18N = "i18n"
+S_RES_DOCS = "docs"
+S_RES_SITE = "site"
+S_RES_TREE = "tree"
+S_RES_INDEX = "index"
+S_RES_DIST = "dist"
+
+# keys for dist hash file (see S_FILE_DIST_HASH)
+S_KEY_DIST_HASH = "DIST_HASH"
+S_KEY_DIST_SIZE = "DIST_SIZE"
+S_KEY_DIST_FILES = "DIST_FILES"
+
 # keys for D_PUB_DOCS
 S_KEY_DOCS_THEME = "DOCS_THEME"
 S_KEY_DOCS_USE_RM = "DOCS_USE_RM"
@@ -363,11 +456,50 @@ S_KEY_LEAD = "S_KEY_GRP_LEAD"
 S_KEY_VAL = "S_KEY_GRP_VAL"
 S_KEY_CAPTION_PAD = "S_KEY_GRP_PAD"
 S_KEY_SW_SCH = "S_KEY_SW_SCH"
+# NB: added by PP.get_type_rules (case-insensitive S_KEY_SW_SCH)
+S_KEY_SW_SCH_I = "S_KEY_SW_SCH_I"
 S_KEY_SW_KEY = "S_KEY_SW_KEY"
 S_KEY_SW_VAL = "S_KEY_SW_VAL"
 S_KEY_SPLIT = "S_KEY_SPLIT"
 S_KEY_SPLIT_COMM = "S_KEY_SPLIT_COMM"
 
+# keys for manifest (last fix state of each file, see S_FILE_MANIFEST)
+S_KEY_MAN_MTIME = "MTIME"
+S_KEY_MAN_SIZE = "SIZE"
+S_KEY_MAN_HASH = "HASH"
+S_KEY_MAN_REPS = "REPS"
+
+# keys for template packs (see PP.PyPlatePack)
+S_KEY_PACK_FP = "FINGERPRINT"
+S_KEY_PACK_FILES = "FILES"
+S_KEY_PACK_OFFSET = "OFFSET"
+S_KEY_PACK_SIZE = "SIZE"
+S_KEY_PACK_MODE = "MODE"
+S_KEY_PACK_MTIME = "MTIME"
+S_KEY_PACK_HASH = "HASH"
+S_KEY_PACK_BIN = "BIN"
+
+# keys for --profile groups (see PP.PyPlateProfile)
+S_KEY_PROF_PHASE = "PHASE"
+S_KEY_PROF_ACTION = "ACTION"
+S_KEY_PROF_LIB = "LIB"
+S_KEY_PROF_TYPE = "TYPE"
+
+# keys for --profile rows
+S_KEY_PROF_CALLS = "CALLS"
+S_KEY_PROF_WALL = "WALL"
+S_KEY_PROF_CPU = "CPU"
+S_KEY_PROF_READ = "READ"
+S_KEY_PROF_WRITE = "WRITE"
+S_KEY_PROF_SCANNED = "SCANNED"
+S_KEY_PROF_WRITTEN = "WRITTEN"
+
+# keys for pymaker --batch file (list of projects, or dict w/ list)
+S_KEY_BATCH_PRJS = "projects"
+S_KEY_BATCH_NAME = "name"
+S_KEY_BATCH_TYPE = "type"
+S_KEY_BATCH_SEC = "name_sec"
+
 # constants for _check_name()
 S_KEY_NAME_START = "S_KEY_NAME_START"
 S_KEY_NAME_END = "S_KEY_NAME_END"
@@ -450,6 +582,9 @@ S_TREE_FILE_FORMAT = " [] $NAME"
 S_SW_ENABLE = "enable"
 S_SW_DISABLE = "disable"
 S_SW_REPLACE = "replace"
+# NB: must be in every S_KEY_SW_SCH in D_TYPE_RULES (lines without it are not
+# checked for switches)
+S_SW_MARKER = "pyplate"
 
 # path to prj pyplate files, relative to prj dir
 # NB: leave as string, no start dir yet
@@ -458,6 +593,24 @@ S_PRJ_PUB_CFG = f"{S_PRJ_PP_DIR}/project.json"
 S_PRJ_PRV_DIR = f"{S_PRJ_PP_DIR}/private"
 S_PRJ_PRV_CFG = f"{S_PRJ_PRV_DIR}/private.json"
 
+# name of template pack in cache dir (see PP.PyPlatePack)
+# NB: format params are long prj type and hash of pyplate dir
+S_PACK_FMT = "{}-{}.pack"
+
+# dir of project caches in cache dir, one subdir per hash of prj path
+# NB: for files that should not be in the project (see PP.get_cache_dir)
+S_DIR_PRJ_CACHE = "projects"
+S_FILE_MANIFEST = "manifest.json"
+S_FILE_DIST_HASH = "dist.json"
+
+# dir of wheel caches in cache dir, one subdir per hash of reqs and python
+# NB: only used by _action_reqs, where many projects have the same reqs
+S_DIR_WHEELS = "wheels"
+
+# reqs with one of these are pinned to one version, and can use the wheel
+# cache (see _get_wheel_dir)
+L_REQS_PINNED = ["==", " @ "]
+
 # ------------------------------------------------------------------------------
 # gui stuff
 
@@ -587,6 +740,8 @@ S_THEME_REP = r"\g<1> {}"
 
 S_WLANG = "en"
 S_ENCODING = "UTF-8"
+# codec for dist archive (see PP.D_ARC_CODECS)
+# NB: gztar, pgztar (parallel gzip), xztar, or zsttar (if there is zstd)
 S_DIST_MODE = "gztar"
 # I18N: default date format
 S_DATE_FMT = _("%m/%d/%Y")
@@ -715,6 +870,10 @@ L_PURGE_DIST = [
 # skip placeholder files in these dirs
 L_PH_SKIP = [S_DIR_GIT, ".venv*"]
 
+# never walk these dirs when indexing the project (see PP.PyPlateIndex)
+# NB: nothing reads them, and pip may be writing to the venv (see L_ACT_BG)
+L_INDEX_SKIP = [S_DIR_GIT, ".venv*"]
+
 # remove exts from bin files
 L_DIST_REMOVE_EXT = [f"{S_DIR_ASSETS}/{S_DIR_BIN}/*.py"]
 
@@ -1153,6 +1312,38 @@ D_PUB_ACT = {
 # Other dictionaries
 # ------------------------------------------------------------------------------
 
+# what each action reads and writes
+# NB: key is action key, val is (inputs, outputs)
+# actions in the same hook run at the same time, unless one writes something
+# the other reads or writes, in which case they run in hook order
+# S_RES_ALL means everything in the project, an action that is not here is
+# treated as ([S_RES_ALL], [S_RES_ALL])
+D_ACT_IO = {
+    S_KEY_ACT_VENV: ([], [S_RES_VENV]),
+    S_KEY_ACT_REQS: ([S_RES_VENV, S_RES_REQS], [S_RES_VENV]),
+    S_KEY_ACT_GIT: ([], [S_RES_GIT]),
+    S_KEY_ACT_INST: ([], [S_RES_INST]),
+    S_KEY_ACT_PURGE: ([], [S_RES_SRC, S_RES_INST, S_RES_REQS, S_RES_I18N]),
+    S_KEY_ACT_I18N: ([S_RES_SRC], [S_RES_I18N]),
+    S_KEY_ACT_META: (
+        [S_RES_SRC, S_RES_I18N, S_RES_INDEX],
+        [S_RES_SRC, S_RES_I18N, S_RES_INST, S_RES_DOCS],
+    ),
+    # NB: placeholders skip .git and .venv (see L_PH_SKIP)
+    S_KEY_ACT_PLACE: (
+        [S_RES_SRC, S_RES_INST, S_RES_I18N, S_RES_DOCS, S_RES_INDEX],
+        [S_RES_SRC, S_RES_INDEX],
+    ),
+    S_KEY_ACT_EDIT: ([S_RES_VENV, S_RES_SRC], [S_RES_VENV, S_RES_SRC]),
+    S_KEY_ACT_DOCS_MAKE: ([S_RES_SRC, S_RES_DOCS], [S_RES_DOCS]),
+    S_KEY_ACT_TREE: ([S_RES_ALL], [S_RES_TREE]),
+    S_KEY_ACT_FREEZE: ([S_RES_VENV], [S_RES_REQS]),
+    S_KEY_ACT_DOCS_BAKE: ([S_RES_DOCS], [S_RES_SITE]),
+    S_KEY_ACT_DOCS_DEPLOY: ([S_RES_DOCS, S_RES_GIT], [S_RES_SITE, S_RES_GIT]),
+    S_KEY_ACT_COMPRESS: ([S_RES_DIST], [S_RES_DIST]),
+    S_KEY_ACT_REM_DIST: ([S_RES_DIST], [S_RES_DIST]),
+}
+
 # dict of files that should be copied from the PyPlate project to the resulting
 # project (outside of the template dir)
 # this is so that when you update a file in the PyPlate project itself (not the
@@ -1449,95 +1640,50 @@ def do_after_template(dir_prj, dict_prv, dict_pub, dict_act):
     # get project type
     prj_type = dict_prv[S_KEY_PRV_PRJ]["__PP_TYPE_PRJ__"]
     # --------------------------------------------------------------------------
-    # create venv
-
-    # call the spinner-wrapped function
-    _res = _action_run(
-        # check for key presence or skip
-        dict_act,  # ok
-        S_KEY_ACT_VENV,  # ok
-        S_ACTION_VENV,  # ok
-        # run action and check for error
-        _action_venv,  # ok
-        dir_prj,  # ok
-        dict_prv,  # ok
-        dict_pub,  # ok
-        # handle error
-        quit=False,
-    )
-
-    # --------------------------------------------------------------------------
-    # install reqs
-
-    # call the spinner-wrapped function
-    _res = _action_run(
-        # check for key presence or skip
-        dict_act,
-        S_KEY_ACT_REQS,
-        S_ACTION_REQS,
-        # run action and check for error
-        _action_reqs,
-        dir_prj,
-        dict_prv,
-        dict_pub,
-        # handle error
-        quit=False,
-    )
+    # make the list of actions
+    # NB: each is (key, msg, func, quit)
+
+    # NB: venv and reqs are slow, and nothing needs them until _action_edit
+    # (see D_ACT_IO), so they run in the background while pymaker fixes the
+    # project and are shown when something needs them
+    list_bg = [
+        # create venv
+        (S_KEY_ACT_VENV, S_ACTION_VENV, _action_venv, False),
+        # install reqs
+        (S_KEY_ACT_REQS, S_ACTION_REQS, _action_reqs, False),
+    ]
 
-    # --------------------------------------------------------------------------
-    # git
-
-    # call the spinner-wrapped function
-    _res = _action_run(
-        # check for key presence or skip
-        dict_act,
-        S_KEY_ACT_GIT,
-        S_ACTION_GIT,
-        # run action and check for error
-        _action_git,
-        dir_prj,
-        dict_prv,
-        dict_pub,
-        # handle error
-        quit=False,
-    )
+    list_steps = [
+        # git
+        (S_KEY_ACT_GIT, S_ACTION_GIT, _action_git, False),
+    ]
 
-    # --------------------------------------------------------------------------
     # inst/uninst
-
-    # fix dict_pub
     if prj_type in D_TYPE_INST:
-        dict_pub[S_KEY_PUB_INST] = dict(D_TYPE_INST[prj_type])
 
-        # call the spinner-wrapped function
-        _res = _action_run(
-            # check for key presence or skip
-            dict_act,
-            S_KEY_ACT_INST,
-            S_ACTION_INST,
-            # run action and check for error
-            _action_inst,
-            dir_prj,
-            dict_prv,
-            dict_pub,
-            # handle error
-            quit=False,
+        # fix dict_pub
+        dict_pub[S_KEY_PUB_INST] = dict(D_TYPE_INST[prj_type])
+        list_steps.append(
+            (S_KEY_ACT_INST, S_ACTION_INST, _action_inst, False)
         )
 
-    # --------------------------------------------------------------------------
     # purge package dirs
     if prj_type in D_PURGE_MAKE:
-        # call the spinner-wrapped function
-        _res = _action_run(
-            dict_act,
-            S_KEY_ACT_PURGE,
-            S_ACTION_PURGE,
-            _action_purge,
-            dir_prj,
-            dict_prv,
-            dict_pub,
+        list_steps.append(
+            (S_KEY_ACT_PURGE, S_ACTION_PURGE, _action_purge, False)
         )
 
+    # --------------------------------------------------------------------------
+    # run the actions
+
+    # start venv and reqs
+    _action_start(dict_act, list_bg, dir_prj, dict_prv, dict_pub)
+
+    # NB: run at the same time where D_ACT_IO allows, don't wait for venv/reqs
+    _res = _action_run_all(
+        dict_act, list_steps, dir_prj, dict_prv, dict_pub, wait_bg=False
+    )
+
     # --------------------------------------------------------------------------
     # do i18n stuff
 
@@ -1700,118 +1846,42 @@ def do_after_fix(dir_prj, dict_prv, dict_pub, dict_act):
     # get project type
     prj_type = dict_prv[S_KEY_PRV_PRJ]["__PP_TYPE_PRJ__"]
 
-    # i18n
-    # NB: needs to be callable from pybaker for -l option
-    # if i18n flag is set
-    # if dict_act[S_KEY_ACT_I18N]:
-    #     _action_i18n(dir_prj, dict_prv, dict_pub)
-    _res = _action_run(
-        # check for key presence or skip
-        dict_act,
-        S_KEY_ACT_I18N,
-        S_ACTION_I18N,
-        # run action and check for error
-        _action_i18n,
-        dir_prj,
-        dict_prv,
-        dict_pub,
-        # handle error
-        quit=False,
-    )
-
-    # meta
-    # _action_meta(dir_prj, dict_prv, dict_pub)
-    _res = _action_run(
-        # check for key presence or skip
-        dict_act,
-        S_KEY_ACT_META,
-        S_ACTION_META,
-        # run action and check for error
-        _action_meta,
-        dir_prj,
-        dict_prv,
-        dict_pub,
-        # handle error
-        quit=False,
-    )
-
-    # add/remove placeholders
-    # _action_placeholders(dir_prj, dict_prv, dict_pub)
-    _res = _action_run(
-        # check for key presence or skip
-        dict_act,
-        S_KEY_ACT_PLACE,
-        S_ACTION_PLACE,
-        # run action and check for error
-        _action_placeholders,
-        dir_prj,
-        dict_prv,
-        dict_pub,
-        # handle error
-        quit=False,
-    )
-
     # --------------------------------------------------------------------------
+    # make the list of actions
+    # NB: each is (key, msg, func, quit)
+
+    list_steps = [
+        # i18n
+        # NB: needs to be callable from pybaker for -l option
+        (S_KEY_ACT_I18N, S_ACTION_I18N, _action_i18n, False),
+        # meta
+        (S_KEY_ACT_META, S_ACTION_META, _action_meta, False),
+        # add/remove placeholders
+        (S_KEY_ACT_PLACE, S_ACTION_PLACE, _action_placeholders, False),
+    ]
+
     # install package in itself
     # if it is the right type (package)
     if prj_type in L_INST_SELF:
-        # _action_edit(dir_prj, dict_prv)
-
-        _res = _action_run(
-            # check for key presence or skip
-            dict_act,
-            S_KEY_ACT_EDIT,
-            S_ACTION_EDIT,
-            # run action and check for error
-            _action_edit,
-            dir_prj,
-            dict_prv,
-            dict_pub,
-            # handle error
-            quit=False,
+        list_steps.append(
+            (S_KEY_ACT_EDIT, S_ACTION_EDIT, _action_edit, False)
         )
 
-    # --------------------------------------------------------------------------
     # docs
-
-    # if docs flag is set
-    # if dict_act[S_KEY_ACT_DOCS_MAKE]:
-    #     _action_make_docs(dir_prj, dict_pub)
-    _res = _action_run(
-        # check for key presence or skip
-        dict_act,
-        S_KEY_ACT_DOCS_MAKE,
-        S_ACTION_MAKE_DOCS,
-        # run action and check for error
-        _action_make_docs,
-        dir_prj,
-        dict_prv,
-        dict_pub,
-        # handle error
-        quit=False,
+    list_steps.append(
+        (S_KEY_ACT_DOCS_MAKE, S_ACTION_MAKE_DOCS, _action_make_docs, False)
     )
 
-    # --------------------------------------------------------------------------
     # tree
     # NB: run last so it includes .git and .venv folders
     # NB: this will wipe out all previous checks (maybe good?)
+    list_steps.append((S_KEY_ACT_TREE, S_ACTION_TREE, _action_tree, False))
 
-    # if tree flag is set
-    # if dict_act[S_KEY_ACT_TREE]:
-    #     _action_tree(dir_prj, dict_pub)
-    _res = _action_run(
-        # check for key presence or skip
-        dict_act,
-        S_KEY_ACT_TREE,
-        S_ACTION_TREE,
-        # run action and check for error
-        _action_tree,
-        dir_prj,
-        dict_prv,
-        dict_pub,
-        # handle error
-        quit=False,
-    )
+    # --------------------------------------------------------------------------
+    # run the actions
+
+    # NB: run at the same time where D_ACT_IO allows
+    _res = _action_run_all(dict_act, list_steps, dir_prj, dict_prv, dict_pub)
 
 
 # ------------------------------------------------------------------------------
@@ -1835,57 +1905,37 @@ def do_before_dist(dir_prj, dict_prv, dict_pub, dict_act):
     prj_type = dict_prv[S_KEY_PRV_PRJ]["__PP_TYPE_PRJ__"]
 
     # --------------------------------------------------------------------------
-    # freeze venv
+    # make the list of actions
+    # NB: each is (key, msg, func, quit)
 
+    list_steps = []
+
+    # freeze venv
     if prj_type in L_APP_INSTALL:
-        #         _action_freeze(dir_prj, dict_prv)
-        _res = _action_run(
-            # check for key presence or skip
-            dict_act,
-            S_KEY_ACT_FREEZE,
-            S_ACTION_FREEZE,
-            # run action and check for error
-            _action_freeze,
-            dir_prj,
-            dict_prv,
-            dict_pub,
-            # handle error
-            quit=False,
+        list_steps.append(
+            (S_KEY_ACT_FREEZE, S_ACTION_FREEZE, _action_freeze, False)
         )
 
-    # --------------------------------------------------------------------------
     # docs bake
+    list_steps.append(
+        (S_KEY_ACT_DOCS_BAKE, S_ACTION_BAKE_DOCS, _action_bake_docs, False)
+    )
 
-    _res = _action_run(
-        # check for key presence or skip
-        dict_act,
-        S_KEY_ACT_DOCS_BAKE,
-        S_ACTION_BAKE_DOCS,
-        # run action and check for error
-        _action_bake_docs,
-        dir_prj,
-        dict_prv,
-        dict_pub,
-        # handle error
-        quit=False,
+    # docs deploy
+    list_steps.append(
+        (
+            S_KEY_ACT_DOCS_DEPLOY,
+            S_ACTION_DEPLOY_DOCS,
+            _action_deploy_docs,
+            False,
+        )
     )
 
     # --------------------------------------------------------------------------
-    # docs deploy
+    # run the actions
 
-    _res = _action_run(
-        # check for key presence or skip
-        dict_act,
-        S_KEY_ACT_DOCS_DEPLOY,
-        S_ACTION_DEPLOY_DOCS,
-        # run action and check for error
-        _action_deploy_docs,
-        dir_prj,
-        dict_prv,
-        dict_pub,
-        # handle error
-        quit=False,
-    )
+    # NB: run at the same time where D_ACT_IO allows
+    _res = _action_run_all(dict_act, list_steps, dir_prj, dict_prv, dict_pub)
 
     # if docs flag is set
     # if dict_act[S_KEY_ACT_DOCS_BAKE]:
@@ -1909,98 +1959,84 @@ def do_after_dist(dir_prj, dict_prv, dict_pub, dict_act):
         settings
 
     Do any work on the dist folder after it is created. This method is called
-    after _do_dist. Currently, this method purges any "ABOUT" file used as
-    placeholders for github syncing. It also tars the source folder if it is a
-    package, making for one (or two) less steps in the user's install process.
+    after _do_dist. Currently, this method compresses the dist folder, making
+    for one (or two) less steps in the user's install process, and removes
+    it. The moves, renames and purges are already done by PyBaker._do_dist
+    (see get_dist_map).
     """
 
-    # get project type
-    prj_type = dict_prv[S_KEY_PRV_PRJ]["__PP_TYPE_PRJ__"]
+    # --------------------------------------------------------------------------
+    # compress dist, then remove it
 
-    # get dist dir for all operations
-    dist = Path(dir_prj) / S_DIR_DIST
-    name_fmt = str(dict_prv[S_KEY_PRV_PRJ]["__PP_FMT_DIST__"])
-    p_dist = dist / name_fmt
+    list_steps = [
+        (S_KEY_ACT_COMPRESS, S_ACTION_COMPRESS, _action_compress, False),
+        (S_KEY_ACT_REM_DIST, S_ACTION_REM_DIST, _action_rem_dist, False),
+    ]
 
-    # --------------------------------------------------------------------------
-    # move some files around between end of dist and start of install
+    # NB: rem_dist waits for compress (see D_ACT_IO)
+    _res = _action_run_all(dict_act, list_steps, dir_prj, dict_prv, dict_pub)
 
-    if prj_type in L_APP_INSTALL:
-        # move install.py to above assets
-        file_inst = p_dist / S_DIR_ASSETS / S_DIR_INSTALL / S_FILE_INST_PY
-        if file_inst.exists():
-            shutil.move(file_inst, p_dist)
 
-        # move uninstall.py to top of assets
-        file_uninst = p_dist / S_DIR_ASSETS / S_DIR_INSTALL / S_FILE_UNINST_PY
-        if file_uninst.exists():
-            dest = p_dist / S_DIR_ASSETS
-            shutil.move(file_uninst, dest)
+# ------------------------------------------------------------------------------
+# Get the layout of the dist folder, without making it
+# ------------------------------------------------------------------------------
+def get_dist_map(dir_prj, dict_prv, dict_pub):
+    """
+    Get the layout of the dist folder, without making it
 
-    # --------------------------------------------------------------------------
-    # remove extensions of some files
+    Args:
+        dir_prj: The root of the project
+        dict_prv: The dictionary containing private pyplate data
+        dict_pub: The dictionary containing public project data
 
-    # glob L_DIST_REMOVE_EXT
-    list_del = []
-    for item in L_DIST_REMOVE_EXT:
-        res = list(p_dist.glob(item))
-        list_del.extend(res)
+    Returns:
+        A list of (arcname, path) for every dir/file in the dist folder, in
+        the same order as PP.list_archive (path is None for dirs that are
+        made, not copied)
+
+    The dist dict is copied into the layout, then the moves, renames and
+    purges in _layout_dist are applied, but the paths are the project's own
+    files. PyBaker syncs the dist folder to this layout, or when the dist
+    folder would only be compressed and removed, the archive is made straight
+    from it.
+    """
+
+    # get project type
+    prj_type = dict_prv[S_KEY_PRV_PRJ]["__PP_TYPE_PRJ__"]
+    dir_prj = Path(dir_prj)
 
-    # rename stuff
-    for item in list_del:
-        if item.is_file():
-            item.rename(Path(item.parent, item.stem))
+    # the layout, by path rel to dist folder
+    dict_map = {".": None}
 
     # --------------------------------------------------------------------------
-    # remove unnecessary files from dist
+    # copy dist dict
+
+    for key, val in dict_pub[S_KEY_PUB_DIST].items():
 
-    lst_del = []
-    for item in L_PURGE_DIST:
-        res = list(p_dist.glob(item))
-        lst_del.extend(res)
+        # get src/dst rel to prj dir/dist dir
+        src = dir_prj / key
+        dst = PurePosixPath(str(val))
+        _map_dirs(dict_map, dst)
+        dst = dst / src.name
 
-    for item in lst_del:
-        if item.is_dir():
-            shutil.rmtree(item)
-        elif item.is_file():
-            item.unlink()
+        # add the src
+        if src.is_dir():
+            _map_tree(dict_map, src, dst)
+        elif src.is_file():
+            dict_map[str(dst)] = src
 
     # --------------------------------------------------------------------------
-    # compress dist
-
-    _res = _action_run(
-        # check for key presence or skip
-        dict_act,
-        S_KEY_ACT_COMPRESS,
-        S_ACTION_COMPRESS,
-        # run action and check for error
-        _action_compress,
-        dir_prj,
-        dict_prv,
-        dict_pub,
-        # handle error
-        quit=False,
-    )
+    # move, rename and purge
+
+    _layout_dist(dict_map, prj_type, dir_prj / S_DIR_DIST)
 
-    # # if debug key set
-    # if dict_act[S_KEY_ACT_REM_DIST]:
-    #     _action_rem_dist(p_dist)
     # --------------------------------------------------------------------------
-    # docs bake
+    # sort the same as PP.list_archive
 
-    _res = _action_run(
-        # check for key presence or skip
-        dict_act,
-        S_KEY_ACT_REM_DIST,
-        S_ACTION_REM_DIST,
-        # run action and check for error
-        _action_rem_dist,
-        dir_prj,
-        dict_prv,
-        dict_pub,
-        # handle error
-        quit=False,
-    )
+    list_rel = sorted(dict_map, key=lambda rel: PurePosixPath(rel).parts)
+    return [
+        ("." if rel == "." else f"./{rel}", dict_map[rel]) for rel in list_rel
+    ]
 
 
 # ------------------------------------------------------------------------------
@@ -2013,50 +2049,395 @@ def do_after_dist(dir_prj, dict_prv, dict_pub, dict_act):
 
 
 # ------------------------------------------------------------------------------
-# Run an action
+# Run a list of actions, at the same time where D_ACT_IO allows
 # ------------------------------------------------------------------------------
-def _action_run(
-    dict_act, key, msg, action_func, dir_prj, dict_prv, dict_pub, quit=False
+def _action_run_all(
+    dict_act, list_steps, dir_prj, dict_prv, dict_pub, wait_bg=True
 ):
     """
-    Run an actionS_KEY_ACT_DOCS_BAKE
+    Run a list of actions, at the same time where D_ACT_IO allows
 
-    Arguments:
+    Args:
+        dict_act: The dict of which actions to run
+        list_steps: The list of (key, msg, action_func, quit) to run, in
+        hook order
+        dir_prj: The project directory
+        dict_prv: The PyPlate private dict
+        dict_pub: The PyPlate public dict
+        wait_bg: Whether to wait for all actions started by _action_start
+        before returning (default: True)
 
+    Returns:
+        The list of results from each action, in hook order (True if the
+        action passed or was skipped, False if it failed)
+
+    Each action starts in a pool as soon as the earlier actions it depends on
+    (see _action_needs) are done. The spinner for each action is shown in hook
+    order while waiting for it, so the output is the same as running them one
+    at a time. No action starts after one with quit=True until it passes.\n
+    If any action fails, B_ERROR is set. If one with quit=True fails, the
+    actions already started (and the background actions) are waited for, and
+    then the program exits.
     """
 
-    # handle skip
-    if not dict_act[key]:
+    # split into runs that end at each quit action
+    list_runs = [[]]
+    for step in list_steps:
+        list_runs[-1].append(step)
+        if step[3]:
+            list_runs.append([])
 
-        # return True
-        return S.skip(msg)
+    # the result of each action
+    list_res = []
 
-    # run the real func and get pass/fail
-    err = action_func(dir_prj, dict_prv, dict_pub)
+    # whether any action failed, and whether it had quit=True
+    failed = False
+    quit_failed = False
 
-    # the real func failed - why?
-    if err:
+    with ThreadPoolExecutor(max_workers=I_ACT_JOBS) as pool:
+        for list_run in list_runs:
+
+            # start each action, after the ones it needs
+            list_fut = _action_submit(
+                pool, dict_act, list_run, dir_prj, dict_prv, dict_pub
+            )
+
+            # show results in hook order
+            for step, future in zip(list_run, list_fut):
+
+                # handle skip
+                if future is None:
+                    list_res.append(S.skip(step[1]))
+                    continue
+
+                # show any background actions this one needs first
+                if not all(_action_show_bg(step[0])):
+                    failed = True
+
+                # spin while waiting and get pass/fail
+                err = S.spin(step[1])(future.result)()
+                res = _action_check(err)
+                list_res.append(res)
+                if not res:
+                    failed = True
+                    quit_failed = step[3]
+
+            # NB: a quit action is the last of its run, so stop before the
+            # next run starts
+            if quit_failed:
+                break
+
+    # show the rest of the background actions
+    # NB: also before quitting, so they are not cut off
+    if wait_bg or quit_failed:
+        if not all(_action_show_bg()):
+            failed = True
+
+    # any fail is an error
+    if failed:
+        _action_set_error()
+
+    # NB: the pool is done, and nothing is left running
+    if quit_failed:
+        sys.exit(-1)
+
+    return list_res
+
+
+# ------------------------------------------------------------------------------
+# Start a list of actions in the background
+# ------------------------------------------------------------------------------
+def _action_start(dict_act, list_steps, dir_prj, dict_prv, dict_pub):
+    """
+    Start a list of actions in the background
+
+    Args:
+        dict_act: The dict of which actions to run
+        list_steps: The list of (key, msg, action_func, quit) to run, in
+        hook order
+        dir_prj: The project directory
+        dict_prv: The PyPlate private dict
+        dict_pub: The PyPlate public dict
+
+    Skipped actions are shown now. The rest keep running while the caller
+    goes on, and are shown (and their results checked) by the first
+    _action_run_all that has an action that needs them, or by the next one
+    with wait_bg=True.
+    """
+
+    # start each action, after the ones it needs
+    pool = ThreadPoolExecutor(max_workers=I_ACT_JOBS)
+    list_fut = _action_submit(
+        pool, dict_act, list_steps, dir_prj, dict_prv, dict_pub
+    )
+
+    # NB: started actions still run to the end
+    pool.shutdown(wait=False)
+
+    # show skips now, keep the rest for later
+    for step, future in zip(list_steps, list_fut):
+        if future is None:
+            S.skip(step[1])
+        else:
+            L_ACT_BG.append((step, future))
+
+
+# ------------------------------------------------------------------------------
+# Show the results of background actions
+# ------------------------------------------------------------------------------
+def _action_show_bg(key=None):
+    """
+    Show the results of background actions
 
-        # set flag
-        global B_ERROR
-        B_ERROR = True
+    Args:
+        key: The key of an action that is about to be shown, or None to show
+        all background actions (default: None)
+
+    Returns:
+        The list of results from each action shown (True if the action
+        passed, False if it failed)
+
+    Shows the spinner for each background action that the action needs, and
+    any started before them, waiting for each to finish.
+    """
+
+    # find the last background action that is needed
+    num_show = len(L_ACT_BG)
+    if key is not None:
+        num_show = 0
+        for index, (step, _future) in enumerate(L_ACT_BG):
+            if _action_needs(key, step[0]):
+                num_show = index + 1
+
+    # show them in the order they were started
+    list_show = L_ACT_BG[:num_show]
+    del L_ACT_BG[:num_show]
+    list_res = []
+    for step, future in list_show:
+        err = S.spin(step[1])(future.result)()
+        list_res.append(_action_check(err))
+
+    return list_res
+
+
+# ------------------------------------------------------------------------------
+# Start a list of actions in a pool
+# ------------------------------------------------------------------------------
+def _action_submit(pool, dict_act, list_steps, dir_prj, dict_prv, dict_pub):
+    """
+    Start a list of actions in a pool
+
+    Args:
+        pool: The ThreadPoolExecutor to run the actions in
+        dict_act: The dict of which actions to run
+        list_steps: The list of (key, msg, action_func, quit) to run, in
+        hook order
+        dir_prj: The project directory
+        dict_prv: The PyPlate private dict
+        dict_pub: The PyPlate public dict
+
+    Returns:
+        The list of futures for each action (None if skipped)
+
+    Each action waits for the background actions and earlier actions in the
+    list that it needs.
+    """
+
+    # NB: background actions count as earlier actions
+    list_prev = list(L_ACT_BG)
+    list_fut = []
+
+    for step in list_steps:
+
+        # skipped actions have no future
+        key, msg, action_func, _quit = step
+        if not dict_act[key]:
+            list_fut.append(None)
+            continue
 
-        # print more info if -d
-        # F.printd(str(err))
+        # get futures of earlier actions this one needs
+        deps = [
+            future
+            for step_prev, future in list_prev
+            if future is not None and _action_needs(key, step_prev[0])
+        ]
+
+        # start
+        future = pool.submit(
+            _action_call_after,
+            deps,
+            action_func,
+            msg,
+            dir_prj,
+            dict_prv,
+            dict_pub,
+        )
+        list_fut.append(future)
+        list_prev.append((step, future))
+
+    return list_fut
+
+
+# ------------------------------------------------------------------------------
+# Check if an action needs an earlier action to be done first
+# ------------------------------------------------------------------------------
+def _action_needs(key, key_prev):
+    """
+    Check if an action needs an earlier action to be done first
+
+    Args:
+        key: The key of the action
+        key_prev: The key of the earlier action
+
+    Returns:
+        True if the action must wait for the earlier action
+
+    An action needs an earlier one if either one writes something the other
+    reads or writes (see D_ACT_IO).
+    """
 
-        # is it a fireable offense?
-        if quit:
-            # TODO: use PM/PB teardown
-            sys.exit(-1)
+    # get io of both
+    ins, outs = _action_io(key)
+    ins_prev, outs_prev = _action_io(key_prev)
+
+    return (
+        _res_overlap(outs_prev, ins)
+        or _res_overlap(outs_prev, outs)
+        or _res_overlap(ins_prev, outs)
+    )
+
+
+# ------------------------------------------------------------------------------
+# Get the inputs and outputs of an action
+# ------------------------------------------------------------------------------
+def _action_io(key):
+    """
+    Get the inputs and outputs of an action
+
+    Args:
+        key: The key of the action
+
+    Returns:
+        A tuple of (inputs, outputs) as sets (everything if not in D_ACT_IO)
+    """
+
+    ins, outs = D_ACT_IO.get(key, ([S_RES_ALL], [S_RES_ALL]))
+    return (set(ins), set(outs))
+
+
+# ------------------------------------------------------------------------------
+# Check if two sets of things overlap
+# ------------------------------------------------------------------------------
+def _res_overlap(set_a, set_b):
+    """
+    Check if two sets of things overlap
+
+    Args:
+        set_a: The first set of S_RES_ values
+        set_b: The second set of S_RES_ values
+
+    Returns:
+        True if they share a value, or one has S_RES_ALL and the other is not
+        empty
+    """
+
+    # everything overlaps anything
+    if set_a and set_b and S_RES_ALL in set_a | set_b:
+        return True
+
+    return len(set_a & set_b) > 0
+
+
+# ------------------------------------------------------------------------------
+# Run an action after the actions it depends on
+# ------------------------------------------------------------------------------
+def _action_call_after(deps, action_func, msg, dir_prj, dict_prv, dict_pub):
+    """
+    Run an action after the actions it depends on
+
+    Args:
+        deps: The futures of the actions to wait for
+        action_func: The action to run
+        msg: The message for the action (used by --profile)
+        dir_prj: The project directory
+        dict_prv: The PyPlate private dict
+        dict_pub: The PyPlate public dict
+
+    Returns:
+        The result of the action (None for pass, else the error)
+    """
+
+    # NB: run even if a dep failed, same as running one at a time
+    wait(deps)
+    return _action_call(action_func, msg, dir_prj, dict_prv, dict_pub)
+
+
+# ------------------------------------------------------------------------------
+# Call an action
+# ------------------------------------------------------------------------------
+def _action_call(action_func, msg, dir_prj, dict_prv, dict_pub):
+    """
+    Call an action
+
+    Args:
+        action_func: The action to run
+        msg: The message for the action (used by --profile)
+        dir_prj: The project directory
+        dict_prv: The PyPlate private dict
+        dict_pub: The PyPlate public dict
+
+    Returns:
+        The result of the action (None for pass, else the error)
+    """
+
+    # run the real func
+    with PP.profile(S_KEY_PROF_ACTION, msg):
+        return action_func(dir_prj, dict_prv, dict_pub)
+
+
+# ------------------------------------------------------------------------------
+# Check the result of an action
+# ------------------------------------------------------------------------------
+def _action_check(err):
+    """
+    Check the result of an action
+
+    Args:
+        err: The result of the action (None for pass, else the error)
+
+    Returns:
+        True if the action passed, False if it failed
+
+    The caller decides what a fail means (see _action_run_all).
+    """
+
+    # the real func failed - why?
+    # print more info if -d
+    # F.printd(str(err))
 
     # pass
     return not err
 
 
+# ------------------------------------------------------------------------------
+# Mark the current project as having errors
+# ------------------------------------------------------------------------------
+def _action_set_error():
+    """
+    Mark the current project as having errors
+
+    NB: only called by _action_run_all, in the main thread, so no action in a
+    pool sets it.
+    """
+
+    # set flag
+    global B_ERROR
+    B_ERROR = True
+
+
 # ------------------------------------------------------------------------------
 # Make a venv in the project directory
 # ------------------------------------------------------------------------------
-@S.spin(S_ACTION_VENV)
 def _action_venv(dir_prj, dict_prv, _dict_pub):
     """
     Make a venv in the project directory
@@ -2089,7 +2470,6 @@ def _action_venv(dir_prj, dict_prv, _dict_pub):
 # ------------------------------------------------------------------------------
 # Install reqs in venv
 # ------------------------------------------------------------------------------
-@S.spin(S_ACTION_REQS)
 def _action_reqs(dir_prj, dict_prv, _dict_pub):
     """
     Install reqs in venv
@@ -2114,7 +2494,11 @@ def _action_reqs(dir_prj, dict_prv, _dict_pub):
     # get name of venv folder and reqs file
     file_reqs = dir_prj / S_FILE_REQS
 
-    # install requirements
+    # install requirements from the wheel cache (works offline)
+    if _install_wheels(dir_prj, dir_venv, file_reqs):
+        return None
+
+    # install requirements from index
     try:
         cv.install_reqs(file_reqs)
         return None
@@ -2122,10 +2506,137 @@ def _action_reqs(dir_prj, dict_prv, _dict_pub):
         return e
 
 
+# ------------------------------------------------------------------------------
+# Install reqs in venv from the wheel cache
+# ------------------------------------------------------------------------------
+def _install_wheels(dir_prj, dir_venv, file_reqs):
+    """
+    Install reqs in venv from the wheel cache
+
+    Args:
+        dir_prj: The project directory
+        dir_venv: The name of the venv folder
+        file_reqs: The path to the reqs file
+
+    Returns:
+        True if the reqs were installed, False if the caller should install
+        them from the index
+
+    The cache has one dir of wheels for each hash of the reqs file and the
+    venv's python (see _get_wheel_dir). If there is no dir for these reqs, it
+    is filled with "pip wheel" first, so the next project with the same reqs
+    installs without the index. If the install from the dir fails, the dir
+    is removed, so it is filled again next time.
+    """
+
+    # no reqs (or not pinned), nothing to cache
+    dir_wheels = _get_wheel_dir(dir_prj, dir_venv, file_reqs)
+    if not dir_wheels:
+        return False
+
+    try:
+
+        # fill the cache
+        if not dir_wheels.exists():
+            dir_wheels.parent.mkdir(parents=True, exist_ok=True)
+
+            # NB: fill a temp dir, so a failed/partial fill is never used
+            dir_tmp = Path(
+                tempfile.mkdtemp(
+                    prefix=f"{dir_wheels.name}.", dir=dir_wheels.parent
+                )
+            )
+            try:
+                cmd = S_CMD_VENV_WHEEL.format(
+                    dir_prj, dir_venv, file_reqs, dir_tmp
+                )
+                F.run(cmd, shell=True, capture_output=True)
+
+                # NB: another process may have filled it first
+                if not dir_wheels.exists():
+                    dir_tmp.rename(dir_wheels)
+            finally:
+                shutil.rmtree(dir_tmp, ignore_errors=True)
+
+    except (F.CNRunError, OSError):
+        return False
+
+    # install from the cache only
+    try:
+        cmd = S_CMD_VENV_INST_WHEEL.format(
+            dir_prj, dir_venv, file_reqs, dir_wheels
+        )
+        F.run(cmd, shell=True, capture_output=True)
+        return True
+
+    # bad/missing wheels, fill again next time
+    except (F.CNRunError, OSError):
+        shutil.rmtree(dir_wheels, ignore_errors=True)
+        return False
+
+
+# ------------------------------------------------------------------------------
+# Get the wheel cache dir for a reqs file
+# ------------------------------------------------------------------------------
+def _get_wheel_dir(dir_prj, dir_venv, file_reqs):
+    """
+    Get the wheel cache dir for a reqs file
+
+    Args:
+        dir_prj: The project directory
+        dir_venv: The name of the venv folder
+        file_reqs: The path to the reqs file
+
+    Returns:
+        The path to the dir of wheels for the reqs, or None if there are no
+        reqs, any of them are not pinned, or the venv's python can't be run
+
+    The name of the dir is a hash of the sorted reqs, without blank lines and
+    comments, so the order of the merged files does not matter. The hash also
+    has the venv's python version/ABI and platform, since wheels built for
+    one python may not install in another. Reqs that are not pinned to one
+    version (see L_REQS_PINNED) are not cached, since their wheels would
+    never be updated.
+    """
+
+    # get the reqs
+    try:
+        text = Path(file_reqs).read_text(encoding=S_ENCODING)
+    except OSError:
+        return None
+    lines = [line.strip() for line in text.splitlines()]
+    lines = sorted(line for line in lines if line and line[0] != "#")
+    if not lines:
+        return None
+
+    # any req not pinned, use the index
+    for line in lines:
+        if not any(item in line for item in L_REQS_PINNED):
+            return None
+
+    # get the tags of the venv's python
+    path_py = Path(dir_prj) / dir_venv / "bin/python"
+    try:
+        res = subprocess.run(
+            [str(path_py), "-c", S_PY_WHEEL_TAG],
+            check=True,
+            capture_output=True,
+            text=True,
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    lines.append(res.stdout.strip())
+
+    # hash them
+    str_reqs = "\n".join(lines).encode(S_ENCODING)
+    str_hash = hashlib.sha256(str_reqs).hexdigest()[:16]
+
+    return PP.P_DIR_CACHE / S_DIR_WHEELS / str_hash
+
+
 # ------------------------------------------------------------------------------
 # Make git repo for new project
 # ------------------------------------------------------------------------------
-@S.spin(S_ACTION_GIT)
 def _action_git(dir_prj, _dict_prv, _dict_pub):
     """
     Make git repo for new project
@@ -2153,7 +2664,6 @@ def _action_git(dir_prj, _dict_prv, _dict_pub):
 # ------------------------------------------------------------------------------
 # Install lib in project
 # ------------------------------------------------------------------------------
-@S.spin(S_ACTION_INST)
 def _action_inst(dir_prj, dict_prv, dict_pub):
     """
     Install lib in project
@@ -2189,7 +2699,6 @@ def _action_inst(dir_prj, dict_prv, dict_pub):
 # ------------------------------------------------------------------------------
 # Purge some files
 # ------------------------------------------------------------------------------
-@S.spin(S_ACTION_PURGE)
 def _action_purge(dir_prj, dict_prv, _dict_pub):
     """
     Purge some files
@@ -2224,14 +2733,10 @@ def _action_purge(dir_prj, dict_prv, _dict_pub):
             elif item.is_file():
                 item.unlink()
 
-    # print done
-    return None
-
 
 # ------------------------------------------------------------------------------
 # Make i18n stuff
 # ------------------------------------------------------------------------------
-@S.spin(S_ACTION_I18N)
 def _action_i18n(dir_prj, dict_prv, dict_pub):
     """
     Make i18n stuff
@@ -2279,7 +2784,8 @@ def _action_i18n(dir_prj, dict_prv, dict_pub):
 
     # make .pot, .po, and .mo files
     try:
-        potpy.main()
+        with PP.profile(S_KEY_PROF_LIB, "CNPotPy.main"):
+            potpy.main()
     except F.CNRunError as e:
         return e
 
@@ -2297,10 +2803,14 @@ def _action_i18n(dir_prj, dict_prv, dict_pub):
 
         # do the thing
         try:
-            potpy.make_desktop(path_dsk_tmp, path_dsk_out)
+            with PP.profile(S_KEY_PROF_LIB, "CNPotPy.make_desktop"):
+                potpy.make_desktop(path_dsk_tmp, path_dsk_out)
         except F.CNRunError as e:
             return e
 
+    # new pot/po/mo/desktop files
+    PP.get_index(dir_prj).refresh()
+
     # default result
     return None
 
@@ -2308,7 +2818,6 @@ def _action_i18n(dir_prj, dict_prv, dict_pub):
 # ------------------------------------------------------------------------------
 # Fix metadata
 # ------------------------------------------------------------------------------
-@S.spin(S_ACTION_META)
 def _action_meta(dir_prj, dict_prv, dict_pub):
     """
     Fix metadata
@@ -2324,8 +2833,11 @@ def _action_meta(dir_prj, dict_prv, dict_pub):
     # fix po files (version/remove home dir)
     # NB: this ignores blacklist
 
+    # NB: use index instead of walking disk
+    index = PP.get_index(dir_prj)
+
     # NB: root is a full path, dirs and files are relative to root
-    for root, root_dirs, root_files in dir_prj.walk():
+    for root, root_dirs, root_files in index.walk():
 
         # special case for po/pot files
 
@@ -2352,21 +2864,11 @@ def _action_meta(dir_prj, dict_prv, dict_pub):
     # files have been fixed, as well as paths/filenames. also dict_pub has been
     # undunderized
 
-    # fix up blacklist and convert relative or glob paths to absolute Path
-    # objects
-    dict_bl = dict(dict_pub[S_KEY_PUB_BL])
-
-    # for each section of blacklist
-    for key, val in dict_bl.items():
-
-        # convert all items in list to Path objects
-        list_res = []
-        for item in val:
-            res = list(dir_prj.glob(item))
-            list_res.extend(res)
-
-        # store in local bl
-        dict_bl[key] = list_res
+    # compile blacklist globs into matchers
+    dict_bl = {
+        key: PP.PyPlateBlacklist(dir_prj, val)
+        for key, val in dict_pub[S_KEY_PUB_BL].items()
+    }
 
     # just shorten the names
     skip_all = dict_bl[S_KEY_SKIP_ALL]
@@ -2377,14 +2879,17 @@ def _action_meta(dir_prj, dict_prv, dict_pub):
     # NB: this uses blacklist
 
     # NB: root is a full path, dirs and files are relative to root
-    for root, root_dirs, root_files in dir_prj.walk():
+    for root, root_dirs, root_files in index.walk():
 
         # handle dirs in skip_all
-        if root in skip_all:
+        if skip_all.match(root):
             # NB: don't recurse into subfolders
             root_dirs.clear()
             continue
 
+        # check the dir once for all its files
+        root_contents = skip_contents.match(root)
+
         # convert files into Paths
         files = [root / f for f in root_files]
 
@@ -2392,36 +2897,32 @@ def _action_meta(dir_prj, dict_prv, dict_pub):
         for item in files:
 
             # handle files in skip_all
-            if item in skip_all:
+            if skip_all.match(item):
                 continue
 
             # handle dirs/files in skip_contents
-            if not root in skip_contents and not item in skip_contents:
+            if not root_contents and not skip_contents.match(item):
 
                 # fix content with appropriate dicts
                 _fix_files(item, dict_prv, dict_pub)
 
-    # print done
-    return None
-
 
 # ------------------------------------------------------------------------------
 # Fix placeholders
 # ------------------------------------------------------------------------------
-@S.spin(S_ACTION_PLACE)
 def _action_placeholders(dir_prj, _dict_prv, _dict_pub):
 
     # do not fuck with placeholders in these dirs
-    list_skip = []
-    for item in L_PH_SKIP:
-        res = list(dir_prj.glob(item))
-        list_skip.extend(res)
+    list_skip = PP.PyPlateBlacklist(dir_prj, L_PH_SKIP)
+
+    # NB: use index instead of walking disk
+    index = PP.get_index(dir_prj)
 
     # for all dirs/subdirs
-    for root, root_dirs, root_files in dir_prj.walk():
+    for root, root_dirs, root_files in index.walk():
 
         # skip .git, etc
-        if root in list_skip:
+        if list_skip.match(root):
             root_dirs.clear()
             continue
 
@@ -2431,6 +2932,7 @@ def _action_placeholders(dir_prj, _dict_prv, _dict_pub):
             # make a dummy file
             with open(root / S_PH_NAME, "w", encoding=S_ENCODING) as a_file:
                 a_file.write(S_PH_TEXT)
+            index.add(root / S_PH_NAME)
 
         # if dir has files/folders and placeholder
         if len(root_dirs) > 0 or len(root_files) > 1:
@@ -2438,15 +2940,12 @@ def _action_placeholders(dir_prj, _dict_prv, _dict_pub):
                 if a_file == S_PH_NAME:
                     a_path = root / a_file
                     a_path.unlink()
-
-    # print info
-    return None
+                    index.remove(a_path)
 
 
 # ------------------------------------------------------------------------------
 # Install package in itself
 # ------------------------------------------------------------------------------
-@S.spin(S_ACTION_EDIT)
 def _action_edit(dir_prj, dict_prv, _dict_pub):
 
     # get venv name
@@ -2455,6 +2954,9 @@ def _action_edit(dir_prj, dict_prv, _dict_pub):
     cmd = S_CMD_VENV_INST_SELF.format(dir_prj, dir_venv)
     try:
         F.run(cmd, shell=True, capture_output=True)
+
+        # new egg-info files
+        PP.get_index(dir_prj).refresh()
         return None
     except F.CNRunError as e:
         return e
@@ -2463,7 +2965,6 @@ def _action_edit(dir_prj, dict_prv, _dict_pub):
 # ------------------------------------------------------------------------------
 # Make docs folderS_ERR_NO_REPO
 # ------------------------------------------------------------------------------
-@S.spin(S_ACTION_MAKE_DOCS)
 def _action_make_docs(dir_prj, _dict_prv, dict_pub):
 
     # get some props
@@ -2486,16 +2987,20 @@ def _action_make_docs(dir_prj, _dict_prv, dict_pub):
 
         # make docs
         mkdocs = CNMkDocs()
-        mkdocs.make_docs(
-            dir_prj,
-            S_DIR_DOCS,
-            use_rm,
-            use_api,
-            lst_api_in,
-            S_FILE_README,
-            S_DIR_API,
-            S_DIR_IMAGES,
-        )
+        with PP.profile(S_KEY_PROF_LIB, "CNMkDocs.make_docs"):
+            mkdocs.make_docs(
+                dir_prj,
+                S_DIR_DOCS,
+                use_rm,
+                use_api,
+                lst_api_in,
+                S_FILE_README,
+                S_DIR_API,
+                S_DIR_IMAGES,
+            )
+
+        # new docs files
+        PP.get_index(dir_prj).refresh()
         return None
     except F.CNRunError as e:
         return e
@@ -2504,7 +3009,6 @@ def _action_make_docs(dir_prj, _dict_prv, dict_pub):
 # -----------------------------------------------------------------------------
 # Make tree files
 # ------------------------------------------------------------------------------
-@S.spin(S_ACTION_TREE)
 def _action_tree(dir_prj, _dict_prv, dict_pub):
 
     # get path to tree
@@ -2543,7 +3047,6 @@ def _action_tree(dir_prj, _dict_prv, dict_pub):
 # ------------------------------------------------------------------------------
 # Freeze venv dir
 # ------------------------------------------------------------------------------
-@S.spin(S_ACTION_FREEZE)
 def _action_freeze(dir_prj, dict_prv, _dict_pub):
 
     # get name ov venv folder and reqs file
@@ -2554,7 +3057,7 @@ def _action_freeze(dir_prj, dict_prv, _dict_pub):
     cv = CNVenv(dir_prj, dir_venv)
     try:
         cv.freeze(file_reqs)
-        # return None
+        return None
     except F.CNRunError as e:
         return e
 
@@ -2562,14 +3065,14 @@ def _action_freeze(dir_prj, dict_prv, _dict_pub):
 # ------------------------------------------------------------------------------
 #
 # ------------------------------------------------------------------------------
-@S.spin(S_ACTION_BAKE_DOCS)
 def _action_bake_docs(dir_prj, _dict_prv, _dict_pub):
 
     # bake docs
     try:
         cm = CNMkDocs()
-        cm.bake_docs(P_DIR_PP_VENV, dir_prj)
-        # return None
+        with PP.profile(S_KEY_PROF_LIB, "CNMkDocs.bake_docs"):
+            cm.bake_docs(P_DIR_PP_VENV, dir_prj)
+        return None
     except F.CNRunError as e:
         return e
 
@@ -2577,14 +3080,14 @@ def _action_bake_docs(dir_prj, _dict_prv, _dict_pub):
 # ------------------------------------------------------------------------------
 #
 # ------------------------------------------------------------------------------
-@S.spin(S_ACTION_DEPLOY_DOCS)
 def _action_deploy_docs(dir_prj, _dict_prv, _dict_pub):
 
     # the command to make or bake docs
     try:
         cm = CNMkDocs()
-        cm.deploy_docs(P_DIR_PP_VENV, dir_prj)
-        # return None
+        with PP.profile(S_KEY_PROF_LIB, "CNMkDocs.deploy_docs"):
+            cm.deploy_docs(P_DIR_PP_VENV, dir_prj)
+        return None
     except F.CNRunError as e:
         return e
 
@@ -2592,8 +3095,7 @@ def _action_deploy_docs(dir_prj, _dict_prv, _dict_pub):
 # ------------------------------------------------------------------------------
 #
 # ------------------------------------------------------------------------------
-@S.spin(S_ACTION_COMPRESS)
-def _action_compress(dir_prj, dict_prv, _dict_pub):
+def _action_compress(dir_prj, dict_prv, dict_pub):
 
     # get dist dir for all operations
     dist = Path(dir_prj) / S_DIR_DIST
@@ -2601,18 +3103,60 @@ def _action_compress(dir_prj, dict_prv, _dict_pub):
     p_dist = dist / name_fmt
 
     # get out file (dist/prj-<version>.xxx) and in dir (dist/prj-<version>)
-    path_out = path_in = str(p_dist)
+    path_out = path_in = p_dist
+    path_arc = PP.get_archive_path(path_out, S_DIST_MODE)
+
+    # get file for hash of last archive
+    path_hash = PP.get_cache_dir(dir_prj) / S_FILE_DIST_HASH
 
     # make archive type
-    shutil.make_archive(path_out, S_DIST_MODE, path_in)
+    # NB: no dist folder means PyBaker skipped it, so use the project files
+    try:
+        # get hash of last archive
+        dict_hash = {}
+        if path_hash.exists():
+            dict_hash = F.load_paths_into_dict([path_hash])
+
+        # get archive members
+        if path_in.is_dir():
+            list_items = PP.list_archive(path_in)
+        else:
+            list_items = get_dist_map(dir_prj, dict_prv, dict_pub)
+
+        # hash the inputs
+        # NB: pass the file hashes back in so unchanged files are not read
+        dict_files = dict_hash.get(S_KEY_DIST_FILES, {})
+        str_hash, dict_files = PP.hash_archive(
+            list_items, S_DIST_MODE, dict_files
+        )
 
-    # print info
-    pass
+        # same inputs and last archive still there, keep it
+        if (
+            path_arc
+            and path_arc.is_file()
+            and dict_hash.get(S_KEY_DIST_HASH) == str_hash
+            and dict_hash.get(S_KEY_DIST_SIZE) == path_arc.stat().st_size
+        ):
+            return None
+
+        # make a new archive
+        PP.make_archive(path_out, list_items, S_DIST_MODE, I_DIST_JOBS)
+
+        # save hash for next time
+        dict_hash = {
+            S_KEY_DIST_HASH: str_hash,
+            S_KEY_DIST_SIZE: path_arc.stat().st_size,
+            S_KEY_DIST_FILES: dict_files,
+        }
+        path_hash.parent.mkdir(parents=True, exist_ok=True)
+        F.save_dict_into_paths(dict_hash, [path_hash])
+        return None
+    except (OSError, ValueError) as e:
+        return e
 
 
 #
 # ------------------------------------------------------------------------------
-@S.spin(S_ACTION_REM_DIST)
 def _action_rem_dist(dir_prj, dict_prv, _dict_pub):
 
     # get dist dir for all operations
@@ -2621,10 +3165,117 @@ def _action_rem_dist(dir_prj, dict_prv, _dict_pub):
     p_dist = dist / name_fmt
 
     # delete folder
-    shutil.rmtree(p_dist)
+    # NB: may not be there if PyBaker skipped it (see get_dist_map)
+    if p_dist.exists():
+        shutil.rmtree(p_dist)
+
+
+# ------------------------------------------------------------------------------
+# Dist map functions
+# ------------------------------------------------------------------------------
+
+
+# ------------------------------------------------------------------------------
+# Add a dir and its parents to a dist map
+# ------------------------------------------------------------------------------
+def _map_dirs(dict_map, dst):
+    """
+    Add a dir and its parents to a dist map
+
+    Args:
+        dict_map: The dist map (see get_dist_map)
+        dst: The dir, rel to the dist folder
+
+    Dirs that are not there yet are added as made dirs (no src), the same as
+    mkdir(parents=True).
+    """
+
+    # add each dir from the top down
+    for item in reversed([dst, *dst.parents]):
+        dict_map.setdefault(str(item), None)
+
+
+# ------------------------------------------------------------------------------
+# Add a dir and everything under it to a dist map
+# ------------------------------------------------------------------------------
+def _map_tree(dict_map, src, dst):
+    """
+    Add a dir and everything under it to a dist map
+
+    Args:
+        dict_map: The dist map (see get_dist_map)
+        src: The dir in the project
+        dst: The dir, rel to the dist folder
+
+    Same as shutil.copytree(dirs_exist_ok=True), the src replaces anything
+    already at the same dst, and symlinks are followed.
+    """
+
+    # add the dir
+    _map_dirs(dict_map, dst.parent)
+    dict_map[str(dst)] = src
+
+    # add its children
+    for name in os.listdir(src):
+        path = src / name
+        if path.is_dir():
+            _map_tree(dict_map, path, dst / name)
+        elif path.is_file():
+            dict_map[str(dst / name)] = path
+
+
+# ------------------------------------------------------------------------------
+# Move, rename and purge items in a dist map
+# ------------------------------------------------------------------------------
+def _layout_dist(dict_map, prj_type, dir_dist):
+    """
+    Move, rename and purge items in a dist map
+
+    Args:
+        dict_map: The dist map (see get_dist_map)
+        prj_type: The project type
+        dir_dist: The dist dir the rel paths are matched against
+
+    This is the one place the dist layout is changed after the dist dict is
+    copied: install files are moved to where the user runs them, the
+    extensions in L_DIST_REMOVE_EXT are removed, and L_PURGE_DIST is purged.
+    """
+
+    # --------------------------------------------------------------------------
+    # move some files around
+
+    if prj_type in L_APP_INSTALL:
+
+        # move install.py to above assets
+        file_inst = f"{S_DIR_ASSETS}/{S_DIR_INSTALL}/{S_FILE_INST_PY}"
+        if file_inst in dict_map:
+            dict_map[S_FILE_INST_PY] = dict_map.pop(file_inst)
+
+        # move uninstall.py to top of assets
+        file_uninst = f"{S_DIR_ASSETS}/{S_DIR_INSTALL}/{S_FILE_UNINST_PY}"
+        if file_uninst in dict_map:
+            dest = f"{S_DIR_ASSETS}/{S_FILE_UNINST_PY}"
+            dict_map[dest] = dict_map.pop(file_uninst)
+
+    # --------------------------------------------------------------------------
+    # remove extensions of some files
+
+    # NB: the dist dir is not real, the globs only look at the rel paths
+    bl_ext = PP.PyPlateBlacklist(dir_dist, L_DIST_REMOVE_EXT)
+    for rel, src in list(dict_map.items()):
+        if src and src.is_file() and bl_ext.match(dir_dist / rel):
+            rel_new = str(PurePosixPath(rel).with_suffix(""))
+            dict_map[rel_new] = dict_map.pop(rel)
+
+    # --------------------------------------------------------------------------
+    # remove unnecessary files from dist
 
-    # show info
-    pass
+    bl_purge = PP.PyPlateBlacklist(dir_dist, L_PURGE_DIST)
+    list_purge = [rel for rel in dict_map if bl_purge.match(dir_dist / rel)]
+    for rel in list_purge:
+        for item in list(dict_map):
+            if item == rel or item.startswith(f"{rel}/"):
+                del dict_map[item]
 
 
 # ------------------------------------------------------------------------------
@@ -2799,9 +3450,8 @@ def _fix_readme(path, dict_prv_prj, dict_pub_meta):
 
     # --------------------------------------------------------------------------
 
-    # save file
-    with open(path, "w", encoding=S_ENCODING) as a_file:
-        a_file.write(text)
+    # save file (if changed)
+    PP.write_if_changed(path, text)
 
 
 # ------------------------------------------------------------------------------
@@ -2877,7 +3527,9 @@ def _fix_pyproject(path: Path, dict_prv_prj, dict_pub_meta):
     path_prj = path_src.parent.resolve()
 
     # walk all subdirs of 'path_src'
-    for parent_dir, child_dirs, _child_files in path_src.walk():
+    # NB: use index instead of walking disk
+    index = PP.get_index(path.parent)
+    for parent_dir, child_dirs, _child_files in index.walk(path_src):
 
         # only care about dirs
         for child_dir in child_dirs:
@@ -2908,9 +3560,8 @@ def _fix_pyproject(path: Path, dict_prv_prj, dict_pub_meta):
 
     # --------------------------------------------------------------------------
 
-    # save file
-    with open(path, "w", encoding=S_ENCODING) as a_file:
-        a_file.write(text)
+    # save file (if changed)
+    PP.write_if_changed(path, text)
 
 
 # ------------------------------------------------------------------------------
@@ -2966,9 +3617,8 @@ def _fix_desktop(path, _dict_prv_prj, dict_pub_meta):
     str_rep = S_DESK_DESC_REP.format(pp_short_desc)
     text = re.sub(str_pattern, str_rep, text, flags=re.M | re.S)
 
-    # save file
-    with open(path, "w", encoding=S_ENCODING) as a_file:
-        a_file.write(text)
+    # save file (if changed)
+    PP.write_if_changed(path, text)
 
 
 # ------------------------------------------------------------------------------
@@ -3005,9 +3655,8 @@ def _fix_ui(path, dict_prv_prj, dict_pub_meta):
     str_rep = S_UI_DESC_REP.format(pp_short_desc)
     text = re.sub(str_pattern, str_rep, text, flags=re.M | re.S)
 
-    # save file
-    with open(path, "w", encoding=S_ENCODING) as a_file:
-        a_file.write(text)
+    # save file (if changed)
+    PP.write_if_changed(path, text)
 
 
 # ------------------------------------------------------------------------------
@@ -3066,7 +3715,7 @@ def _fix_src(path, dict_prv_prj, dict_pub_meta):
         split_grp = dict_type_rules[S_KEY_SPLIT_COMM]
 
         # there may be multiple matches per line (ignore quoted markers)
-        matches = re.finditer(split_sch, line)
+        matches = split_sch.finditer(line)
 
         # only use matches that have the right group
         matches = [match for match in matches if match.group(split_grp)]
@@ -3115,27 +3764,21 @@ def _fix_src(path, dict_prv_prj, dict_pub_meta):
         # replace line in lines
         lines[index] = line
 
-    # save lines back to file
-    with open(path, "w", encoding=S_ENCODING) as a_file:
-        a_file.writelines(lines)
+    # put lines back together
+    text = "".join(lines)
 
     # --------------------------------------------------------------------------
     # S_PP_SHORT_DESC needs special handling for _() and () if Black wraps it
     # FIXME: does not respect current state of replace flag b/c multiline
 
-    # open and read whole file
-    with open(path, "r", encoding=S_ENCODING) as a_file:
-        text = a_file.read()
+    # replace short desc in multi line
+    str_desc = dict_pub_meta[S_KEY_META_SHORT_DESC]
+    str_sch = S_SRC_DESC_SCH
+    str_rep = S_SRC_DESC_REP.format(str_desc)
+    text = re.sub(str_sch, str_rep, text, flags=re.S)
 
-        # replace short desc in multi line
-        str_desc = dict_pub_meta[S_KEY_META_SHORT_DESC]
-        str_sch = S_SRC_DESC_SCH
-        str_rep = S_SRC_DESC_REP.format(str_desc)
-        text = re.sub(str_sch, str_rep, text, flags=re.S)
-
-    # save lines back to file
-    with open(path, "w", encoding=S_ENCODING) as a_file:
-        a_file.write(text)
+    # save lines back to file (if changed)
+    PP.write_if_changed(path, text)
 
 
 # ------------------------------------------------------------------------------
@@ -3156,8 +3799,12 @@ def _fix_install(path, dict_prv_prj, _dict_pub_meta):
     # open file and get contents
     a_dict = F.load_paths_into_dict(path)
 
-    # replace version
+    # same version, don't touch file (keeps mtime for the manifest)
     ver = dict_prv_prj["__PP_VER_MMR__"]
+    if a_dict.get(S_KEY_INST_VER) == ver:
+        return
+
+    # replace version
     a_dict[S_KEY_INST_VER] = ver
 
     # save file
@@ -3195,9 +3842,8 @@ def _fix_mkdocs(path, _dict_prv_prj, dict_pub):
     str_rep = S_THEME_REP.format(theme)
     text = re.sub(str_pattern, str_rep, text)
 
-    # save file
-    with open(path, "w", encoding=S_ENCODING) as a_file:
-        a_file.write(text)
+    # save file (if changed)
+    PP.write_if_changed(path, text)
 
 
 # -)
@@ -24,7 +24,6 @@ This file is real ugly b/c we can't access the venv, so we do it manually.
 # system imports
 from pathlib import Path
 import re
-import shutil
 import subprocess
 import sys
 
@@ -432,6 +431,9 @@ class CNInstall(CNInstallBase):
         if not self._arg_quiet and not self._arg_dry:
             print(msg, flush=True, end="")
 
+        # things to copy
+        list_items = []
+
         # for each key, value
         for k, v in dict_cfg.items():
 
@@ -449,12 +451,10 @@ class CNInstall(CNInstallBase):
                 print(self.S_DRY_COPY.format(src, dst))
                 print()
             else:
-                # if the source is a dir
-                if src.is_dir():
-                    shutil.copytree(src, dst, dirs_exist_ok=True)
-                # if the src is a file
-                else:
-                    shutil.copy(src, dst)
+                list_items.append((src, dst))
+
+        # copy everything at once
+        self._copy_items(list_items)
 
         # show some info
         if not self._arg_quiet and not self._arg_dry:
@@ -144,23 +144,32 @@ class PyBaker(B.PyPlateBase):
         print(B.C.S_MSG_BAKE.format(self._dir_prj.name))
         print()
 
+        # group for --profile
+        phase = B.C.S_KEY_PROF_PHASE
+
         # do any fixing up of dicts (like meta keywords, etc)
-        self._do_before_fix()
+        with B.profile(phase, "do_before_fix"):
+            self._do_before_fix()
 
         # do replacements in final project location
-        self._do_fix()
+        with B.profile(phase, "do_fix"):
+            self._do_fix()
 
         # do extra stuff to final dir after fix
-        self._do_after_fix()
+        with B.profile(phase, "do_after_fix"):
+            self._do_after_fix()
 
         # do any fixing up of dicts (like meta keywords, etc)
-        self._do_before_dist()
+        with B.profile(phase, "do_before_dist"):
+            self._do_before_dist()
 
         # copy project files into dist folder
-        self._do_dist()
+        with B.profile(phase, "do_dist"):
+            self._do_dist()
 
         # do any fixing up of dicts (like meta keywords, etc)
-        self._do_after_dist()
+        with B.profile(phase, "do_after_dist"):
+            self._do_after_dist()
 
         # done with project
         print()
@@ -480,36 +489,53 @@ class PyBaker(B.PyPlateBase):
         Copy fixed files to final location
 
         Gets dirs/files from project and copies them to the dist/assets dir.
+        If the dist folder is already there, only changed files are copied
+        and stale ones removed.
         """
 
         # ----------------------------------------------------------------------
         # do common dist stuff
 
-        # find old dist? nuke it from orbit! it's the only way to be sure!
+        # get dist dirs
         a_dist = self._dir_prj / B.C.S_DIR_DIST
-        if a_dist.is_dir():
-            shutil.rmtree(a_dist)
-
-        # make child dir in case we nuked
         name_fmt = self._dict_prv_prj["__PP_FMT_DIST__"]
         p_dist = a_dist / name_fmt
-        p_dist.mkdir(parents=True)
 
-        # for each key, val (type, dict)
-        for key, val in self._dict_pub_dist.items():
+        # keep the last archive, compress reuses it if nothing changed
+        # NB: see C.S_FILE_DIST_HASH
+        path_arc = B.get_archive_path(p_dist, B.C.S_DIST_MODE)
 
-            # get src/dst rel to prj dir/dist dir
-            src = self._dir_prj / key
-            dst = p_dist / str(val)
-            if not dst.exists():
-                dst.mkdir(parents=True)
-            dst = dst / src.name
+        # if dist folder would only be compressed and removed, don't make it
+        # NB: compress makes the archive straight from the project files
+        # (see C.get_dist_map)
+        use_map = (
+            self._dict_act[B.C.S_KEY_ACT_COMPRESS]
+            and self._dict_act[B.C.S_KEY_ACT_REM_DIST]
+        )
 
-            # do the copy
-            if src.exists() and src.is_dir():
-                shutil.copytree(src, dst, dirs_exist_ok=True)
-            elif src.exists() and src.is_file():
-                shutil.copy2(src, dst)
+        # find old dist stuff? nuke it from orbit!
+        # NB: except the archive and the dist folder, which is synced below
+        if a_dist.is_dir():
+            for item in a_dist.iterdir():
+                if item == path_arc or (item == p_dist and not use_map):
+                    continue
+                if item.is_dir() and not item.is_symlink():
+                    shutil.rmtree(item)
+                else:
+                    item.unlink()
+
+        # no dist folder, just the dir for the archive
+        if use_map:
+            a_dist.mkdir(parents=True, exist_ok=True)
+            return None
+
+        # make the dist folder match the dist layout, only copying changes
+        # NB: the layout already has the moves/renames/purges (see
+        # C._layout_dist)
+        list_items = B.C.get_dist_map(
+            self._dir_prj, self._dict_prv, self._dict_pub
+        )
+        B.sync_tree(p_dist, list_items)
 
         # ----------------------------------------------------------------------
         # done
@@ -524,10 +550,9 @@ class PyBaker(B.PyPlateBase):
         Do any work after making dist
 
         Do any work on the dist folder after it is created. This method is
-        called after _do_dist. Currently, this method purges any "ABOUT" file
-        used as placeholders for github syncing. It also tars the source folder
-        if it is a package, making for one (or two) less steps in the user's
-        install process.
+        called after _do_dist. Currently, this method compresses the dist
+        folder, making for one (or two) less steps in the user's install
+        process, and removes it.
         """
 
         B.C.do_after_dist(
@@ -26,8 +26,24 @@ Run pymaker -h for more options.
 # ------------------------------------------------------------------------------
 
 # system imports
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from contextlib import redirect_stdout
+import copy
+import hashlib
+import io
+import json
+from logging.handlers import QueueHandler, QueueListener
+import multiprocessing
+import os
+from pathlib import Path
 import shutil
 
+# NB: tomllib is 3.11+, batch files can still be json
+try:
+    import tomllib
+except ImportError:
+    tomllib = None
+
 # venv imports
 from cnlib import cnfunctions as F  # type: ignore
 
@@ -84,6 +100,49 @@ class PyMaker(B.PyPlateBase):
     # Class constants
     # --------------------------------------------------------------------------
 
+    # render option strings
+    S_ARG_RENDER_OPTION = "-r"
+    S_ARG_RENDER_ACTION = "store_true"
+    S_ARG_RENDER_DEST = "RENDER_DEST"
+    # I18N: render option help
+    S_ARG_RENDER_HELP = _(
+        "fix template files as they are copied, instead of after"
+    )
+
+    # batch option strings
+    S_ARG_BATCH_OPTION = "--batch"
+    S_ARG_BATCH_DEST = "BATCH_DEST"
+    # I18N: batch option help
+    S_ARG_BATCH_HELP = _(
+        "make all projects listed in FILE (json or toml) without asking"
+    )
+    # I18N: batch option value
+    S_ARG_BATCH_METAVAR = _("FILE")
+
+    # I18N: jobs option help (overrides base)
+    S_ARG_JOBS_HELP = _(
+        "number of files to fix at the same time, or number of projects to "
+        "make at the same time with --batch"
+    )
+
+    # I18N: batch file could not be read
+    # NB: fmt params are path and error
+    S_ERR_BATCH_LOAD = _("Could not load batch file {}: {}")
+    # I18N: batch file is toml but there is no tomllib
+    S_ERR_BATCH_TOML = _("TOML batch files need Python 3.11 or newer")
+    # I18N: batch entry is missing keys or has bad values
+    # NB: fmt param is entry number (starting at 1)
+    S_ERR_BATCH_SKIP = _("Skipping batch entry {}")
+    # I18N: how many batch projects were made
+    # NB: fmt params are projects made and projects in batch
+    S_MSG_BATCH = _("Made {} of {} projects")
+
+    # I18N: do_after_template changed the dicts used to render the project
+    S_ERR_RENDER = _(
+        "do_after_template changed the dunders or blacklist after the "
+        "template was rendered, make the project again without -r"
+    )
+
     # about string
     S_ABOUT = (
         f"{'PyPlate/PyMaker'}\n"
@@ -98,6 +157,40 @@ class PyMaker(B.PyPlateBase):
         "a project."
     )
 
+    # --------------------------------------------------------------------------
+    # Class variables
+    # --------------------------------------------------------------------------
+
+    # the object that makes projects in a --batch worker process
+    # NB: set by batch_init, in the worker only
+    _batch_obj = None
+
+    # --------------------------------------------------------------------------
+    # Instance methods
+    # --------------------------------------------------------------------------
+
+    # --------------------------------------------------------------------------
+    # Initialize the new object
+    # --------------------------------------------------------------------------
+    def __init__(self):
+        """
+        Initialize the new object
+
+        Initializes a new instance of the class, setting the default values
+        of its properties, and any other code that needs to run to create a
+        new object.
+        """
+
+        # do parent init
+        super().__init__()
+
+        # copy plans and template packs, by long type (reused by --batch)
+        self._dict_plans = {}
+        self._dict_packs = {}
+
+        # the reps and blacklist used by _do_render (None if not rendered)
+        self._render_used = None
+
     # --------------------------------------------------------------------------
     # Public methods
     # --------------------------------------------------------------------------
@@ -119,51 +212,152 @@ class PyMaker(B.PyPlateBase):
         # ----------------------------------------------------------------------
         # main stuff
 
-        # get project info
-        self._get_project_info()  # here
+        # make all projects in batch file
+        path_batch = self._dict_args.get(self.S_ARG_BATCH_DEST, None)
+        try:
+            if path_batch:
+                errcode = self._do_batch(Path(path_batch))  # here
+
+            # make one project
+            else:
+
+                # get project info
+                self._get_project_info()  # here
+
+                # make the project
+                self._make_project()  # here
+                errcode = 0
+
+        # done with template packs
+        finally:
+            self._close_packs()
 
         # ----------------------------------------------------------------------
+        # teardown
 
-        # print some info
-        print()
-        print(B.C.S_MSG_MAKE.format(self._dir_prj.name))
-        print()
+        # call boilerplate code
+        self._teardown(errcode)
 
-        # do before template
-        self._do_before_template()  # here/conf
+    # --------------------------------------------------------------------------
+    # The number of files/projects to make at the same time
+    # --------------------------------------------------------------------------
+    @property
+    def jobs(self):
+        """
+        The number of files/projects to make at the same time
 
-        # copy template
-        self._do_template()  # here
+        Returns:
+            The number of jobs from --jobs (at least 1)
+        """
 
-        # do before template
-        self._do_after_template()  # here/conf
+        return self._arg_jobs
 
-        # do any fixing up of dicts (like meta keywords, etc)
-        self._do_before_fix()  # super
+    # --------------------------------------------------------------------------
+    # Set the number of files/projects to make at the same time
+    # --------------------------------------------------------------------------
+    @jobs.setter
+    def jobs(self, value):
+        """
+        Set the number of files/projects to make at the same time
 
-        # do replacements in final project location
-        self._do_fix()  # super
+        Args:
+            value: The new number of jobs (less than 1 is 1)
+        """
 
-        # do extra stuff to final dir after fix
-        self._do_after_fix()  # super
+        self._arg_jobs = max(value, 1)
 
-        # done with project
-        print()
+    # --------------------------------------------------------------------------
+    # Make one project from a batch
+    # --------------------------------------------------------------------------
+    def make_batch_project(self, info):
+        """
+        Make one project from a batch
 
-        # NB: easier to parse path than get dunder
-        if B.C.B_ERROR:
-            print(self.S_ERR_MAKE.format(self._dir_prj.name))
-            if not B.C.B_DEBUG:
-                print(self.S_ERR_USE_D)
-        else:
-            print(B.C.S_MSG_MAKE_DONE.format(self._dir_prj.name))
+        Args:
+            info: The tuple from _get_batch_info
 
-        # ----------------------------------------------------------------------
-        # teardown
+        Returns:
+            True if the project was made without errors, False otherwise
 
-        # call boilerplate code
-        self._save_config()
-        self._teardown()
+        Resets the global state left by the last project, then makes the
+        project.
+        """
+
+        # reset global state from last project
+        B.C.B_ERROR = False
+        B.C.I_FILES_WRITTEN = 0
+        B.C.I_FILES_SKIPPED = 0
+        B.C.I_FILES_SCANNED = 0
+        B.C.I_LINES_SCANNED = 0
+        B.C.I_LINES_TOUCHED = 0
+        B.C.L_ACT_BG.clear()
+        self._ran_before_fix = False
+        self._render_used = None
+
+        # reset actions (may be changed by conf)
+        if self._arg_test:
+            self._dict_act = dict(D_PM_ACT)
+
+        # set project dir and dicts
+        prj_type, name_prj, name_sec, self._dir_prj = info
+        self._make_dicts(prj_type, name_prj, name_sec)
+
+        # make the project
+        return self._make_project()
+
+    # --------------------------------------------------------------------------
+    # Set up this object in a --batch worker process
+    # --------------------------------------------------------------------------
+    def batch_init(self, queue_log):
+        """
+        Set up this object in a --batch worker process
+
+        Args:
+            queue_log: The queue to send log records to
+
+        Saves the object for batch_make. Each worker fixes files one at a
+        time, since the workers already run at the same time. The worker's log
+        records are sent to the main process instead of the (forked) log file
+        handler.
+        """
+
+        # send log records to main process
+        for handler in list(self._logger.handlers):
+            self._logger.removeHandler(handler)
+        self._logger.addHandler(QueueHandler(queue_log))
+
+        # NB: worker only, does not change the main process
+        self.jobs = 1
+        PyMaker._batch_obj = self
+
+    # --------------------------------------------------------------------------
+    # Make one --batch project in a worker process
+    # --------------------------------------------------------------------------
+    @classmethod
+    def batch_make(cls, info):
+        """
+        Make one --batch project in a worker process
+
+        Args:
+            info: The tuple from _get_batch_info
+
+        Returns:
+            A tuple of the result from make_batch_project and the output of
+            the project
+
+        This is a class method so it can be sent to a worker by name, and it
+        uses the object saved by batch_init. The output is kept until the
+        project is done, so output from projects made at the same time is not
+        mixed together.
+        """
+
+        # make project, keep output
+        buf = io.StringIO()
+        with redirect_stdout(buf):
+            res = cls._batch_obj.make_batch_project(info)  # type: ignore
+
+        # return result and output
+        return (res, buf.getvalue())
 
     # --------------------------------------------------------------------------
     # Private methods
@@ -184,6 +378,22 @@ class PyMaker(B.PyPlateBase):
         # name to use for the usage string (defaults to pyplate)
         self._parser.prog = "pymaker"
 
+        # add render option
+        self._parser.add_argument(
+            self.S_ARG_RENDER_OPTION,
+            action=self.S_ARG_RENDER_ACTION,
+            dest=self.S_ARG_RENDER_DEST,
+            help=self.S_ARG_RENDER_HELP,
+        )
+
+        # add batch option
+        self._parser.add_argument(
+            self.S_ARG_BATCH_OPTION,
+            dest=self.S_ARG_BATCH_DEST,
+            help=self.S_ARG_BATCH_HELP,
+            metavar=self.S_ARG_BATCH_METAVAR,
+        )
+
         # do parent setup
         super()._setup()
 
@@ -220,20 +430,7 @@ class PyMaker(B.PyPlateBase):
         """
 
         # check version from conf
-        pattern = B.C.S_SEM_VER_VALID
-        version = B.C.D_PUB_META[B.C.S_KEY_META_VERSION]
-        ver_ok = B.re.search(pattern, version) is not None
-
-        # ask if user wants to keep invalid version or quit
-        if not ver_ok:
-            res = F.dialog(
-                B.C.S_ERR_SEM_VER,
-                [F.S_ASK_YES, F.S_ASK_NO],
-                default=F.S_ASK_NO,
-                # loop=True
-            )
-            if res != F.S_ASK_YES:
-                self._teardown(-1)
+        self._check_version()
 
         # ----------------------------------------------------------------------
         # first question is type
@@ -324,10 +521,6 @@ class PyMaker(B.PyPlateBase):
         # save global property
         self._dir_prj = tmp_dir
 
-        # save other names
-        name_prj_small = name_prj_big.lower()
-        name_prj_pascal = F.pascal_case(name_prj_small)
-
         # ----------------------------------------------------------------------
         # here we figure out the binary/package/window name for a project
 
@@ -336,9 +529,6 @@ class PyMaker(B.PyPlateBase):
         # for a package we should ask for the module name
 
         name_sec = ""
-        name_sec_big = ""
-        name_sec_small = ""
-        name_sec_pascal = ""
 
         # do we need a second name?
         if prj_type in B.C.D_NAME_SEC:
@@ -346,14 +536,12 @@ class PyMaker(B.PyPlateBase):
             # dup prj names if test mode
             if self._arg_test:
                 name_sec = name_prj
-                name_sec_big = name_prj_big
-                name_sec_small = name_prj_small
-                name_sec_pascal = name_prj_pascal
 
             # if not test mode, if need second name, ask for it
             else:
 
                 # format question for second name
+                name_prj_small = name_prj_big.lower()
                 s_sec_ask = B.C.D_NAME_SEC[prj_type]
                 s_sec_ask_fmt = s_sec_ask.format(name_prj_small)
 
@@ -370,31 +558,96 @@ class PyMaker(B.PyPlateBase):
 
                     # check for valid name
                     if self._check_name(name_sec):
-                        name_sec_big = name_sec.replace(" ", "_")
                         break
 
-                # save other names
-                name_sec_small = name_sec_big.lower()
-                name_sec_pascal = F.pascal_case(name_sec_small)
+        # ----------------------------------------------------------------------
+        # make dicts from names
+        self._make_dicts(prj_type, name_prj, name_sec)
+
+    # --------------------------------------------------------------------------
+    # Check version from conf
+    # --------------------------------------------------------------------------
+    def _check_version(self):
+        """
+        Check version from conf
+
+        Asks the user if they want to keep an invalid version in conf, or quit.
+        """
+
+        # check version from conf
+        pattern = B.C.S_SEM_VER_VALID
+        version = B.C.D_PUB_META[B.C.S_KEY_META_VERSION]
+        ver_ok = B.re.search(pattern, version) is not None
+
+        # ask if user wants to keep invalid version or quit
+        if not ver_ok:
+            res = F.dialog(
+                B.C.S_ERR_SEM_VER,
+                [F.S_ASK_YES, F.S_ASK_NO],
+                default=F.S_ASK_NO,
+                # loop=True
+            )
+            if res != F.S_ASK_YES:
+                self._teardown(-1)
+
+    # --------------------------------------------------------------------------
+    # Make project dicts from type and names
+    # --------------------------------------------------------------------------
+    def _make_dicts(self, prj_type, name_prj, name_sec):
+        """
+        Make project dicts from type and names
+
+        Args:
+            prj_type: The short (one letter) type of the project
+            name_prj: The name of the project
+            name_sec: The binary/package/window name of the project (ignored
+            if the type does not use one)
+
+        Makes the dicts for a new project from conf defaults, and saves the
+        names to self._dict_prv_prj.
+        """
+
+        # dir name, no spaces
+        name_prj_big = name_prj.replace(" ", "_")
+
+        # save other names
+        name_prj_small = name_prj_big.lower()
+        name_prj_pascal = F.pascal_case(name_prj_small)
+
+        # ----------------------------------------------------------------------
+        # get second names
+
+        name_sec_big = ""
+        name_sec_small = ""
+        name_sec_pascal = ""
+
+        # do we need a second name?
+        if prj_type in B.C.D_NAME_SEC:
+            name_sec_big = name_sec.replace(" ", "_")
+            name_sec_small = name_sec_big.lower()
+            name_sec_pascal = F.pascal_case(name_sec_small)
 
         # ----------------------------------------------------------------------
         # make dicts from conf defaults
 
+        # NB: deep copy so lists in conf are not changed by one project and
+        # seen by the next (pymaker --batch)
+
         # create global settings dicts in private.json
         self._dict_prv = {
-            B.C.S_KEY_PRV_ALL: dict(B.C.D_PRV_ALL),
-            B.C.S_KEY_PRV_PRJ: dict(B.C.D_PRV_PRJ),
+            B.C.S_KEY_PRV_ALL: copy.deepcopy(B.C.D_PRV_ALL),
+            B.C.S_KEY_PRV_PRJ: copy.deepcopy(B.C.D_PRV_PRJ),
         }
 
         # create individual dicts in project.json
         self._dict_pub = {
-            B.C.S_KEY_PUB_META: dict(B.C.D_PUB_META),
-            B.C.S_KEY_PUB_BL: dict(B.C.D_PUB_BL),
-            B.C.S_KEY_PUB_ACT: dict(B.C.D_PUB_ACT),
-            B.C.S_KEY_PUB_DIST: dict(B.C.D_PUB_DIST),
-            B.C.S_KEY_PUB_DOCS: dict(B.C.D_PUB_DOCS),
-            B.C.S_KEY_PUB_I18N: dict(B.C.D_PUB_I18N),
-            B.C.S_KEY_PUB_INST: dict(B.C.D_PUB_INST),
+            B.C.S_KEY_PUB_META: copy.deepcopy(B.C.D_PUB_META),
+            B.C.S_KEY_PUB_BL: copy.deepcopy(B.C.D_PUB_BL),
+            B.C.S_KEY_PUB_ACT: copy.deepcopy(B.C.D_PUB_ACT),
+            B.C.S_KEY_PUB_DIST: copy.deepcopy(B.C.D_PUB_DIST),
+            B.C.S_KEY_PUB_DOCS: copy.deepcopy(B.C.D_PUB_DOCS),
+            B.C.S_KEY_PUB_I18N: copy.deepcopy(B.C.D_PUB_I18N),
+            B.C.S_KEY_PUB_INST: copy.deepcopy(B.C.D_PUB_INST),
         }
 
         # ----------------------------------------------------------------------
@@ -429,6 +682,305 @@ class PyMaker(B.PyPlateBase):
         # get reps to fix public
         self._fix_dicts()
 
+    # --------------------------------------------------------------------------
+    # Make the project from the project dicts
+    # --------------------------------------------------------------------------
+    def _make_project(self):
+        """
+        Make the project from the project dicts
+
+        Returns:
+            True if the project was made without errors, False otherwise
+
+        Runs all the steps to make one project, after _get_project_info (or
+        _get_batch_info) has filled in the dicts.
+        """
+
+        # print some info
+        print()
+        print(B.C.S_MSG_MAKE.format(self._dir_prj.name))
+        print()
+
+        # group for --profile
+        phase = B.C.S_KEY_PROF_PHASE
+
+        # do before template
+        with B.profile(phase, "do_before_template"):
+            self._do_before_template()  # here/conf
+
+        # copy template
+        with B.profile(phase, "do_template"):
+            self._do_template()  # here
+
+        # do before template
+        with B.profile(phase, "do_after_template"):
+            self._do_after_template()  # here/conf
+
+        # make sure render mode used the right dicts
+        self._check_render()
+
+        # do any fixing up of dicts (like meta keywords, etc)
+        with B.profile(phase, "do_before_fix"):
+            self._do_before_fix()  # super
+
+        # do replacements in final project location
+        with B.profile(phase, "do_fix"):
+            self._do_fix()  # super
+
+        # do extra stuff to final dir after fix
+        with B.profile(phase, "do_after_fix"):
+            self._do_after_fix()  # super
+
+        # done with project
+        print()
+
+        # NB: easier to parse path than get dunder
+        if B.C.B_ERROR:
+            print(self.S_ERR_MAKE.format(self._dir_prj.name))
+            if not B.C.B_DEBUG:
+                print(self.S_ERR_USE_D)
+        else:
+            print(B.C.S_MSG_MAKE_DONE.format(self._dir_prj.name))
+
+        # save project config
+        self._save_config()
+
+        # return result
+        return not B.C.B_ERROR
+
+    # --------------------------------------------------------------------------
+    # Make all projects in a batch file
+    # --------------------------------------------------------------------------
+    def _do_batch(self, path_batch):
+        """
+        Make all projects in a batch file
+
+        Args:
+            path_batch: The json/toml file that lists the projects
+
+        Returns:
+            The exit code (0 if all projects were made without errors)
+
+        Makes every project in the batch file in this process, so the parsed
+        conf, compiled rules and template plans are reused. If --jobs is more
+        than 1, projects are made at the same time in worker processes (each
+        fixing its files one at a time), and their output is printed when each
+        project is done. With --profile, projects are always made one at a
+        time, so all the timings are in this process.
+        """
+
+        # check version from conf (only once)
+        self._check_version()
+
+        # load the list of projects
+        list_entries = self._load_batch(path_batch)
+        if list_entries is None:
+            return -1
+
+        # ----------------------------------------------------------------------
+        # check all entries before making anything
+
+        # NB: projects are made in cwd, same as interactive
+        dir_base = self._dir_prj
+        list_info = []
+        for index, entry in enumerate(list_entries):
+            info = self._get_batch_info(entry, dir_base, list_info)
+            if info is None:
+                print(self.S_ERR_BATCH_SKIP.format(index + 1))
+            else:
+                list_info.append(info)
+
+        # ----------------------------------------------------------------------
+        # make projects
+
+        # list of bools, one for each made project
+        list_res = []
+
+        # one at a time
+        # NB: --profile keeps its timings in this process, so don't fork
+        num_jobs = min(self.jobs, len(list_info))
+        if num_jobs <= 1 or B.C.PROF is not None:
+            for info in list_info:
+                list_res.append(self.make_batch_project(info))
+
+        # many at a time
+        # NB: fork so workers get this object (and conf) as is. this is only
+        # safe while this process has no other threads, so the listener
+        # thread is started after the workers exist
+        else:
+            ctx = multiprocessing.get_context("fork")
+
+            # workers send log records here, so only this process writes (and
+            # rotates) the log file
+            queue_log = ctx.Queue()
+            listener = QueueListener(queue_log, *self._logger.handlers)
+
+            with ProcessPoolExecutor(
+                max_workers=num_jobs,
+                mp_context=ctx,
+                initializer=self.batch_init,
+                initargs=(queue_log,),
+            ) as pool:
+
+                # NB: with fork, the pool starts all its workers on the first
+                # submit (it never forks more later)
+                futures = [
+                    pool.submit(PyMaker.batch_make, info) for info in list_info
+                ]
+                listener.start()
+
+                try:
+                    # print output in batch order
+                    for future in futures:
+                        res, output = future.result()
+                        print(output, end="")
+                        list_res.append(res)
+                finally:
+                    # NB: wait for workers to exit, so their last log records
+                    # are sent before the listener stops
+                    pool.shutdown()
+                    listener.stop()
+
+        # ----------------------------------------------------------------------
+        # summary
+
+        # print how many were made
+        num_ok = list_res.count(True)
+        msg = self.S_MSG_BATCH.format(num_ok, len(list_entries))
+        self._logger.info(msg)
+        print()
+        print(msg)
+
+        # NB: any skipped or failed project is an error
+        return 0 if num_ok == len(list_entries) else -1
+
+    # --------------------------------------------------------------------------
+    # Load the list of projects from a batch file
+    # --------------------------------------------------------------------------
+    def _load_batch(self, path_batch):
+        """
+        Load the list of projects from a batch file
+
+        Args:
+            path_batch: The json/toml file that lists the projects
+
+        Returns:
+            The list of project entries, or None if the file could not be read
+
+        A json file can be a list of entries, or a dict with a list of entries
+        under S_KEY_BATCH_PRJS. A toml file must use the dict form (ie. an
+        array of tables called "projects").
+        """
+
+        # toml needs tomllib
+        is_toml = path_batch.suffix.lower() == ".toml"
+        if is_toml and tomllib is None:
+            print(self.S_ERR_BATCH_TOML)
+            return None
+
+        # read file
+        try:
+            if is_toml:
+                with open(path_batch, "rb") as a_file:
+                    batch = tomllib.load(a_file)  # type: ignore
+            else:
+                with open(path_batch, "r", encoding=B.C.S_ENCODING) as a_file:
+                    batch = json.load(a_file)
+        except (OSError, ValueError) as e:
+            print(self.S_ERR_BATCH_LOAD.format(path_batch, e))
+            return None
+
+        # get list from dict
+        if isinstance(batch, dict):
+            batch = batch.get(B.C.S_KEY_BATCH_PRJS, None)
+
+        # must be a list by now
+        if not isinstance(batch, list):
+            print(self.S_ERR_BATCH_LOAD.format(path_batch, type(batch)))
+            return None
+
+        # return list of entries
+        return batch
+
+    # --------------------------------------------------------------------------
+    # Get project info from a batch entry
+    # --------------------------------------------------------------------------
+    def _get_batch_info(self, entry, dir_base, list_info):
+        """
+        Get project info from a batch entry
+
+        Args:
+            entry: The dict for one project in the batch file
+            dir_base: The dir to make the project in
+            list_info: The info for entries already checked (to find dups)
+
+        Returns:
+            A tuple of type, name, second name, and project dir, or None if
+            the entry is not valid
+
+        Does the same checks as _get_project_info, without asking.
+        """
+
+        # sanity check
+        if not isinstance(entry, dict):
+            return None
+
+        # ----------------------------------------------------------------------
+        # type
+
+        # check for valid type
+        prj_type = str(entry.get(B.C.S_KEY_BATCH_TYPE, ""))
+        if not self._check_type(prj_type):
+            return None
+        prj_type = prj_type[0].lower()
+
+        # ----------------------------------------------------------------------
+        # name
+
+        # check for valid name
+        name_prj = str(entry.get(B.C.S_KEY_BATCH_NAME, "")).strip(" ")
+        if not self._check_name(name_prj):
+            return None
+
+        # dir name, no spaces
+        name_prj_big = name_prj.replace(" ", "_")
+        tmp_dir = dir_base / name_prj_big
+
+        # check if project is already in batch
+        if any(info[3] == tmp_dir for info in list_info):
+            print(B.C.S_ERR_EXIST.format(name_prj_big))
+            return None
+
+        # check if project already exists
+        if tmp_dir.exists():
+
+            # nuke it in test mode, same as interactive
+            if self._arg_test:
+                shutil.rmtree(tmp_dir)
+            else:
+                print(B.C.S_ERR_EXIST.format(name_prj_big))
+                return None
+
+        # ----------------------------------------------------------------------
+        # second name
+
+        name_sec = ""
+
+        # do we need a second name?
+        if prj_type in B.C.D_NAME_SEC:
+
+            # empty, keep default (same as interactive)
+            name_sec = str(entry.get(B.C.S_KEY_BATCH_SEC, "")).strip(" ")
+            if name_sec == "":
+                name_sec = name_prj if self._arg_test else name_prj_big.lower()
+
+            # check for valid name
+            if not self._check_name(name_sec):
+                return None
+
+        # return info
+        return (prj_type, name_prj, name_sec, tmp_dir)
+
     # --------------------------------------------------------------------------
     # Do any work before template copy
     # --------------------------------------------------------------------------
@@ -458,15 +1010,7 @@ class PyMaker(B.PyPlateBase):
         """
 
         # ----------------------------------------------------------------------
-        # do template/all
-
-        # copy template/all
-        src = B.P_DIR_PRJ / B.C.S_DIR_TEMPLATE / B.C.S_DIR_ALL
-        dst = self._dir_prj
-        shutil.copytree(src, dst, dirs_exist_ok=True)
-
-        # ----------------------------------------------------------------------
-        # copy template/type
+        # get the long type of project
 
         # get some paths
         prj_type_short = self._dict_prv_prj["__PP_TYPE_PRJ__"]
@@ -478,38 +1022,465 @@ class PyMaker(B.PyPlateBase):
                 prj_type_long = item[2]
                 break
 
-        # get the src dir in the template dir
-        src = B.P_DIR_PRJ / B.C.S_DIR_TEMPLATE / prj_type_long
-        dst = self._dir_prj
-        shutil.copytree(src, dst, dirs_exist_ok=True)
+        # ----------------------------------------------------------------------
+        # make a plan
+
+        # get plan for type (relative to project)
+        dict_dirs, dict_files = self._get_plan(prj_type_long)
+
+        # dicts of dst: src for dirs and files
+        dict_dirs = {self._dir_prj / key: val for key, val in dict_dirs.items()}
+        dict_files = {
+            self._dir_prj / key: val for key, val in dict_files.items()
+        }
+
+        # get template pack
+        pack = self._get_pack(prj_type_long)
+
+        # fix files while copying them
+        if self._dict_args.get(self.S_ARG_RENDER_DEST, False):
+            self._do_render(dict_dirs, dict_files, pack)
+            self._merge_reqs(prj_type_long, pack)
+            return None
 
         # ----------------------------------------------------------------------
-        # do stuff outside template all/type
+        # do the plan
 
-        # copy linked files
-        for key, val in B.C.D_COPY.items():
+        # make all dirs first
+        for dst in dict_dirs:
+            dst.mkdir(parents=True, exist_ok=True)
 
-            # get src/dst
-            src = B.P_DIR_PRJ / key
-            dst = self._dir_prj / val
+        # copy packed files in one read
+        dict_files = pack.copy_all(dict_files)
 
-            # copy dir/file
-            if src.is_dir():
-                shutil.copytree(src, dst)
-            elif src.is_file():
-                shutil.copy2(src, dst)
+        # copy each file left once
+        with ThreadPoolExecutor(max_workers=B.C.I_COPY_JOBS) as pool:
+            futures = [
+                pool.submit(B.copy_file, src, dst)
+                for dst, src in dict_files.items()
+            ]
+
+            # wait for all and raise any errors
+            for future in futures:
+                future.result()
+
+        # copy dir stats last (copying files changes dir mtime)
+        for dst, src in dict_dirs.items():
+            shutil.copystat(src, dst)
 
         # ----------------------------------------------------------------------
         # merge reqs
 
         # merge reqs files from all and prj
-        self._merge_reqs(prj_type_long)
+        self._merge_reqs(prj_type_long, pack)
 
         # ----------------------------------------------------------------------
         # done
         # NB: None = pass, Exception = fail
         return None
 
+    # --------------------------------------------------------------------------
+    # Get the copy plan for a project type
+    # --------------------------------------------------------------------------
+    def _get_plan(self, prj_type_long):
+        """
+        Get the copy plan for a project type
+
+        Args:
+            prj_type_long: the folder in template for the current project type
+
+        Returns:
+            A tuple of dicts of dst: src for dirs and files, where dst is
+            relative to the project dir
+
+        The template is only walked once for each type, so --batch can reuse
+        the plan for every project of the same type.
+        """
+
+        # already have it
+        if prj_type_long in self._dict_plans:
+            return self._dict_plans[prj_type_long]
+
+        # NB: template/all, then template/type, then D_COPY, last one wins
+        list_src = [
+            (B.P_DIR_PRJ / B.C.S_DIR_TEMPLATE / B.C.S_DIR_ALL, Path()),
+            (B.P_DIR_PRJ / B.C.S_DIR_TEMPLATE / prj_type_long, Path()),
+        ]
+        list_src.extend(
+            (B.P_DIR_PRJ / key, Path(val)) for key, val in B.C.D_COPY.items()
+        )
+
+        # dicts of dst: src for dirs and files
+        dict_dirs = {}
+        dict_files = {}
+        for src, dst in list_src:
+            self._add_to_plan(src, dst, dict_dirs, dict_files)
+
+        # save and return plan
+        self._dict_plans[prj_type_long] = (dict_dirs, dict_files)
+        return self._dict_plans[prj_type_long]
+
+    # --------------------------------------------------------------------------
+    # Get the template pack for a project type
+    # --------------------------------------------------------------------------
+    def _get_pack(self, prj_type_long):
+        """
+        Get the template pack for a project type
+
+        Args:
+            prj_type_long: the folder in template for the current project type
+
+        Returns:
+            The PyPlatePack for the type
+
+        The pack has every file in the copy plan, plus the reqs files used by
+        _merge_reqs. It is loaded from the cache dir, or rebuilt if the
+        template has changed since it was made.
+        """
+
+        # already have it
+        if prj_type_long in self._dict_packs:
+            return self._dict_packs[prj_type_long]
+
+        # get files in plan, and reqs files
+        _dict_dirs, dict_files = self._get_plan(prj_type_long)
+        list_src = list(dict_files.values())
+        list_src.extend(
+            [
+                B.P_DIR_PRJ / B.C.S_FILE_REQS_ALL,
+                B.P_DIR_PRJ / B.C.S_FILE_REQS_TYPE.format(prj_type_long),
+            ]
+        )
+
+        # NB: different pyplate dirs need different packs
+        str_dir = str(B.P_DIR_PRJ).encode(B.C.S_ENCODING)
+        str_hash = hashlib.sha256(str_dir).hexdigest()[:8]
+        name_pack = B.C.S_PACK_FMT.format(prj_type_long, str_hash)
+
+        # load/build pack
+        pack = B.PyPlatePack(B.P_DIR_CACHE / name_pack, list_src)
+        self._dict_packs[prj_type_long] = pack
+        return pack
+
+    # --------------------------------------------------------------------------
+    # Close all the template packs
+    # --------------------------------------------------------------------------
+    def _close_packs(self):
+        """
+        Close all the template packs
+
+        The packs are kept open while making projects, so --batch can reuse
+        them. This closes them when all projects are made.
+        """
+
+        for pack in self._dict_packs.values():
+            pack.close()
+        self._dict_packs.clear()
+
+    # --------------------------------------------------------------------------
+    # Add a template dir/file to the copy plan
+    # --------------------------------------------------------------------------
+    def _add_to_plan(self, src, dst, dict_dirs, dict_files):
+        """
+        Add a template dir/file to the copy plan
+
+        Args:
+            src: The dir/file to copy
+            dst: Where to copy it to
+            dict_dirs: The dict of dst: src for dirs to make
+            dict_files: The dict of dst: src for files to copy
+
+        Adds every dir/file under src to the plan. A file that is already in
+        the plan is replaced, so later sources win (same as copying them in
+        order).
+        """
+
+        # single file
+        if src.is_file():
+            dict_files[dst] = src
+            return
+
+        # not a dir either, skip it (same as before)
+        if not src.is_dir():
+            return
+
+        # NB: follow symlinks, same as copytree
+        for root, _root_dirs, root_files in src.walk(follow_symlinks=True):
+
+            # add dir
+            dst_root = dst / root.relative_to(src)
+            dict_dirs[dst_root] = root
+
+            # add files
+            for item in root_files:
+                dict_files[dst_root / item] = root / item
+
+    # --------------------------------------------------------------------------
+    # Copy template files, fixing them on the way
+    # --------------------------------------------------------------------------
+    def _do_render(self, dict_dirs, dict_files, pack):
+        """
+        Copy template files, fixing them on the way
+
+        Args:
+            dict_dirs: The dict of dst: src for dirs to make
+            dict_files: The dict of dst: src for files to copy
+            pack: The PyPlatePack to read files from
+
+        This is the render mode of _do_template. Each file is read from the
+        template, run through the same line fixers as _do_fix, and written once
+        to its final (undunderized) path. The files are then added to the
+        manifest, so _do_fix skips them and only fixes files that were added or
+        changed by do_after_template.\n
+        The final reps are needed before the copy, so do_before_fix runs here,
+        before do_after_template (which needs the copied files). This is only
+        the same as the normal hook order if do_after_template does not change
+        the reps or blacklist, which _check_render makes sure of.
+        """
+
+        # _fix_dicts saves the public dict here
+        path_pub = self._dir_prj / B.C.S_PRJ_PUB_CFG
+        path_pub.parent.mkdir(parents=True, exist_ok=True)
+
+        # get the final reps now
+        # NB: _do_before_fix will not run the hook again
+        B.C.do_before_fix(
+            self._dir_prj, self._dict_prv, self._dict_pub, self._dict_act
+        )
+        self._ran_before_fix = True
+        self._fix_dicts()
+
+        # keep what was used, for _check_render
+        self._render_used = copy.deepcopy((self._dict_rep, self._dict_pub_bl))
+
+        # compile blacklist globs into matchers
+        dict_bl = {
+            key: B.PyPlateBlacklist(self._dir_prj, val)
+            for key, val in self._dict_pub_bl.items()
+        }
+
+        # ----------------------------------------------------------------------
+        # make final dirs
+
+        # dict of final dst: src for dirs
+        dict_dirs_new = {}
+        for dst, src in dict_dirs.items():
+            dst_new, _skip = self._get_render_path(dst, dict_bl)
+            dict_dirs_new[dst_new] = src
+            dst_new.mkdir(parents=True, exist_ok=True)
+
+        # ----------------------------------------------------------------------
+        # copy/fix files
+
+        # get the hash of the reps for the manifest
+        str_reps = self._get_reps_hash()
+
+        # copy each file once
+        # NB: packed files are read in one read, and fixed in the pool
+        with ThreadPoolExecutor(max_workers=B.C.I_COPY_JOBS) as pool:
+            futures = {
+                self._get_manifest_key(dst): pool.submit(
+                    self._render_file,
+                    src,
+                    dst,
+                    dict_bl,
+                    str_reps,
+                    (pack, data, entry),
+                )
+                for dst, src, data, entry in pack.read_plan(dict_files)
+            }
+
+            # wait for all and raise any errors
+            dict_man = {
+                key: future.result() for key, future in futures.items()
+            }
+
+        # copy dir stats last (copying files changes dir mtime)
+        for dst, src in dict_dirs_new.items():
+            shutil.copystat(src, dst)
+
+        # ----------------------------------------------------------------------
+        # tell _do_fix which files are done
+
+        # NB: raw copies have no entry
+        dict_man = {key: val for key, val in dict_man.items() if val}
+        self._save_manifest(dict_man)
+
+    # --------------------------------------------------------------------------
+    # Copy a template file, fixing it on the way
+    # --------------------------------------------------------------------------
+    def _render_file(self, src, dst, dict_bl, str_reps, packed):
+        """
+        Copy a template file, fixing it on the way
+
+        Args:
+            src: The template file
+            dst: The path in the project, before renaming
+            dict_bl: The dict of blacklist matchers
+            str_reps: The hash of the reps for this fix
+            packed: A tuple of the PyPlatePack, and the file's contents and
+            index entry from the pack (None if it is not packed)
+
+        Returns:
+            The manifest entry for the fixed file, or None if it was copied
+            without fixing
+
+        Uses the same blacklist rules as _do_fix to decide whether to fix the
+        header/code or just copy the file.
+        """
+
+        # get final path
+        dst_new, skip = self._get_render_path(dst, dict_bl)
+
+        # get pack info
+        pack, data, entry = packed
+        if entry:
+            is_bin = entry[B.C.S_KEY_PACK_BIN]
+        else:
+            is_bin = B.is_binary(src)
+
+        # skip_all, skip_contents, or binary, just copy
+        skip_contents = dict_bl[B.C.S_KEY_SKIP_CONTENTS]
+        if (
+            skip
+            or skip_contents.match(dst.parent)
+            or skip_contents.match(dst)
+            or is_bin
+        ):
+            if entry:
+                pack.write(dst_new, data, entry)
+            else:
+                B.copy_file(src, dst_new)
+            return None
+
+        # get blacklist flags
+        skip_header = dict_bl[B.C.S_KEY_SKIP_HEADER]
+        skip_code = dict_bl[B.C.S_KEY_SKIP_CODE]
+        bl_hdr = skip_header.match(dst.parent) or skip_header.match(dst)
+        bl_code = skip_code.match(dst.parent) or skip_code.match(dst)
+
+        # get fixer using name before renaming (same as _do_fix)
+        fix_lines = self._get_fix_lines(dst, bl_hdr, bl_code)
+
+        # get manifest reps
+        str_reps = self._get_reps_key(str_reps, bl_hdr, bl_code)
+
+        # packed file, fix in memory
+        if entry:
+            lines = pack.read_lines(src, data)
+            text = self._run_fix_lines(fix_lines, lines)
+
+            # nothing to fix, write contents (keeps times)
+            if text == "".join(lines):
+                pack.write(dst_new, data, entry)
+                return self._make_manifest_entry(
+                    dst_new, str_reps, entry[B.C.S_KEY_PACK_HASH]
+                )
+
+            # write fixed text
+            B.write_if_changed(dst_new, text)
+            os.chmod(dst_new, entry[B.C.S_KEY_PACK_MODE])
+
+        # big file, stream it
+        elif src.stat().st_size > B.C.I_STREAM_SIZE:
+            with open(src, "r", encoding=B.C.S_ENCODING) as a_in, open(
+                dst_new, "w", encoding=B.C.S_ENCODING
+            ) as a_out:
+                a_out.writelines(fix_lines(a_in))
+            shutil.copymode(src, dst_new)
+
+        # small file, fix in memory
+        else:
+            with open(src, "r", encoding=B.C.S_ENCODING) as a_file:
+                lines = a_file.readlines()
+            text = self._run_fix_lines(fix_lines, lines)
+
+            # nothing to fix, do a normal copy (keeps times)
+            if text == "".join(lines):
+                B.copy_file(src, dst_new)
+            else:
+                B.write_if_changed(dst_new, text)
+                shutil.copymode(src, dst_new)
+
+        # make manifest entry
+        return self._make_manifest_entry(dst_new, str_reps)
+
+    # --------------------------------------------------------------------------
+    # Get the final path of a template dir/file
+    # --------------------------------------------------------------------------
+    def _get_render_path(self, path, dict_bl):
+        """
+        Get the final path of a template dir/file
+
+        Args:
+            path: The path in the project, before renaming
+            dict_bl: The dict of blacklist matchers
+
+        Returns:
+            A tuple of the final path and whether the path is in skip_all
+
+        Replaces dunders in each part of the path, like _fix_path does in
+        _do_fix. Parts in (or under) a skip_all dir are not renamed, since
+        _do_fix never walks into them.
+        """
+
+        # start at project dir
+        skip_all = dict_bl[B.C.S_KEY_SKIP_ALL]
+        skip = skip_all.match(self._dir_prj)
+        path_old = self._dir_prj
+        path_new = self._dir_prj
+
+        # for each part of the path
+        for part in path.relative_to(self._dir_prj).parts:
+            path_old = path_old / part
+
+            # once skipped, always skipped
+            skip = skip or skip_all.match(path_old)
+            if skip:
+                path_new = path_new / part
+            else:
+                path_new = path_new / self._reps.replace(part)
+
+        # return final path and skip flag
+        return (path_new, skip)
+
+    # --------------------------------------------------------------------------
+    # Check that do_after_template did not change what render mode used
+    # --------------------------------------------------------------------------
+    def _check_render(self):
+        """
+        Check that do_after_template did not change what render mode used
+
+        Returns:
+            True if the project was not rendered, or was rendered with the
+            same reps and blacklist that _do_fix will use, False otherwise
+
+        Render mode fixes files before do_after_template runs, so if that hook
+        changes a dunder or the blacklist, the rendered files are wrong and
+        can't be fixed again. Then the project is marked as an error, so the
+        user can make it again without -r.
+        """
+
+        # not rendered (or already checked)
+        if self._render_used is None:
+            return True
+        dict_rep, dict_bl = self._render_used
+        self._render_used = None
+
+        # NB: same as _fix_dicts makes them
+        dict_rep_new = (
+            self._dict_prv[B.C.S_KEY_PRV_ALL]
+            | self._dict_prv[B.C.S_KEY_PRV_PRJ]
+        )
+        dict_bl_new = self._dict_pub[B.C.S_KEY_PUB_BL]
+        if dict_rep_new == dict_rep and dict_bl_new == dict_bl:
+            return True
+
+        # refuse render mode
+        print(self.S_ERR_RENDER)
+        B.C.B_ERROR = True
+        return False
+
     # --------------------------------------------------------------------------
     # Do any work after template copy
     # --------------------------------------------------------------------------
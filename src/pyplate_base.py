@@ -20,11 +20,41 @@ This is the base class that contains code common to both PyMaker and PyBaker.
 
 # system imports
 import argparse
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+import cProfile
+import filecmp
+from functools import lru_cache, partial
+import gzip
+import hashlib
+import io
+import itertools
+import json
 import logging
 from logging.handlers import RotatingFileHandler
+import lzma
+import os
 from pathlib import Path
 import re
+import shutil
+import struct
 import sys
+import tarfile
+import tempfile
+import threading
+import time
+import zlib
+
+# NB: zstd is 3.14+, or the zstandard package, the zsttar codec needs one
+try:
+    from compression import zstd  # type: ignore
+except ImportError:
+    zstd = None
+try:
+    import zstandard  # type: ignore
+except ImportError:
+    zstandard = None
 
 # cnlib imports
 from cnlib import cnfunctions as F  # type: ignore
@@ -42,10 +72,19 @@ P_DIR_LOG = P_DIR_PRJ / "log"
 # NB: if not using, set to None
 P_LOG_DEF = P_DIR_LOG / "pyplate.log"
 
+# dir for template packs (see PyPlatePack) and project caches (see
+# get_cache_dir)
+P_DIR_CACHE = (
+    Path(os.environ.get("XDG_CACHE_HOME", Path.home() / ".cache")) / "pyplate"
+)
+
 # path to uninst
 P_UNINST = P_DIR_PRJ / "install/uninstall.py"
 P_UNINST_DBG = P_DIR_PRJ / "install/uninstall.py -d"
 
+# ioctl to clone a file (copy-on-write, for btrfs/xfs/etc)
+I_FICLONE = 0x40049409
+
 # ------------------------------------------------------------------------------
 # local imports
 
@@ -61,6 +100,13 @@ import conf.conf as C
 DIR_LOCALE = P_DIR_PRJ / "i18n/locale"
 _ = F.get_underscore("pyplate", DIR_LOCALE)
 
+# env var for a fixed mtime in archives (see get_archive_mtime)
+S_ENV_SDE = "SOURCE_DATE_EPOCH"
+
+# index of type rules by lower case ext/name, built on first get_type_rules
+# NB: values are (order of group in D_TYPE_RULES, rules w/ compiled regexes)
+D_TYPE_INDEX = {}
+
 # ------------------------------------------------------------------------------
 # Classes
 # ------------------------------------------------------------------------------
@@ -132,6 +178,25 @@ class PyPlateBase:
     # I18N: uninstall option help
     S_ARG_UNINST_HELP = _("uninstall this program")
 
+    # jobs option
+    S_ARG_JOBS_OPTION = "--jobs"
+    S_ARG_JOBS_DEST = "JOBS_DEST"
+    # I18N: jobs option help
+    S_ARG_JOBS_HELP = _("number of files to fix at the same time")
+    # I18N: jobs option value
+    S_ARG_JOBS_METAVAR = _("N")
+
+    # profile option
+    S_ARG_PROF_OPTION = "--profile"
+    S_ARG_PROF_DEST = "PROF_DEST"
+    # I18N: profile option help
+    S_ARG_PROF_HELP = _(
+        "print how long each step took, and save the timings to FILE (.json) "
+        "or save a cProfile of the main thread to FILE (any other name)"
+    )
+    # I18N: profile option value
+    S_ARG_PROF_METAVAR = _("FILE")
+
     # I18N if using argparse, add help at end of about
     S_USE_HELP = _("use -h for help")
 
@@ -143,6 +208,13 @@ class PyPlateBase:
         "WARNING! YOU ARE IN TEST MODE!\nIT IS POSSIBLE TO OVERWRITE EXISTING PROJECTS!"
     )
 
+    # I18N: how many files were written or skipped (unchanged)
+    # NB: fmt params are written count and skipped count
+    S_MSG_WRITES = _("Files written: {}, files unchanged: {}")
+    # I18N: how many files/lines were read by the fixers, and lines fixed
+    # NB: fmt params are files scanned, lines touched, and lines scanned
+    S_MSG_SCANS = _("Files scanned: {}, lines touched: {} of {}")
+
     # --------------------------------------------------------------------------
     # errors
 
@@ -185,14 +257,16 @@ class PyPlateBase:
         self._dict_args = {}
         self._arg_debug = False
         self._arg_test = False
+        self._arg_jobs = C.I_JOBS_DEF
 
         # internal props
         self._dir_prj = Path()
         self._dict_rep = {}
+        self._reps = PyPlateReps({})
         self._dict_act = {}
-        self._dict_type_rules = {}
-        self._dict_sw_block = {}
-        self._dict_sw_line = {}
+
+        # whether do_before_fix already ran for this project (render mode)
+        self._ran_before_fix = False
 
         # private.json dicts
         self._dict_prv = {}
@@ -218,33 +292,35 @@ class PyPlateBase:
 
         # ----------------------------------------------------------------------
 
-        # set switch dicts to defaults
-        self._dict_sw_block = dict(C.D_SWITCH_DEF)
-        self._dict_sw_line = dict(C.D_SWITCH_DEF)
+        # get logger
+        self._logger = logging.getLogger(self.S_APP_NAME)
+        self._logger.setLevel(logging.INFO)
 
-        # ----------------------------------------------------------------------
+        # NB: only add handler once per process, or every line is logged again
+        # for each new object
+        if not self._logger.handlers:
 
-        # make log folder
-        if not P_DIR_LOG.exists():
-            Path.mkdir(P_DIR_LOG)
+            # make log folder
+            if not P_DIR_LOG.exists():
+                Path.mkdir(P_DIR_LOG)
 
-        # make a rotating handler
-        handler = RotatingFileHandler(
-            str(P_LOG_DEF),
-            maxBytes=C.I_LOG_SIZE,
-            backupCount=C.I_LOG_COUNT,
-        )
+            # make a rotating handler
+            handler = RotatingFileHandler(
+                str(P_LOG_DEF),
+                maxBytes=C.I_LOG_SIZE,
+                backupCount=C.I_LOG_COUNT,
+            )
 
-        # add a formatter to rot handler
-        formatter = logging.Formatter(C.S_LOG_FMT, datefmt=C.S_LOG_DATE_FMT)
+            # add a formatter to rot handler
+            formatter = logging.Formatter(
+                C.S_LOG_FMT, datefmt=C.S_LOG_DATE_FMT
+            )
 
-        # set formatter to handler
-        handler.setFormatter(formatter)
+            # set formatter to handler
+            handler.setFormatter(formatter)
 
-        # create logger and add rot handler
-        self._logger = logging.getLogger(self.S_APP_NAME)
-        self._logger.setLevel(logging.INFO)
-        self._logger.addHandler(handler)
+            # add rot handler to logger
+            self._logger.addHandler(handler)
 
         # ----------------------------------------------------------------------
 
@@ -305,6 +381,28 @@ class PyPlateBase:
             help=self.S_ARG_UNINST_HELP,
         )
 
+        # add jobs option
+        self._parser.add_argument(
+            self.S_ARG_JOBS_OPTION,
+            dest=self.S_ARG_JOBS_DEST,
+            help=self.S_ARG_JOBS_HELP,
+            metavar=self.S_ARG_JOBS_METAVAR,
+            type=int,
+            default=C.I_JOBS_DEF,
+        )
+
+        # add profile option
+        # NB: no FILE just prints the table
+        self._parser.add_argument(
+            self.S_ARG_PROF_OPTION,
+            dest=self.S_ARG_PROF_DEST,
+            help=self.S_ARG_PROF_HELP,
+            metavar=self.S_ARG_PROF_METAVAR,
+            nargs="?",
+            const="",
+            default=None,
+        )
+
         # run the parser
         args = {}
         try:
@@ -348,6 +446,20 @@ class PyPlateBase:
             # uninstall and exit
             self._handle_u()
 
+        # ----------------------------------------------------------------------
+        # check for --jobs
+
+        # NB: less than 1 means no pool
+        self._arg_jobs = max(self._dict_args[self.S_ARG_JOBS_DEST], 1)
+
+        # ----------------------------------------------------------------------
+        # check for --profile
+
+        # start timing
+        path_prof = self._dict_args[self.S_ARG_PROF_DEST]
+        if path_prof is not None:
+            C.PROF = PyPlateProfile(path_prof or None)
+
         # ----------------------------------------------------------------------
         # print default about text
         print()
@@ -376,6 +488,11 @@ class PyPlateBase:
         Perform some mundane stuff like saving config files.
         """
 
+        # print timings
+        if C.PROF:
+            C.PROF.report()
+            C.PROF = None
+
         # print last blank
         print()
 
@@ -491,12 +608,18 @@ class PyPlateBase:
         'dict_pub' dicts before any replacement occurs.
         """
 
-        C.do_before_fix(
-            self._dir_prj,
-            self._dict_prv,
-            self._dict_pub,
-            self._dict_act,
-        )
+        # NB: render mode runs it early, to get the final reps
+        if not self._ran_before_fix:
+            C.do_before_fix(
+                self._dir_prj,
+                self._dict_prv,
+                self._dict_pub,
+                self._dict_act,
+            )
+
+        # walk the project once, for fix and all the actions after it
+        # NB: after the hook, so files it makes get fixed too
+        make_index(self._dir_prj)
 
     # --------------------------------------------------------------------------
     # Scan dirs/files in the project for replacing text
@@ -508,7 +631,9 @@ class PyPlateBase:
 
         Scans for dirs/files under the project's location. For each dir/file it
         encounters, it passes the path to a filter to determine if the file
-        needs fixing based on its appearance in the blacklist.
+        needs fixing based on its appearance in the blacklist. File contents
+        are fixed first (using a pool if --jobs is more than 1), then dirs/files
+        are renamed from the bottom up.
         """
 
         # last chance to do shit w/ dicts
@@ -516,22 +641,11 @@ class PyPlateBase:
 
         # ----------------------------------------------------------------------
 
-        # fix up blacklist and convert relative or glob paths to absolute Path
-        # objects
-
-        # get a read-only copy of the blacklist
-        dict_bl = dict(self._dict_pub_bl)
-
-        # for each section of blacklist
-        for key, val in dict_bl.items():
-
-            # convert all items in list to Path objects
-            list_res = []
-            for item in val:
-                res = list(self._dir_prj.glob(item))
-                list_res.extend(res)
-
-            dict_bl[key] = list_res
+        # compile blacklist globs into matchers
+        dict_bl = {
+            key: PyPlateBlacklist(self._dir_prj, val)
+            for key, val in self._dict_pub_bl.items()
+        }
 
         # just shorten the names
         skip_all = dict_bl[C.S_KEY_SKIP_ALL]
@@ -540,48 +654,104 @@ class PyPlateBase:
         skip_code = dict_bl[C.S_KEY_SKIP_CODE]
 
         # ----------------------------------------------------------------------
-        # do the fixes
+        # find the fixes
+
+        # list of (path, bl_hdr, bl_code) for content fixes
+        list_contents = []
+
+        # list of dirs/files to rename, in walk order
+        list_paths = []
+
         # NB: root is a full path, dirs and files are relative to root
-        for root, root_dirs, root_files in self._dir_prj.walk():
+        index = get_index(self._dir_prj)
+        for root, root_dirs, root_files in index.walk():
 
             # handle dirs in skip_all
-            if root in skip_all:
+            if skip_all.match(root):
                 # NB: don't recurse into sub folders
                 root_dirs.clear()
                 continue
 
+            # check the dir once for all its files
+            root_contents = skip_contents.match(root)
+            root_header = skip_header.match(root)
+            root_code = skip_code.match(root)
+
             # convert files into Paths
             files = [root / f for f in root_files]
 
             # for each file item
             for item in files:
 
-                # for each new file, reset block and line switches to def
-                # NB: line switches always default to current block switches
-                self._dict_sw_block = dict(C.D_SWITCH_DEF)
-                self._dict_sw_line = dict(self._dict_sw_block)
-
                 # handle files in skip_all
-                if item in skip_all:
+                if skip_all.match(item):
                     continue
 
                 # handle dirs/files in skip_contents
-                if not root in skip_contents and not item in skip_contents:
+                # NB: binary files are skipped even if not in the blacklist
+                if (
+                    not root_contents
+                    and not skip_contents.match(item)
+                    and not is_binary(item)
+                ):
 
                     # handle dirs/files in skip_header
-                    bl_hdr = root in skip_header or item in skip_header
+                    bl_hdr = root_header or skip_header.match(item)
 
                     # handle dirs/files in skip_code
-                    bl_code = root in skip_code or item in skip_code
+                    bl_code = root_code or skip_code.match(item)
 
-                    # fix content with appropriate dict
-                    self._fix_contents(item, bl_hdr, bl_code)
+                    # fix content later
+                    list_contents.append((item, bl_hdr, bl_code))
 
                 # handle file paths with dunders
-                self._fix_path(item)
+                list_paths.append(item)
 
             # handle dirs with dunders
-            self._fix_path(root)
+            list_paths.append(root)
+
+        # ----------------------------------------------------------------------
+        # fix contents
+
+        # get the state of each file after the last fix
+        dict_man_old = self._load_manifest()
+
+        # get the hash of the reps that will be used for this fix
+        str_reps = self._get_reps_hash()
+
+        # the state of each file after this fix
+        # NB: key is the path relative to the project, after renaming
+        keys = [self._get_manifest_key(item[0]) for item in list_contents]
+        args = [
+            (*item, dict_man_old.get(key, None), str_reps)
+            for item, key in zip(list_contents, keys)
+        ]
+
+        # NB: each file gets its own switch dicts, so files can be fixed in
+        # any order
+        if self._arg_jobs > 1 and len(args) > 1:
+            with ThreadPoolExecutor(max_workers=self._arg_jobs) as pool:
+                futures = [pool.submit(self._fix_file, *arg) for arg in args]
+
+                # wait for all and raise any errors
+                entries = [future.result() for future in futures]
+        else:
+            entries = [self._fix_file(*arg) for arg in args]
+
+        # ----------------------------------------------------------------------
+        # fix paths
+
+        # NB: rename deepest paths first, so no parent is renamed before its
+        # children (sort is stable, so ties stay in walk order)
+        list_paths.sort(key=lambda path: len(path.parts), reverse=True)
+        for item in list_paths:
+            self._fix_path(item)
+
+        # ----------------------------------------------------------------------
+        # save the state of each file for the next fix
+
+        # NB: files that are gone are dropped from the manifest
+        self._save_manifest(dict(zip(keys, entries)))
 
         # done
         # NB: None = pass, Exception = fail
@@ -607,10 +777,220 @@ class PyPlateBase:
             self._dict_act,
         )
 
+        # report how many files were actually written
+        msg = self.S_MSG_WRITES.format(C.I_FILES_WRITTEN, C.I_FILES_SKIPPED)
+        self._logger.info(msg)
+        F.printd(msg)
+
+        # report how many lines needed fixing
+        msg = self.S_MSG_SCANS.format(
+            C.I_FILES_SCANNED, C.I_LINES_TOUCHED, C.I_LINES_SCANNED
+        )
+        self._logger.info(msg)
+        F.printd(msg)
+
     # --------------------------------------------------------------------------
     # These are minor steps called from the main steps
     # --------------------------------------------------------------------------
 
+    # --------------------------------------------------------------------------
+    # Fix a file's contents if it has changed since the last fix
+    # --------------------------------------------------------------------------
+    def _fix_file(self, path, bl_hdr, bl_code, entry_old, str_reps):
+        """
+        Fix a file's contents if it has changed since the last fix
+
+        Args:
+            path: Path for replacing text
+            bl_hdr: Whether the file is blacklisted for header lines
+            bl_code: Whether the file is blacklisted for code lines
+            entry_old: The manifest entry for the file from the last fix, or
+            None
+            str_reps: The hash of the reps for this fix
+
+        Returns:
+            The manifest entry for the file after this fix
+
+        Skips the file if it has the same content and was fixed with the same
+        reps and blacklist flags as the last fix. Otherwise it calls
+        _fix_contents. The stat (mtime/size) is checked first, so unchanged
+        files are not even read.
+        """
+
+        # blacklist flags change the result, so they are part of the reps
+        str_reps = self._get_reps_key(str_reps, bl_hdr, bl_code)
+
+        # check if file is the same as last fix
+        if entry_old and entry_old.get(C.S_KEY_MAN_REPS, None) == str_reps:
+
+            # same mtime/size, assume same content
+            stat = path.stat()
+            if (
+                entry_old.get(C.S_KEY_MAN_MTIME, None) == stat.st_mtime_ns
+                and entry_old.get(C.S_KEY_MAN_SIZE, None) == stat.st_size
+            ):
+                return entry_old
+
+            # file was touched, but content is the same
+            str_hash = self._get_file_hash(path)
+            if entry_old.get(C.S_KEY_MAN_HASH, None) == str_hash:
+                return self._make_manifest_entry(path, str_reps, str_hash)
+
+        # new or changed file, fix it
+        with profile_file(path):
+            self._fix_contents(path, bl_hdr, bl_code)
+
+        # get the state after fixing
+        return self._make_manifest_entry(path, str_reps)
+
+    # --------------------------------------------------------------------------
+    # Get the hash of the reps for this fix
+    # --------------------------------------------------------------------------
+    def _get_reps_hash(self):
+        """
+        Get the hash of the reps for this fix
+
+        Returns:
+            The hex digest of self._dict_rep
+        """
+
+        # hash a stable dump of the dict
+        return hashlib.sha256(
+            json.dumps(self._dict_rep, sort_keys=True, default=str).encode()
+        ).hexdigest()
+
+    # --------------------------------------------------------------------------
+    # Get the reps value for a file's manifest entry
+    # --------------------------------------------------------------------------
+    def _get_reps_key(self, str_reps, bl_hdr, bl_code):
+        """
+        Get the reps value for a file's manifest entry
+
+        Args:
+            str_reps: The hash of the reps for this fix
+            bl_hdr: Whether the file is blacklisted for header lines
+            bl_code: Whether the file is blacklisted for code lines
+
+        Returns:
+            The reps hash with the file's blacklist flags added
+        """
+
+        # blacklist flags change the result, so they are part of the reps
+        return f"{str_reps}:{int(bl_hdr)}{int(bl_code)}"
+
+    # --------------------------------------------------------------------------
+    # Make a manifest entry for a file that has just been fixed
+    # --------------------------------------------------------------------------
+    def _make_manifest_entry(self, path, str_reps, str_hash=None):
+        """
+        Make a manifest entry for a file that has just been fixed
+
+        Args:
+            path: The fixed file
+            str_reps: The reps value from _get_reps_key
+            str_hash: The hash of the file's contents, if already known
+            (default: None)
+
+        Returns:
+            The manifest entry for the file
+        """
+
+        # get current state of file
+        stat = path.stat()
+        if str_hash is None:
+            str_hash = self._get_file_hash(path)
+
+        # make entry
+        return {
+            C.S_KEY_MAN_MTIME: stat.st_mtime_ns,
+            C.S_KEY_MAN_SIZE: stat.st_size,
+            C.S_KEY_MAN_HASH: str_hash,
+            C.S_KEY_MAN_REPS: str_reps,
+        }
+
+    # --------------------------------------------------------------------------
+    # Get the hash of a file's contents
+    # --------------------------------------------------------------------------
+    def _get_file_hash(self, path):
+        """
+        Get the hash of a file's contents
+
+        Args:
+            path: The file to hash
+
+        Returns:
+            The hex digest of the file's contents
+        """
+
+        # read the whole file as bytes and hash it
+        with open(path, "rb") as a_file:
+            return hashlib.sha256(a_file.read()).hexdigest()
+
+    # --------------------------------------------------------------------------
+    # Get the key for a file in the manifest
+    # --------------------------------------------------------------------------
+    def _get_manifest_key(self, path):
+        """
+        Get the key for a file in the manifest
+
+        Args:
+            path: The file to get the key for
+
+        Returns:
+            The path relative to the project, with dunders replaced
+
+        The key is the path the file will have after _fix_path, so the next fix
+        can find it.
+        """
+
+        # replace dunders in each part, same as _fix_path
+        rel = path.relative_to(self._dir_prj)
+        parts = [self._reps.replace(part) for part in rel.parts]
+        return "/".join(parts)
+
+    # --------------------------------------------------------------------------
+    # Load the manifest from the last fix
+    # --------------------------------------------------------------------------
+    def _load_manifest(self):
+        """
+        Load the manifest from the last fix
+
+        Returns:
+            The dict of manifest entries, or an empty dict if there is no
+            manifest (or it can't be read)
+        """
+
+        # no manifest, fix everything
+        path_man = get_cache_dir(self._dir_prj) / C.S_FILE_MANIFEST
+        if not path_man.exists():
+            return {}
+
+        try:
+            # load manifest
+            return F.load_paths_into_dict([path_man])
+        except OSError as e:  # from load_dict
+            F.printd(C.S_ERR_ERR, str(e))
+            return {}
+
+    # --------------------------------------------------------------------------
+    # Save the manifest for the next fix
+    # --------------------------------------------------------------------------
+    def _save_manifest(self, dict_man):
+        """
+        Save the manifest for the next fix
+
+        Args:
+            dict_man: The dict of manifest entries to save
+        """
+
+        try:
+            # save manifest
+            path_man = get_cache_dir(self._dir_prj) / C.S_FILE_MANIFEST
+            path_man.parent.mkdir(parents=True, exist_ok=True)
+            F.save_dict_into_paths(dict_man, [path_man])
+        except OSError as e:  # from save_dict
+            F.printd(C.S_ERR_ERR, str(e))
+
     # --------------------------------------------------------------------------
     # Fix header or code for each line in a file
     # --------------------------------------------------------------------------
@@ -629,30 +1009,90 @@ class PyPlateBase:
         header line or a code line. Ignore blank lines and comment-only lines.
         """
 
+        # fix each line and write file
+        fix_lines = self._get_fix_lines(path, bl_hdr, bl_code)
+        self._write_lines(path, fix_lines)
+
+    # --------------------------------------------------------------------------
+    # Get the line fixer for a file
+    # --------------------------------------------------------------------------
+    def _get_fix_lines(self, path, bl_hdr, bl_code):
+        """
+        Get the line fixer for a file
+
+        Args:
+            path: Path of the file (only the name is used)
+            bl_hdr: Whether the file is blacklisted for header lines
+            bl_code: Whether the file is blacklisted for code lines
+
+        Returns:
+            A generator function that takes an iterable of lines and yields
+            the fixed lines
+        """
+
         # check for unknown file types
-        self._dict_type_rules = get_type_rules(path)
-        if not self._dict_type_rules or len(self._dict_type_rules) == 0:
+        dict_type_rules = get_type_rules(path)
+        if not dict_type_rules or len(dict_type_rules) == 0:
 
             # do the basic replace (file got here after skip_all/skip_contents
             # BUT NOT skip_hdr/skip_code)
-            self._fix_text(path)
-            return
+            return self._fix_text_lines
+
+        # fix header/code using type rules
+        return partial(
+            self._fix_lines,
+            dict_type_rules=dict_type_rules,
+            bl_hdr=bl_hdr,
+            bl_code=bl_code,
+        )
 
-        # default lines
-        lines = []
+    # --------------------------------------------------------------------------
+    # Fix header or code for each line in a list/file
+    # --------------------------------------------------------------------------
+    def _fix_lines(self, lines, dict_type_rules, bl_hdr, bl_code):
+        """
+        Fix header or code for each line in a list/file
 
-        # open and read file
-        with open(path, "r", encoding=C.S_ENCODING) as a_file:
-            lines = a_file.readlines()
+        Args:
+            lines: An iterable of lines (a list or an open file)
+            dict_type_rules: The type rules for the file
+            bl_hdr: Whether the file is blacklisted for header lines
+            bl_code: Whether the file is blacklisted for code lines
+
+        Yields:
+            Each line, fixed or not
+
+        This is a generator so a file can be fixed without reading it all into
+        memory. It yields exactly one line for each line it reads.
+        """
+
+        # for each new file, reset block and line switches to def
+        # NB: line switches always default to current block switches
+        # NB: these are local so files can be fixed in parallel
+        dict_sw_block = dict(C.D_SWITCH_DEF)
+        dict_sw_line = dict(dict_sw_block)
+
+        # count lines for this file (added to conf at the end)
+        num_scanned = 0
+        num_touched = 0
 
-        # for each line in array
-        for index, line in enumerate(lines):
+        # for each line in file
+        for line in lines:
+            num_scanned += 1
 
             # ------------------------------------------------------------------
             # skip blank lines
             if line.strip() == "":
+                yield line
                 continue
 
+            # ------------------------------------------------------------------
+            # skip lines the fixers would not change (no regex work)
+            if not self._needs_fix(line):
+                yield line
+                continue
+            num_touched += 1
+
             # ------------------------------------------------------------------
             # split the line into code and comm
 
@@ -663,14 +1103,14 @@ class PyPlateBase:
             comm = ""
 
             # find split sequence
-            split_sch = self._dict_type_rules.get(C.S_KEY_SPLIT, None)
-            split_grp = self._dict_type_rules.get(C.S_KEY_SPLIT_COMM, None)
+            split_sch = dict_type_rules.get(C.S_KEY_SPLIT, None)
+            split_grp = dict_type_rules.get(C.S_KEY_SPLIT_COMM, None)
 
             # only process files with split
             if split_sch and split_grp:
 
                 # there may be multiple matches per line (ignore quoted markers)
-                matches = re.finditer(split_sch, line)
+                matches = split_sch.finditer(line)
 
                 # only use matches that have the right group
                 matches = [
@@ -687,27 +1127,28 @@ class PyPlateBase:
                 # check for switches
 
                 # reset line switch values to block switch values
-                self._dict_sw_line = dict(self._dict_sw_block)
+                dict_sw_line = dict(dict_sw_block)
 
                 # check switches
                 check_switches(
                     code,
                     comm,
-                    self._dict_type_rules,
-                    self._dict_sw_block,
-                    self._dict_sw_line,
+                    dict_type_rules,
+                    dict_sw_block,
+                    dict_sw_line,
                 )
 
                 # check for block or line replace switch
                 repl = False
                 if (
-                    self._dict_sw_block[C.S_SW_REPLACE] is True
-                    and self._dict_sw_line[C.S_SW_REPLACE] is True
-                ) or self._dict_sw_line[C.S_SW_REPLACE] is True:
+                    dict_sw_block[C.S_SW_REPLACE] is True
+                    and dict_sw_line[C.S_SW_REPLACE] is True
+                ) or dict_sw_line[C.S_SW_REPLACE] is True:
                     repl = True
 
                 # switch says no, gtfo
                 if not repl:
+                    yield line
                     continue
 
             # ------------------------------------------------------------------
@@ -717,14 +1158,13 @@ class PyPlateBase:
             if not bl_hdr:
 
                 # check if it matches header pattern
-                str_pattern = self._dict_type_rules[C.S_KEY_HDR_SCH]
-                res = re.search(str_pattern, line)
+                rx_hdr = dict_type_rules[C.S_KEY_HDR_SCH]
+                res = rx_hdr.search(line)
                 if res:
 
                     # fix it
-                    lines[index] = self._fix_header(line)
-
-                    # no more processing for header line
+                    # NB: no more processing for header line
+                    yield self._fix_header(line, dict_type_rules)
                     continue
 
             # ------------------------------------------------------------------
@@ -738,21 +1178,24 @@ class PyPlateBase:
 
                 # --------------------------------------------------------------
                 # put the line back together
-                lines[index] = code + comm
+                line = code + comm
 
-        # open and write file
-        with open(path, "w", encoding=C.S_ENCODING) as a_file:
-            a_file.writelines(lines)
+            # done with line
+            yield line
+
+        # add counts
+        self._add_scans(num_scanned, num_touched)
 
     # --------------------------------------------------------------------------
     # Replace dunders inside a file header
     # --------------------------------------------------------------------------
-    def _fix_header(self, line):
+    def _fix_header(self, line, dict_type_rules):
         """
         Replace dunders inside a file header
 
         Args:
             line: The header line of the file in which to replace text
+            dict_type_rules: The type rules for the file
 
         Returns:
             The new header line
@@ -764,23 +1207,21 @@ class PyPlateBase:
 
         # break apart header line
         # NB: gotta do this again, can't pass res param
-        str_pattern = self._dict_type_rules[C.S_KEY_HDR_SCH]
-        res = re.search(str_pattern, line)
+        rx_hdr = dict_type_rules[C.S_KEY_HDR_SCH]
+        res = rx_hdr.search(line)
         if not res:
             return line
 
         # pull out lead, val, and pad using group match values from M
-        lead = res.group(self._dict_type_rules[C.S_KEY_LEAD])
-        val = res.group(self._dict_type_rules[C.S_KEY_VAL])
-        pad = res.group(self._dict_type_rules[C.S_KEY_CAPTION_PAD])
+        lead = res.group(dict_type_rules[C.S_KEY_LEAD])
+        val = res.group(dict_type_rules[C.S_KEY_VAL])
+        pad = res.group(dict_type_rules[C.S_KEY_CAPTION_PAD])
 
         # this is a complicated function to get the length of the spaces
         # between the key/val pair and the RAT (right-aligned text)
         tmp_val = str(val)
         old_val_len = len(tmp_val)
-        for key2, val2 in self._dict_rep.items():
-            if isinstance(val2, str):
-                tmp_val = tmp_val.replace(key2, val2)
+        tmp_val = self._reps.replace(tmp_val)
         new_val_len = len(tmp_val)
         val_diff = new_val_len - old_val_len
 
@@ -817,57 +1258,159 @@ class PyPlateBase:
         """
 
         # replace content using current flag setting
-        for key, val in self._dict_rep.items():
-            if isinstance(val, str):
-                code = code.replace(key, val)
+        code = self._reps.replace(code)
 
         # return the (maybe replaced) line
         return code
 
     # --------------------------------------------------------------------------
-    # Replace dunders inside a file's contents
+    # Replace dunders in each line in a list/file
     # --------------------------------------------------------------------------
-    def _fix_text(self, path):
+    def _fix_text_lines(self, lines):
         """
-        Replace dunders inside a file's contents
+        Replace dunders in each line in a list/file
 
         Args:
-            path: The path to the file to fix text
+            lines: An iterable of lines (a list or an open file)
 
-        Returns:
-            The new line of code
+        Yields:
+            Each line, fixed or not
 
-        Replaces text inside a file. This is a qnd function to replace any
-        dunder in any file, regardless of D_TYPE_RULES. Think of it as an
-        oubliette for files you just want to 'undunderize'.
+        This is a qnd function to replace any dunder in any file, regardless of
+        D_TYPE_RULES. Think of it as an oubliette for files you just want to
+        'undunderize'.
         """
 
-        # default lines
-        lines = []
-
-        # open and read file
-        with open(path, "r", encoding=C.S_ENCODING) as a_file:
-            lines = a_file.readlines()
+        # count lines for this file (added to conf at the end)
+        num_scanned = 0
+        num_touched = 0
 
-        # for each line in array
-        for index, line in enumerate(lines):
+        # for each line in file
+        for line in lines:
+            num_scanned += 1
 
             # ------------------------------------------------------------------
-            # skip blank lines
-            if line.strip() == "":
+            # skip blank lines and lines with no dunders
+            if line.strip() == "" or not self._reps.might_match(line):
+                yield line
                 continue
+            num_touched += 1
 
             # replace content using current flag setting
-            for key, val in self._dict_rep.items():
-                if isinstance(val, str):
-                    line = line.replace(key, val)
+            yield self._reps.replace(line)
 
-            # put new line back in file
-            lines[index] = line
+        # add counts
+        self._add_scans(num_scanned, num_touched)
 
-        # open and write file
-        with open(path, "w", encoding=C.S_ENCODING) as a_file:
-            a_file.writelines(lines)
+    # --------------------------------------------------------------------------
+    # Check if a line/file might be changed by the fixers
+    # --------------------------------------------------------------------------
+    def _needs_fix(self, text):
+        """
+        Check if a line/file might be changed by the fixers
+
+        Args:
+            text: The line, or the whole file
+
+        Returns:
+            False if the fixers would return the text as is, True if they
+            might not
+
+        Text with no dunders and no switch marker is only changed if a header
+        line is put back together differently. That can't happen if every
+        line ends in a newline and only has printable ascii chars, so that
+        text can skip all the regex work.
+        """
+
+        # dunders or switches, do the work
+        if self._reps.might_match(text) or C.S_SW_MARKER in text:
+            return True
+
+        # NB: _fix_header always adds a newline, and turns odd whitespace in
+        # the pad into spaces
+        if not text.endswith("\n"):
+            return True
+        return not (text.isascii() and text.replace("\n", "").isprintable())
+
+    # --------------------------------------------------------------------------
+    # Run a line fixer over a list of lines
+    # --------------------------------------------------------------------------
+    def _run_fix_lines(self, fix_lines, lines):
+        """
+        Run a line fixer over a list of lines
+
+        Args:
+            fix_lines: A generator function that takes an iterable of lines
+            and yields the fixed lines
+            lines: The list of lines to fix
+
+        Returns:
+            The fixed text
+
+        If the whole file does not need fixing (see _needs_fix), the fixer is
+        not run at all.
+        """
+
+        # whole file is clean, skip the line loop
+        text = "".join(lines)
+        if not self._needs_fix(text):
+            self._add_scans(len(lines), 0)
+            return text
+
+        # run fixer
+        return "".join(fix_lines(lines))
+
+    # --------------------------------------------------------------------------
+    # Add to the counts of lines read by the fixers
+    # --------------------------------------------------------------------------
+    def _add_scans(self, num_scanned, num_touched):
+        """
+        Add to the counts of lines read by the fixers
+
+        Args:
+            num_scanned: The number of lines in the file
+            num_touched: The number of lines that needed work
+
+        Adds one file and its line counts to the counts in conf.
+        """
+
+        # NB: files may be fixed in parallel
+        with C.LOCK_WRITE:
+            C.I_FILES_SCANNED += 1
+            C.I_LINES_SCANNED += num_scanned
+            C.I_LINES_TOUCHED += num_touched
+
+    # --------------------------------------------------------------------------
+    # Run a line fixer over a file and write the result
+    # --------------------------------------------------------------------------
+    def _write_lines(self, path, fix_lines):
+        """
+        Run a line fixer over a file and write the result
+
+        Args:
+            path: The path to the file to fix
+            fix_lines: A generator function that takes an iterable of lines
+            and yields the fixed lines
+
+        Small files are read into memory and passed to write_if_changed. Files
+        bigger than C.I_STREAM_SIZE are passed to stream_if_changed, so only
+        one line at a time is in memory.
+        """
+
+        # big file, stream it
+        if path.stat().st_size > C.I_STREAM_SIZE:
+            stream_if_changed(path, fix_lines)
+            return
+
+        # default lines
+        lines = []
+
+        # open and read file
+        with open(path, "r", encoding=C.S_ENCODING) as a_file:
+            lines = a_file.readlines()
+
+        # write file (if changed)
+        write_if_changed(path, self._run_fix_lines(fix_lines, lines))
 
     # --------------------------------------------------------------------------
     # Rename dirs/files in the project
@@ -890,10 +1433,8 @@ class PyPlateBase:
         # first get the path name (we only want to change the last component)
         last_part = path.name
 
-        # # replace dunders in last path component
-        for key, val in self._dict_rep.items():
-            if isinstance(val, str):
-                last_part = last_part.replace(key, val)
+        # replace dunders in last path component
+        last_part = self._reps.replace(last_part)
 
         # replace the name
         path_new = path.parent / last_part
@@ -905,6 +1446,9 @@ class PyPlateBase:
         # do rename
         path.rename(path_new)
 
+        # keep index up to date
+        get_index(self._dir_prj).rename(path, path_new)
+
     # --------------------------------------------------------------------------
     # Make reps, save public, fix public dunders, reload sub dicts
     # --------------------------------------------------------------------------
@@ -924,6 +1468,9 @@ class PyPlateBase:
         # make dunder rep dict
         self._dict_rep = self._dict_prv_all | self._dict_prv_prj
 
+        # compile the rep dict once for all the fixes that follow
+        self._reps = PyPlateReps(self._dict_rep)
+
         # ----------------------------------------------------------------------
         # save/fix/load public
 
@@ -1054,12 +1601,14 @@ class PyPlateBase:
     # --------------------------------------------------------------------------
     # Combine reqs from template/all and template/prj_type
     # --------------------------------------------------------------------------
-    def _merge_reqs(self, prj_type_long):
+    def _merge_reqs(self, prj_type_long, pack=None):
         """
         Combine reqs from template/all and template/prj_type
 
         Args:
             prj_type_long: the folder in template for the current project type
+            pack: The PyPlatePack to read the reqs from, if they are packed
+            (default: None)
 
         This method combines reqs from the all dir used by all projects, and
         those used by specific project type (gui needs pygobject, etc).
@@ -1085,11 +1634,16 @@ class PyPlateBase:
 
         # read reqs files and put in result
         for item in src:
-            with open(item, "r", encoding=C.S_ENCODING) as a_file:
-                old_file = a_file.readlines()
-                old_file = [line.rstrip() for line in old_file]
-                uniq = set(new_file + old_file)
-                new_file = list(uniq)
+
+            # read from pack or file
+            old_file = pack.read_lines(item) if pack else None
+            if old_file is None:
+                with open(item, "r", encoding=C.S_ENCODING) as a_file:
+                    old_file = a_file.readlines()
+
+            old_file = [line.rstrip() for line in old_file]
+            uniq = set(new_file + old_file)
+            new_file = list(uniq)
 
         # put combined reqs into final file
         joint = "\n".join(new_file)
@@ -1098,97 +1652,2700 @@ class PyPlateBase:
 
 
 # ------------------------------------------------------------------------------
-# Public functions
+# A compiled replacer for the dunders in a rep dict
 # ------------------------------------------------------------------------------
+class PyPlateReps:
+    """
+    A compiled replacer for the dunders in a rep dict
+
+    Public methods:
+        replace: Replace all dunders in a string
+        might_match: Check if a string might have dunders in it
+
+    This class compiles the keys of a rep dict into one alternation regex, so
+    each string is scanned once, instead of once per key. The result is always
+    the same as calling str.replace for each key, in dict order. When a string
+    has dunders close enough to interact (overlapping keys, or a replacement
+    that could form a new key), it falls back to the ordered replace.
+    """
+
+    # --------------------------------------------------------------------------
+    # Instance methods
+    # --------------------------------------------------------------------------
+
+    # --------------------------------------------------------------------------
+    # Initialize the new object
+    # --------------------------------------------------------------------------
+    def __init__(self, dict_rep):
+        """
+        Initialize the new object
+
+        Args:
+            dict_rep: The dict of dunders (keys) and their replacements (values)
+
+        Initializes a new instance of the class, setting the default values
+        of its properties, and any other code that needs to run to create a
+        new object.
+        """
+
+        # only str values are replaced (same as the ordered replace)
+        self._list_rep = [
+            (key, val) for key, val in dict_rep.items() if isinstance(val, str)
+        ]
+        self._dict_rep = dict(self._list_rep)
+
+        # the longest key, used to check how close two dunders are
+        self._max_len = max((len(key) for key in self._dict_rep), default=0)
+
+        # the prefix all keys share (None means there are no keys)
+        self._prefix = None
+        if len(self._dict_rep) > 0:
+            self._prefix = os.path.commonprefix(list(self._dict_rep))
+
+        # the compiled regex (None means always use the ordered replace)
+        self._rx = None
+
+        # NB: if one key is inside another, the result depends on key order,
+        # so we can't use a single scan
+        keys = list(self._dict_rep)
+        if len(keys) == 0 or "" in keys:
+            return
+        for key in keys:
+            if any(key != key2 and key in key2 for key2 in keys):
+                return
+
+        # pull out the common prefix so re can find it w/ a fast literal search
+        prefix = self._prefix
+        alts = "|".join(re.escape(key[len(prefix) :]) for key in keys)
+        self._rx = re.compile(f"{re.escape(prefix)}(?:{alts})")
+
+    # --------------------------------------------------------------------------
+    # Public methods
+    # --------------------------------------------------------------------------
+
+    # --------------------------------------------------------------------------
+    # Check if a string might have dunders in it
+    # --------------------------------------------------------------------------
+    def might_match(self, text):
+        """
+        Check if a string might have dunders in it
+
+        Args:
+            text: The string to check
+
+        Returns:
+            False if replace would return the string as is, True if it might
+            not
+
+        This is a plain substring search for the prefix all keys share (ie.
+        "__PP_"), so it is much faster than replace for strings with no
+        dunders.
+        """
+
+        # no keys, nothing to replace
+        if self._prefix is None:
+            return False
+
+        # NB: an empty prefix is in every string
+        return self._prefix in text
+
+    # --------------------------------------------------------------------------
+    # Replace all dunders in a string
+    # --------------------------------------------------------------------------
+    def replace(self, text):
+        """
+        Replace all dunders in a string
+
+        Args:
+            text: The string to replace dunders in
+
+        Returns:
+            The string with all dunders replaced
+        """
+
+        # no regex, do it the old way
+        if not self._rx:
+            return self._replace_ordered(text)
+
+        # the pieces of the new string
+        parts = []
+        pos = 0
+
+        # for each dunder in the string
+        for match in self._rx.finditer(text):
+            start, end = match.span()
+
+            # another dunder starts inside or just after this one, so they
+            # might interact
+            if self._rx.search(text, start + 1, end + 2 * self._max_len):
+                return self._replace_ordered(text)
+
+            # add text before dunder and replacement
+            parts.append(text[pos:start])
+            parts.append(self._dict_rep[match.group()])
+            pos = end
+
+        # no dunders, nothing to do
+        if len(parts) == 0:
+            return text
+
+        # add text after last dunder
+        parts.append(text[pos:])
+        res = "".join(parts)
+
+        # a replacement formed a new dunder, which the ordered replace might
+        # have replaced again
+        if self._rx.search(res):
+            return self._replace_ordered(text)
+
+        # return the new string
+        return res
+
+    # --------------------------------------------------------------------------
+    # Private methods
+    # --------------------------------------------------------------------------
+
+    # --------------------------------------------------------------------------
+    # Replace all dunders in a string, one key at a time
+    # --------------------------------------------------------------------------
+    def _replace_ordered(self, text):
+        """
+        Replace all dunders in a string, one key at a time
+
+        Args:
+            text: The string to replace dunders in
+
+        Returns:
+            The string with all dunders replaced
+        """
+
+        # replace each key in dict order
+        for key, val in self._list_rep:
+            text = text.replace(key, val)
+
+        # return the new string
+        return text
+
+
+# ------------------------------------------------------------------------------
+# A compiled matcher for a list of blacklist globs
+# ------------------------------------------------------------------------------
+class PyPlateBlacklist:
+    """
+    A compiled matcher for a list of blacklist globs
+
+    Public methods:
+        match: Check if a path matches any of the globs
+
+    This class replaces expanding each glob with Path.glob and testing paths
+    against the resulting lists. The globs use the same rules as Path.glob
+    (relative to the project dir, "*" does not match "/", "**" matches zero or
+    more dirs), but they are compiled once and checked against each path as it
+    is walked. Globs without wildcards are put in a set, the rest are joined
+    into one regex.
+    """
+
+    # --------------------------------------------------------------------------
+    # Instance methods
+    # --------------------------------------------------------------------------
+
+    # --------------------------------------------------------------------------
+    # Initialize the new object
+    # --------------------------------------------------------------------------
+    def __init__(self, dir_prj, list_bl):
+        """
+        Initialize the new object
+
+        Args:
+            dir_prj: The project dir that the globs are relative to
+            list_bl: The list of globs
+
+        Initializes a new instance of the class, setting the default values
+        of its properties, and any other code that needs to run to create a
+        new object.
+        """
+
+        # set the project dir
+        self._dir_prj = Path(dir_prj)
+
+        # globs with no wildcards (just a relative path)
+        self._set_lit = set()
+
+        # all other globs, as one regex
+        self._rx = None
+
+        # globs that end in "**", which only match dirs (same as glob)
+        self._rx_dir = None
+
+        # whether the project dir itself matches (only for "**")
+        self._root = False
+
+        # sort the globs
+        list_rx = []
+        list_rx_dir = []
+        for item in list_bl:
+
+            # strip leading "./" and trailing "/" (same as glob)
+            parts = [part for part in item.split("/") if part not in ["", "."]]
+            if len(parts) == 0:
+                continue
+            if parts == ["**"]:
+                self._root = True
+
+            # plain path
+            if not any(_is_wild(part) for part in parts):
+                self._set_lit.add("/".join(parts))
+                continue
+
+            # glob, make a regex
+            if parts[-1] == "**":
+                list_rx_dir.append(_glob_to_regex(parts))
+            else:
+                list_rx.append(_glob_to_regex(parts))
+
+        # compile all globs into one regex
+        if len(list_rx) > 0:
+            self._rx = re.compile("|".join(f"(?:{rx})" for rx in list_rx))
+        if len(list_rx_dir) > 0:
+            self._rx_dir = re.compile(
+                "|".join(f"(?:{rx})" for rx in list_rx_dir)
+            )
+
+    # --------------------------------------------------------------------------
+    # Public methods
+    # --------------------------------------------------------------------------
+
+    # --------------------------------------------------------------------------
+    # Check if a path matches any of the globs
+    # --------------------------------------------------------------------------
+    def match(self, path):
+        """
+        Check if a path matches any of the globs
+
+        Args:
+            path: The absolute path to check (must be in the project dir)
+
+        Returns:
+            True if the path matches any glob, False otherwise
+        """
+
+        # get path relative to project
+        rel = Path(path).relative_to(self._dir_prj).as_posix()
+
+        # project dir only matches "**"
+        if rel == ".":
+            return self._root
+
+        # check plain paths first, then globs
+        if rel in self._set_lit:
+            return True
+        if self._rx and self._rx.fullmatch(rel):
+            return True
+
+        # check dir globs last (needs a stat)
+        return bool(
+            self._rx_dir
+            and self._rx_dir.fullmatch(rel)
+            and Path(path).is_dir()
+        )
+
+
+# ------------------------------------------------------------------------------
+# An in-memory index of all dirs/files in the project
+# ------------------------------------------------------------------------------
+class PyPlateIndex:
+    """
+    An in-memory index of all dirs/files in the project
+
+    Public methods:
+        walk: Walk the index like Path.walk
+        stat: Get the (cached) stat of a path
+        rename: Update the index after a dir/file is renamed
+        add: Update the index after a file is created
+        remove: Update the index after a file is deleted
+        refresh: Re-read the project the next time the index is used
+
+    The project is walked once when the index is made (at the end of
+    _do_before_fix), and _do_fix and the conf actions walk the index instead
+    of the disk. Renames done by _do_fix update the index in place. Actions
+    that make lots of files (i18n, docs) call refresh so the next walk sees
+    them. Dirs in C.L_INDEX_SKIP (.git, venvs) are listed in their parent
+    but never walked, since nothing reads them.
+    """
+
+    # --------------------------------------------------------------------------
+    # Instance methods
+    # --------------------------------------------------------------------------
+
+    # --------------------------------------------------------------------------
+    # Initialize the new object
+    # --------------------------------------------------------------------------
+    def __init__(self, dir_prj):
+        """
+        Initialize the new object
+
+        Args:
+            dir_prj: The project dir to index
+
+        Initializes a new instance of the class, setting the default values
+        of its properties, and any other code that needs to run to create a
+        new object.
+        """
+
+        # set the project dir
+        self.dir_prj = Path(dir_prj)
+
+        # dict of dir path to lists of (dir names, file names), in walk order
+        self._dict_dirs = {}
+
+        # dict of path to stat result (filled as needed)
+        self._dict_stat = {}
+
+        # whether the index needs to be read again
+        self._stale = True
+
+        # read the project now
+        self._check()
+
+    # --------------------------------------------------------------------------
+    # Public methods
+    # --------------------------------------------------------------------------
+
+    # --------------------------------------------------------------------------
+    # Walk the index like Path.walk
+    # --------------------------------------------------------------------------
+    def walk(self, top=None):
+        """
+        Walk the index like Path.walk
+
+        Args:
+            top: The dir to start at (default: the project dir)
+
+        Yields:
+            A tuple of (root, dir names, file names) for each dir, top down
+
+        As with Path.walk, removing names from the dir names list stops the
+        walk from going into those dirs.
+        """
+
+        # read project if needed
+        self._check()
+
+        # start at top
+        top = Path(top) if top else self.dir_prj
+        list_stack = [top]
+
+        # for each dir
+        while len(list_stack) > 0:
+            root = list_stack.pop()
+
+            # dir is not in index (skipped, or a symlink, same as walk)
+            entry = self._dict_dirs.get(root, None)
+            if entry is None:
+                continue
+
+            # give caller copies so they can change them
+            root_dirs = list(entry[0])
+            yield root, root_dirs, list(entry[1])
+
+            # NB: reversed so they are popped in order
+            list_stack.extend(root / item for item in reversed(root_dirs))
+
+    # --------------------------------------------------------------------------
+    # Get the (cached) stat of a path
+    # --------------------------------------------------------------------------
+    def stat(self, path):
+        """
+        Get the (cached) stat of a path
+
+        Args:
+            path: The path to stat
+
+        Returns:
+            The os.stat_result for the path
+        """
+
+        # stat on first use
+        path = Path(path)
+        res = self._dict_stat.get(path, None)
+        if res is None:
+            res = path.stat()
+            self._dict_stat[path] = res
+        return res
+
+    # --------------------------------------------------------------------------
+    # Update the index after a dir/file is renamed
+    # --------------------------------------------------------------------------
+    def rename(self, path_old, path_new):
+        """
+        Update the index after a dir/file is renamed
+
+        Args:
+            path_old: The old path
+            path_new: The new path
+
+        Only the last part of the path may change (as in _fix_path).
+        """
+
+        # no index yet, nothing to update
+        if self._stale:
+            return
+
+        path_old = Path(path_old)
+        path_new = Path(path_new)
+
+        # fix name in parent's lists
+        entry = self._dict_dirs.get(path_old.parent, None)
+        if entry:
+            for names in entry:
+                if path_old.name in names:
+                    names[names.index(path_old.name)] = path_new.name
+
+        # fix dir and all dirs under it
+        # NB: keep walk order
+        if path_old in self._dict_dirs:
+            self._dict_dirs = {
+                _rebase(key, path_old, path_new): val
+                for key, val in self._dict_dirs.items()
+            }
+
+        # forget old stats
+        self._dict_stat = {
+            key: val
+            for key, val in self._dict_stat.items()
+            if key != path_old and path_old not in key.parents
+        }
+
+    # --------------------------------------------------------------------------
+    # Update the index after a file is created
+    # --------------------------------------------------------------------------
+    def add(self, path):
+        """
+        Update the index after a file is created
+
+        Args:
+            path: The new file
+        """
+
+        # no index yet, nothing to update
+        if self._stale:
+            return
+
+        # add name to parent's files
+        path = Path(path)
+        entry = self._dict_dirs.get(path.parent, None)
+        if entry and path.name not in entry[1]:
+            entry[1].append(path.name)
+
+    # --------------------------------------------------------------------------
+    # Update the index after a file is deleted
+    # --------------------------------------------------------------------------
+    def remove(self, path):
+        """
+        Update the index after a file is deleted
+
+        Args:
+            path: The deleted file
+        """
+
+        # no index yet, nothing to update
+        if self._stale:
+            return
+
+        # remove name from parent's files
+        path = Path(path)
+        entry = self._dict_dirs.get(path.parent, None)
+        if entry and path.name in entry[1]:
+            entry[1].remove(path.name)
+        self._dict_stat.pop(path, None)
+
+    # --------------------------------------------------------------------------
+    # Re-read the project the next time the index is used
+    # --------------------------------------------------------------------------
+    def refresh(self):
+        """
+        Re-read the project the next time the index is used
+        """
+
+        # set flag
+        self._stale = True
+
+    # --------------------------------------------------------------------------
+    # Private methods
+    # --------------------------------------------------------------------------
+
+    # --------------------------------------------------------------------------
+    # Read the project if the index is stale
+    # --------------------------------------------------------------------------
+    def _check(self):
+        """
+        Read the project if the index is stale
+        """
+
+        # index is good
+        if not self._stale:
+            return
+
+        # clear old index
+        self._dict_dirs = {}
+        self._dict_stat = {}
+
+        # dirs that nothing reads
+        list_skip = PyPlateBlacklist(self.dir_prj, C.L_INDEX_SKIP)
+
+        # NB: root is a full path, dirs and files are relative to root
+        for root, root_dirs, root_files in self.dir_prj.walk():
+            self._dict_dirs[root] = (list(root_dirs), list(root_files))
+
+            # NB: keep skipped names in the list above, just don't go in
+            root_dirs[:] = [
+                item for item in root_dirs if not list_skip.match(root / item)
+            ]
+
+        # done
+        self._stale = False
+
+
+# ------------------------------------------------------------------------------
+# A cache of template files in one pack file
+# ------------------------------------------------------------------------------
+class PyPlatePack:
+    """
+    A cache of template files in one pack file
+
+    Public methods:
+        get_entry: Get the index entry of a packed file
+        read: Read a packed file's contents
+        read_lines: Read a packed file's contents as text lines
+        read_plan: Read the contents of all files in a copy plan
+        copy_all: Copy all packed files to their dsts in one read
+        write: Write a packed file's contents to a dst
+        close: Close the pack file
+
+    A pack is one file in P_DIR_CACHE. The first line is a json index, and
+    after it are the contents of every packed file, one after the other. The
+    index has each file's offset, size, mode, mtime, hash, and whether it is
+    binary, plus a fingerprint of the stats of all the files. If any file is
+    added, removed, or changed (size/mtime/mode), the fingerprint changes and
+    the pack is rebuilt. Files bigger than C.I_STREAM_SIZE are not packed, and
+    should be copied from the source as usual.
+
+    The pack is kept open from when its index is read, and all reads use that
+    file, so if another pymaker rebuilds the pack (a new file with the same
+    name), this object still reads the pack that matches its index. Call close
+    (or use the object in a with block) when done with it.
+    """
+
+    # --------------------------------------------------------------------------
+    # Class constants
+    # --------------------------------------------------------------------------
+
+    # NB: change this if the pack format changes, to rebuild old packs
+    S_PACK_VER = "1"
+
+    # --------------------------------------------------------------------------
+    # Instance methods
+    # --------------------------------------------------------------------------
+
+    # --------------------------------------------------------------------------
+    # Initialize the new object
+    # --------------------------------------------------------------------------
+    def __init__(self, path_pack, list_src):
+        """
+        Initialize the new object
+
+        Args:
+            path_pack: The pack file to use (made if it does not exist)
+            list_src: The list of files to pack, in the order to pack them
+
+        Initializes a new instance of the class, setting the default values
+        of its properties, and any other code that needs to run to create a
+        new object.
+        """
+
+        # set the pack file
+        self.path_pack = Path(path_pack)
+
+        # the files to pack (no dups, keep order)
+        self._list_src = list(dict.fromkeys(str(item) for item in list_src))
+
+        # dict of str(src) to index entry
+        self._dict_files = {}
+
+        # where file contents start in the pack
+        self._offset = 0
+
+        # the open pack that matches the index (see _check)
+        self._file_pack = None
+
+        # load or rebuild the pack now
+        self._check()
+
+    # --------------------------------------------------------------------------
+    # Use the object in a with block
+    # --------------------------------------------------------------------------
+    def __enter__(self):
+        """
+        Use the object in a with block
+
+        Returns:
+            The object itself
+        """
+
+        return self
+
+    # --------------------------------------------------------------------------
+    # Close the pack file at the end of a with block
+    # --------------------------------------------------------------------------
+    def __exit__(self, exc_type, exc_value, traceback):
+        """
+        Close the pack file at the end of a with block
+
+        Args:
+            exc_type: The type of any exception raised in the block
+            exc_value: The exception raised in the block
+            traceback: The traceback of the exception
+
+        Returns:
+            False, so any exception is raised as usual
+        """
+
+        self.close()
+        return False
+
+    # --------------------------------------------------------------------------
+    # Public methods
+    # --------------------------------------------------------------------------
+
+    # --------------------------------------------------------------------------
+    # Get the index entry of a packed file
+    # --------------------------------------------------------------------------
+    def get_entry(self, src):
+        """
+        Get the index entry of a packed file
+
+        Args:
+            src: The source file
+
+        Returns:
+            The index entry for the file, or None if it is not packed
+        """
+
+        return self._dict_files.get(str(src), None)
+
+    # --------------------------------------------------------------------------
+    # Read a packed file's contents
+    # --------------------------------------------------------------------------
+    def read(self, src):
+        """
+        Read a packed file's contents
+
+        Args:
+            src: The source file
+
+        Returns:
+            The contents of the file as bytes, or None if it is not packed
+        """
+
+        # not packed
+        entry = self.get_entry(src)
+        if entry is None:
+            return None
+
+        # read at offset
+        # NB: pread does not move the file pos, so threads can share the file
+        return os.pread(
+            self._file_pack.fileno(),  # type: ignore
+            entry[C.S_KEY_PACK_SIZE],
+            self._offset + entry[C.S_KEY_PACK_OFFSET],
+        )
+
+    # --------------------------------------------------------------------------
+    # Read a packed file's contents as text lines
+    # --------------------------------------------------------------------------
+    def read_lines(self, src, data=None):
+        """
+        Read a packed file's contents as text lines
+
+        Args:
+            src: The source file
+            data: The contents of the file, if already read (default: None)
+
+        Returns:
+            The list of lines, or None if the file is not packed
+
+        The lines are the same as open(src).readlines() would return (ie.
+        newlines are translated).
+        """
+
+        # get contents
+        if data is None:
+            data = self.read(src)
+            if data is None:
+                return None
+
+        # NB: same newline handling as open
+        a_bytes = io.BytesIO(data)
+        with io.TextIOWrapper(a_bytes, encoding=C.S_ENCODING) as a_file:
+            return a_file.readlines()
+
+    # --------------------------------------------------------------------------
+    # Read the contents of all files in a copy plan
+    # --------------------------------------------------------------------------
+    def read_plan(self, dict_files):
+        """
+        Read the contents of all files in a copy plan
+
+        Args:
+            dict_files: The dict of dst: src for files to copy
+
+        Yields:
+            A tuple of (dst, src, contents as bytes, index entry) for each
+            file in the plan
+
+        Packed files come first, in pack order, from one sequential read of
+        the pack. Files that are not packed come last, with None for the
+        contents and entry (the caller should read them from src).
+        """
+
+        # get dsts for each src
+        dict_dsts = {}
+        for dst, src in dict_files.items():
+            dict_dsts.setdefault(str(src), []).append(dst)
+
+        # nothing packed (or no pack)
+        if self._dict_files:
+
+            # one sequential read
+            fd = self._file_pack.fileno()  # type: ignore
+            offset = self._offset
+            for src, entry in self._dict_files.items():
+                size = entry[C.S_KEY_PACK_SIZE]
+                data = os.pread(fd, size, offset)
+                offset += size
+                for dst in dict_dsts.pop(src, []):
+                    yield (dst, dict_files[dst], data, entry)
+
+        # files left
+        for list_dst in dict_dsts.values():
+            for dst in list_dst:
+                yield (dst, dict_files[dst], None, None)
+
+    # --------------------------------------------------------------------------
+    # Copy all packed files to their dsts in one read
+    # --------------------------------------------------------------------------
+    def copy_all(self, dict_files):
+        """
+        Copy all packed files to their dsts in one read
+
+        Args:
+            dict_files: The dict of dst: src for files to copy
+
+        Returns:
+            The dict of dst: src for files that are not packed (the caller
+            should copy these from src)
+        """
+
+        # files not packed
+        dict_left = {}
+
+        # write each packed file to its dst
+        for dst, src, data, entry in self.read_plan(dict_files):
+            if data is None:
+                dict_left[dst] = src
+            else:
+                self.write(dst, data, entry)
+
+        # return what is left
+        return dict_left
+
+    # --------------------------------------------------------------------------
+    # Write a packed file's contents to a dst
+    # --------------------------------------------------------------------------
+    def write(self, dst, data, entry):
+        """
+        Write a packed file's contents to a dst
+
+        Args:
+            dst: The file to write
+            data: The contents of the file
+            entry: The index entry of the file
+
+        Sets the mode and times of the dst from the index, the same as
+        shutil.copy2 would from the source.
+        """
+
+        # write contents
+        with open(dst, "wb") as a_file:
+            a_file.write(data)
+
+        # set mode and times
+        os.chmod(dst, entry[C.S_KEY_PACK_MODE])
+        mtime = entry[C.S_KEY_PACK_MTIME]
+        os.utime(dst, ns=(mtime, mtime))
+
+    # --------------------------------------------------------------------------
+    # Close the pack file
+    # --------------------------------------------------------------------------
+    def close(self):
+        """
+        Close the pack file
+
+        After this, no files are packed, so callers copy every file from its
+        source. Does nothing if already closed.
+        """
+
+        # NB: empty index first, so nothing reads the closed file
+        self._dict_files = {}
+        if self._file_pack is not None:
+            self._file_pack.close()
+            self._file_pack = None
+
+    # --------------------------------------------------------------------------
+    # Private methods
+    # --------------------------------------------------------------------------
+
+    # --------------------------------------------------------------------------
+    # Get the fingerprint of the files to pack
+    # --------------------------------------------------------------------------
+    def _get_fingerprint(self):
+        """
+        Get the fingerprint of the files to pack
+
+        Returns:
+            A hash of the path, size, mtime and mode of each file
+
+        Only stats each file, it does not read them.
+        """
+
+        # stat each file
+        list_stat = [self.S_PACK_VER, C.I_STREAM_SIZE]
+        for src in self._list_src:
+            try:
+                st = os.stat(src)
+                list_stat.append(
+                    [src, st.st_size, st.st_mtime_ns, st.st_mode]
+                )
+            except OSError:
+                list_stat.append([src])
+
+        # hash the stats
+        str_stat = json.dumps(list_stat)
+        return hashlib.sha256(str_stat.encode(C.S_ENCODING)).hexdigest()
+
+    # --------------------------------------------------------------------------
+    # Load the pack index, or rebuild the pack if it is out of date
+    # --------------------------------------------------------------------------
+    def _check(self):
+        """
+        Load the pack index, or rebuild the pack if it is out of date
+        """
+
+        # get current fingerprint
+        str_fp = self._get_fingerprint()
+
+        # try to load index
+        # NB: keep the file open, so reads match this index (see close)
+        a_file = None
+        try:
+            a_file = open(  # pylint: disable=consider-using-with
+                self.path_pack, "rb"
+            )
+            dict_index = json.loads(a_file.readline())
+            offset = a_file.tell()
+
+            # same files, use it
+            if dict_index[C.S_KEY_PACK_FP] == str_fp:
+                self._dict_files = dict_index[C.S_KEY_PACK_FILES]
+                self._offset = offset
+                self._file_pack = a_file
+                return
+        except (OSError, ValueError, KeyError, TypeError):
+            pass
+
+        # not used
+        if a_file:
+            a_file.close()
+
+        # make a new pack
+        # NB: no pack is not an error, all files are just copied from src
+        try:
+            self._build(str_fp)
+        except OSError:
+            self._dict_files = {}
+
+    # --------------------------------------------------------------------------
+    # Build a new pack
+    # --------------------------------------------------------------------------
+    def _build(self, str_fp):
+        """
+        Build a new pack
+
+        Args:
+            str_fp: The fingerprint of the files to pack
+
+        Reads each file once, and writes the index and contents to a temp file
+        that replaces the old pack, so a pack is never left half-written (even
+        if more than one pymaker is building it).
+        """
+
+        # read each file (not too big)
+        dict_files = {}
+        list_data = []
+        offset = 0
+        for src in self._list_src:
+
+            # skip big/missing files
+            try:
+                st = os.stat(src)
+                if st.st_size > C.I_STREAM_SIZE:
+                    continue
+                with open(src, "rb") as a_file:
+                    data = a_file.read()
+            except OSError:
+                continue
+
+            # add to index
+            dict_files[src] = {
+                C.S_KEY_PACK_OFFSET: offset,
+                C.S_KEY_PACK_SIZE: len(data),
+                C.S_KEY_PACK_MODE: st.st_mode & 0o7777,
+                C.S_KEY_PACK_MTIME: st.st_mtime_ns,
+                C.S_KEY_PACK_HASH: hashlib.sha256(data).hexdigest(),
+                C.S_KEY_PACK_BIN: b"\0" in data[: C.I_BIN_SNIFF],
+            }
+            list_data.append(data)
+            offset += len(data)
+
+        # make index line
+        dict_index = {C.S_KEY_PACK_FP: str_fp, C.S_KEY_PACK_FILES: dict_files}
+        line = json.dumps(dict_index).encode(C.S_ENCODING) + b"\n"
+
+        # write temp file next to pack
+        self.path_pack.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(
+            dir=self.path_pack.parent,
+            prefix=f".{self.path_pack.name}.",
+            suffix=".tmp",
+        )
+        try:
+            with open(fd, "wb") as a_file:
+                a_file.write(line)
+                a_file.writelines(list_data)
+
+            # NB: open before replace, so this is the file we just wrote (kept
+            # open, see close)
+            file_pack = open(tmp, "rb")  # pylint: disable=consider-using-with
+            try:
+                os.replace(tmp, self.path_pack)
+            except OSError:
+                file_pack.close()
+                raise
+        finally:
+            Path(tmp).unlink(missing_ok=True)
+
+        # use new index
+        self._dict_files = dict_files
+        self._offset = len(line)
+        self._file_pack = file_pack
+
+
+# ------------------------------------------------------------------------------
+# Timings for --profile
+# ------------------------------------------------------------------------------
+class PyPlateProfile:
+    """
+    Timings for --profile
+
+    Public methods:
+        start: Get the counts at the start of a block
+        stop: Add the counts for a block to its row
+        add_file: Add the counts for one fixed file to its type's row
+        report: Print the timings and save them to the output file
+
+    Each row is a step (phase, action, lib call, or file type) with its number
+    of calls, wall time, cpu time (incl. child processes), bytes read and
+    written (from /proc/self/io, if it exists), and the number of files
+    scanned/written by the fixers. Rows for blocks that run at the same time
+    (ie. --jobs) share their process-wide counts, but file type rows are only
+    counted for their own thread.
+
+    The cProfile stats only cover the main thread. Work done in pools (file
+    fixes with --jobs, conf actions, background venv/reqs) shows up there as
+    time spent waiting, so use the table rows for those.
+    """
+
+    # --------------------------------------------------------------------------
+    # Class constants
+    # --------------------------------------------------------------------------
+
+    # where linux keeps our io counts
+    P_PROC_IO = Path("/proc/self/io")
+    S_IO_READ = "rchar"
+    S_IO_WRITE = "wchar"
+
+    # table titles, by group
+    D_TITLES = {
+        # I18N: profile table title
+        C.S_KEY_PROF_PHASE: _("Phase"),
+        # I18N: profile table title
+        C.S_KEY_PROF_ACTION: _("Action"),
+        # I18N: profile table title
+        C.S_KEY_PROF_LIB: _("Library call"),
+        # I18N: profile table title
+        C.S_KEY_PROF_TYPE: _("File type"),
+    }
+
+    # table column headers
+    L_HDR_COLS = [
+        # I18N: profile table column (number of calls)
+        _("Calls"),
+        # I18N: profile table column (wall time)
+        _("Wall (s)"),
+        # I18N: profile table column (cpu time)
+        _("CPU (s)"),
+        # I18N: profile table column (bytes read)
+        _("Read (B)"),
+        # I18N: profile table column (bytes written)
+        _("Write (B)"),
+        # I18N: profile table column (files scanned by fixers)
+        _("Scanned"),
+        # I18N: profile table column (files written by fixers)
+        _("Saved"),
+    ]
+
+    # format of table header/rows
+    # NB: fmt params are name, calls, wall, cpu, read, write, scanned, written
+    S_HDR_FMT = "{:<24.24} {:>5} {:>8} {:>8} {:>9} {:>9} {:>7} {:>5}"
+    S_ROW_FMT = "{:<24.24} {:>5} {:>8.3f} {:>8.3f} {:>9} {:>9} {:>7} {:>5}"
+
+    # I18N: name of file type row for files with no ext
+    S_NO_EXT = _("(none)")
+
+    # I18N: where the timings were saved
+    S_MSG_SAVED = _("Profile saved to {}")
+
+    # --------------------------------------------------------------------------
+    # Instance methods
+    # --------------------------------------------------------------------------
+
+    # --------------------------------------------------------------------------
+    # Initialize the new object
+    # --------------------------------------------------------------------------
+    def __init__(self, path_out=None):
+        """
+        Initialize the new object
+
+        Args:
+            path_out: The file to save the timings to (.json), or the cProfile
+            stats to (any other name), or None to only print the table
+
+        Initializes a new instance of the class, setting the default values
+        of its properties, and any other code that needs to run to create a
+        new object.
+        """
+
+        # where to save
+        self.path_out = Path(path_out) if path_out else None
+
+        # dict of group: dict of name: row
+        self._dict_rows = {key: {} for key in self.D_TITLES}
+
+        # NB: blocks may end in more than one thread
+        self._lock = threading.Lock()
+
+        # start cProfile if not saving json
+        self._profiler = None
+        if self.path_out and self.path_out.suffix.lower() != ".json":
+            self._profiler = cProfile.Profile()
+            self._profiler.enable()
+
+    # --------------------------------------------------------------------------
+    # Public methods
+    # --------------------------------------------------------------------------
+
+    # --------------------------------------------------------------------------
+    # Get the counts at the start of a block
+    # --------------------------------------------------------------------------
+    def start(self):
+        """
+        Get the counts at the start of a block
+
+        Returns:
+            A tuple of the current counts, to pass to stop
+        """
+
+        # get process-wide counts
+        # NB: first 4 are user, system, children user, children system
+        times = os.times()
+        cpu = sum(times[:4])
+        num_read, num_write = self._get_io()
+
+        # return as tuple
+        return (
+            time.perf_counter(),
+            cpu,
+            num_read,
+            num_write,
+            C.I_FILES_SCANNED,
+            C.I_FILES_WRITTEN,
+        )
+
+    # --------------------------------------------------------------------------
+    # Add the counts for a block to its row
+    # --------------------------------------------------------------------------
+    def stop(self, group, name, counts_start):
+        """
+        Add the counts for a block to its row
+
+        Args:
+            group: The group of the row (a C.S_KEY_PROF_ key)
+            name: The name of the row
+            counts_start: The tuple from start
+        """
+
+        # get the difference between now and start
+        counts_stop = self.start()
+        diffs = [b - a for a, b in zip(counts_start, counts_stop)]
+
+        # add to row
+        self._add(group, name, *diffs)
+
+    # --------------------------------------------------------------------------
+    # Add the counts for one fixed file to its type's row
+    # --------------------------------------------------------------------------
+    def add_file(self, path, wall, cpu, size_in, size_out, written):
+        """
+        Add the counts for one fixed file to its type's row
+
+        Args:
+            path: The file that was fixed
+            wall: The wall time to fix it
+            cpu: The cpu time to fix it (in this thread)
+            size_in: The size of the file before fixing
+            size_out: The size of the file after fixing (or 0 if not written)
+            written: Whether the file was written
+        """
+
+        # use ext, or name if no ext (ie. Makefile)
+        name = path.suffix.lower() or path.name or self.S_NO_EXT
+
+        # add to row
+        self._add(
+            C.S_KEY_PROF_TYPE,
+            name,
+            wall,
+            cpu,
+            size_in,
+            size_out,
+            1,
+            int(written),
+        )
+
+    # --------------------------------------------------------------------------
+    # Print the timings and save them to the output file
+    # --------------------------------------------------------------------------
+    def report(self):
+        """
+        Print the timings and save them to the output file
+        """
+
+        # stop cProfile
+        if self._profiler:
+            self._profiler.disable()
+
+        # ----------------------------------------------------------------------
+        # print table
+
+        # for each group that has rows
+        for group, dict_rows in self._dict_rows.items():
+            if len(dict_rows) == 0:
+                continue
+
+            # print header
+            print()
+            print(self.S_HDR_FMT.format(self.D_TITLES[group], *self.L_HDR_COLS))
+
+            # print rows, slowest first
+            list_rows = sorted(
+                dict_rows.items(),
+                key=lambda item: item[1][C.S_KEY_PROF_WALL],
+                reverse=True,
+            )
+            for name, row in list_rows:
+                print(
+                    self.S_ROW_FMT.format(
+                        name,
+                        row[C.S_KEY_PROF_CALLS],
+                        row[C.S_KEY_PROF_WALL],
+                        row[C.S_KEY_PROF_CPU],
+                        row[C.S_KEY_PROF_READ],
+                        row[C.S_KEY_PROF_WRITE],
+                        row[C.S_KEY_PROF_SCANNED],
+                        row[C.S_KEY_PROF_WRITTEN],
+                    )
+                )
+
+        # ----------------------------------------------------------------------
+        # save file
+
+        # print only
+        if not self.path_out:
+            return
+
+        # save cProfile stats (open w/ pstats or snakeviz)
+        if self._profiler:
+            self._profiler.dump_stats(self.path_out)
+
+        # save timings as json
+        else:
+            with open(self.path_out, "w", encoding=C.S_ENCODING) as a_file:
+                json.dump(self._dict_rows, a_file, indent=4)
+
+        # say where
+        print()
+        print(self.S_MSG_SAVED.format(self.path_out))
+
+    # --------------------------------------------------------------------------
+    # Private methods
+    # --------------------------------------------------------------------------
+
+    # --------------------------------------------------------------------------
+    # Add counts to a row
+    # --------------------------------------------------------------------------
+    def _add(
+        self, group, name, wall, cpu, num_read, num_write, scanned, written
+    ):
+        """
+        Add counts to a row
+
+        Args:
+            group: The group of the row (a C.S_KEY_PROF_ key)
+            name: The name of the row
+            wall: The wall time to add
+            cpu: The cpu time to add
+            num_read: The bytes read to add
+            num_write: The bytes written to add
+            scanned: The number of files scanned to add
+            written: The number of files written to add
+        """
+
+        with self._lock:
+
+            # get/make row
+            row = self._dict_rows[group].setdefault(
+                name,
+                {
+                    C.S_KEY_PROF_CALLS: 0,
+                    C.S_KEY_PROF_WALL: 0.0,
+                    C.S_KEY_PROF_CPU: 0.0,
+                    C.S_KEY_PROF_READ: 0,
+                    C.S_KEY_PROF_WRITE: 0,
+                    C.S_KEY_PROF_SCANNED: 0,
+                    C.S_KEY_PROF_WRITTEN: 0,
+                },
+            )
+
+            # add counts
+            row[C.S_KEY_PROF_CALLS] += 1
+            row[C.S_KEY_PROF_WALL] += wall
+            row[C.S_KEY_PROF_CPU] += cpu
+            row[C.S_KEY_PROF_READ] += num_read
+            row[C.S_KEY_PROF_WRITE] += num_write
+            row[C.S_KEY_PROF_SCANNED] += scanned
+            row[C.S_KEY_PROF_WRITTEN] += written
+
+    # --------------------------------------------------------------------------
+    # Get the bytes read/written by this process
+    # --------------------------------------------------------------------------
+    def _get_io(self):
+        """
+        Get the bytes read/written by this process
+
+        Returns:
+            A tuple of bytes read and bytes written (0 if not on linux)
+        """
+
+        # read counts
+        try:
+            with open(self.P_PROC_IO, "r", encoding=C.S_ENCODING) as a_file:
+                dict_io = dict(
+                    line.split(":", 1) for line in a_file if ":" in line
+                )
+            return (
+                int(dict_io[self.S_IO_READ]),
+                int(dict_io[self.S_IO_WRITE]),
+            )
+        except (OSError, KeyError, ValueError):
+            return (0, 0)
+
+
+# ------------------------------------------------------------------------------
+# A gzip writer that compresses blocks in parallel
+# ------------------------------------------------------------------------------
+class PyPlateGzip:
+    """
+    A gzip writer that compresses blocks in parallel
+
+    Public methods:
+        write: Add data to the stream
+        close: Compress the last block and write the gzip trailer
+
+    The output is one gzip member, the same as pigz makes. The data is cut
+    into blocks of C.I_DIST_BLOCK bytes, and each block is deflated in a
+    thread, using the last 32 Kb before it as its dictionary. Every block but
+    the last ends with a sync flush, so the blocks join into one deflate
+    stream that any gzip can read. zlib lets go of the GIL while it works, so
+    threads are enough.
+    """
+
+    # --------------------------------------------------------------------------
+    # Class constants
+    # --------------------------------------------------------------------------
+
+    # size of the deflate window (and the dictionary for each block)
+    I_WINDOW = 32768
+
+    # gzip header (magic, deflate, no flags, mtime, extra flags, os unknown)
+    S_HDR_FMT = "<BBBBIBB"
+    I_HDR_OS = 255
+
+    # gzip trailer (crc and size mod 2^32)
+    S_TRL_FMT = "<II"
+
+    # --------------------------------------------------------------------------
+    # Instance methods
+    # --------------------------------------------------------------------------
+
+    # --------------------------------------------------------------------------
+    # Initialize the new object
+    # --------------------------------------------------------------------------
+    def __init__(self, fileobj, level=9, jobs=1):
+        """
+        Initialize the new object
+
+        Args:
+            fileobj: The binary file to write to (not closed by close)
+            level: The compression level (default: 9)
+            jobs: The number of blocks to compress at once (default: 1)
+
+        Initializes a new instance of the class, setting the default values
+        of its properties, and any other code that needs to run to create a
+        new object.
+        """
+
+        # set props
+        self._fileobj = fileobj
+        self._level = level
+        self._jobs = max(1, jobs)
+
+        # the running crc and size of the data
+        self._crc = 0
+        self._size = 0
+
+        # data not in a block yet, and the dictionary for the next block
+        self._buf = bytearray()
+        self._zdict = b""
+
+        # blocks being compressed, in order
+        self._pool = ThreadPoolExecutor(max_workers=self._jobs)
+        self._pending = deque()
+
+        # NB: the extra flags are the same as gzip's
+        xfl = 0
+        if level == 9:
+            xfl = 2
+        elif level == 1:
+            xfl = 4
+
+        # write header
+        # NB: mtime 0, so the output is the same every time
+        self._fileobj.write(
+            struct.pack(
+                self.S_HDR_FMT, 0x1F, 0x8B, 8, 0, 0, xfl, self.I_HDR_OS
+            )
+        )
+
+    # --------------------------------------------------------------------------
+    # Public methods
+    # --------------------------------------------------------------------------
+
+    # --------------------------------------------------------------------------
+    # Add data to the stream
+    # --------------------------------------------------------------------------
+    def write(self, data):
+        """
+        Add data to the stream
+
+        Args:
+            data: The bytes to add
+
+        Returns:
+            The number of bytes added
+        """
+
+        # keep crc and size of all data
+        self._crc = zlib.crc32(data, self._crc)
+        self._size += len(data)
+
+        # start each full block
+        self._buf += data
+        size = C.I_DIST_BLOCK
+        while len(self._buf) >= size:
+            block = bytes(self._buf[:size])
+            del self._buf[:size]
+            self._submit(block, False)
+
+        return len(data)
+
+    # --------------------------------------------------------------------------
+    # Compress the last block and write the gzip trailer
+    # --------------------------------------------------------------------------
+    def close(self):
+        """
+        Compress the last block and write the gzip trailer
+
+        Does nothing if already closed.
+        """
+
+        # already closed
+        if self._pool is None:
+            return
+
+        # finish the stream with the rest of the data (may be empty)
+        self._submit(bytes(self._buf), True)
+        self._buf = bytearray()
+        self._drain(0)
+
+        # done with pool
+        self._pool.shutdown()
+        self._pool = None
+
+        # write trailer
+        self._fileobj.write(
+            struct.pack(self.S_TRL_FMT, self._crc, self._size & 0xFFFFFFFF)
+        )
+
+    # --------------------------------------------------------------------------
+    # Private methods
+    # --------------------------------------------------------------------------
+
+    # --------------------------------------------------------------------------
+    # Start compressing a block
+    # --------------------------------------------------------------------------
+    def _submit(self, block, last):
+        """
+        Start compressing a block
+
+        Args:
+            block: The bytes of the block
+            last: Whether this is the last block in the stream
+        """
+
+        # start block with the current dictionary
+        future = self._pool.submit(
+            self._deflate, block, self._zdict, self._level, last
+        )
+        self._pending.append(future)
+
+        # next dictionary is the last 32 Kb of data so far
+        self._zdict = (self._zdict + block)[-self.I_WINDOW :]
+
+        # NB: keep memory down by writing done blocks as we go
+        self._drain(self._jobs * 2)
+
+    # --------------------------------------------------------------------------
+    # Write compressed blocks, in order
+    # --------------------------------------------------------------------------
+    def _drain(self, num_keep):
+        """
+        Write compressed blocks, in order
+
+        Args:
+            num_keep: The number of blocks that may still be compressing
+        """
+
+        # wait for the oldest block and write it
+        while len(self._pending) > num_keep:
+            self._fileobj.write(self._pending.popleft().result())
+
+    # --------------------------------------------------------------------------
+    # Deflate one block
+    # --------------------------------------------------------------------------
+    @staticmethod
+    def _deflate(block, zdict, level, last):
+        """
+        Deflate one block
+
+        Args:
+            block: The bytes of the block
+            zdict: The data just before the block (or empty)
+            level: The compression level
+            last: Whether this is the last block in the stream
+
+        Returns:
+            The raw deflate data for the block
+        """
+
+        # NB: raw deflate (no zlib header), as gzip wants
+        if zdict:
+            comp = zlib.compressobj(level, zlib.DEFLATED, -15, zdict=zdict)
+        else:
+            comp = zlib.compressobj(level, zlib.DEFLATED, -15)
+
+        # NB: sync flush ends on a byte, so the next block can follow it
+        mode = zlib.Z_FINISH if last else zlib.Z_SYNC_FLUSH
+        return comp.compress(block) + comp.flush(mode)
+
+
+# ------------------------------------------------------------------------------
+# Public functions
+# ------------------------------------------------------------------------------
+
+# NB: these functions are used in pyplate/pymaker/pybaker, but also used in
+# conf. they are placed here and made public because they are not user-defined.
+
+
+# ------------------------------------------------------------------------------
+# Check if line or trailing comment is a switch
+# ------------------------------------------------------------------------------
+def check_switches(code, comm, dict_type_rules, dict_sw_block, dict_sw_line):
+    """
+    Check if line or trailing comment is a switch
+
+    Args:
+        comm: The comment part of a line to check for switches
+        dict_type_rules: Dictionary containing the regex to look for
+        dict_sw: Dictionary of switch values for either block or line
+        switches
+
+    This method checks to see if a line or trailing comment contains a
+    valid switch for the values in dict_type_rules. If a valid switch is
+    found, it sets the appropriate flag in either dict_sw_block or
+    dict_sw_line.
+    """
+
+    # switch does not appear anywhere in line
+    res = dict_type_rules[C.S_KEY_SW_SCH].search(comm)
+    if not res:
+        return
+
+    # find all matches (case insensitive)
+    matches = dict_type_rules[C.S_KEY_SW_SCH_I].finditer(comm)
+
+    # for each match
+    for match in matches:
+
+        # get key/val of switch
+        key = match.group(dict_type_rules[C.S_KEY_SW_KEY])
+        val = match.group(dict_type_rules[C.S_KEY_SW_VAL])
+
+        # try a bool conversion
+        # NB: in honor of John Valby (ddg him!)
+        val_b = val.lower()
+        if val_b == "true":
+            val = True
+        elif val_b == "false":
+            val = False
+
+        # pick a dict based on if there is preceding code
+        if code.strip() == "":
+            dict_sw_block[key] = val
+        else:
+            dict_sw_line[key] = val
+
+
+# ------------------------------------------------------------------------------
+# Get the filetype-specific regexes (headers, comments. switches)
+# ------------------------------------------------------------------------------
+def get_type_rules(path):
+    """
+    Get the filetype-specific regexes (headers, comments. switches)
+
+    Args:
+        path: Path of the file to get the dict of regexes for
+
+    Returns:
+        The dict of regexes for this file type
+
+    The regexes in the result are compiled, and the result is shared by all
+    files of the same type, so don't modify it.
+    """
+
+    # build the index the first time we are called
+    if len(D_TYPE_INDEX) == 0:
+        _make_type_index()
+
+    # check if the suffix or the filename (for dot files) matches
+    # NB: first group in D_TYPE_RULES wins, same as scanning the groups
+    res_ext = D_TYPE_INDEX.get(path.suffix.lower(), None)
+    res_name = D_TYPE_INDEX.get(path.name.lower(), None)
+    res = min(
+        [item for item in [res_ext, res_name] if item],
+        key=lambda item: item[0],
+        default=None,
+    )
+    if res:
+        return res[1]
+
+    # default result is py rep
+    return {}
+
+
+# ------------------------------------------------------------------------------
+# Build the index of type rules by ext/name
+# ------------------------------------------------------------------------------
+def _make_type_index():
+    """
+    Build the index of type rules by ext/name
+
+    Fills D_TYPE_INDEX with a copy of each group's rules in D_TYPE_RULES, keyed
+    by each of the group's exts (lower case and dotted). The header, split and
+    switch patterns are compiled once here, instead of for every line.
+    """
+
+    # NB: fill a local dict and add it all at once, in case of threads
+    dict_index = {}
+
+    # iterate over reps
+    for order, val in enumerate(C.D_TYPE_RULES.values()):
+
+        # copy rules and compile patterns
+        rules = dict(val[C.S_KEY_RULES_REP])
+        for key in [C.S_KEY_HDR_SCH, C.S_KEY_SPLIT, C.S_KEY_SW_SCH]:
+            if key in rules:
+                rules[key] = re.compile(rules[key])
+
+        # switches are found case insensitive
+        if C.S_KEY_SW_SCH in rules:
+            rules[C.S_KEY_SW_SCH_I] = re.compile(
+                rules[C.S_KEY_SW_SCH].pattern, flags=re.I
+            )
+
+        # lower case all exts and add dots
+        exts = val[C.S_KEY_RULES_EXT]
+        l_exts = [item.lower() for item in exts]
+        l_exts = [
+            f".{item}" if not item.startswith(".") else item for item in l_exts
+        ]
+
+        # add exts to index (first group wins)
+        for ext in l_exts:
+            dict_index.setdefault(ext, (order, rules))
+
+    # set the global index
+    D_TYPE_INDEX.update(dict_index)
+
+
+# ------------------------------------------------------------------------------
+# Check if a file is binary (not text)
+# ------------------------------------------------------------------------------
+def is_binary(path):
+    """
+    Check if a file is binary (not text)
+
+    Args:
+        path: Path of the file to check
+
+    Returns:
+        True if the file looks binary, False otherwise
+
+    A file is binary if there is a NUL byte in its first C.I_BIN_SNIFF bytes.
+    The result is cached for the file's path and mtime, so it is only read
+    again if it changes.
+    """
+
+    # get mtime for cache key
+    try:
+        mtime = Path(path).stat().st_mtime_ns
+    except OSError:
+        return False
+
+    # check file (or get cached result)
+    return _is_binary(str(path), mtime)
+
+
+# ------------------------------------------------------------------------------
+# Check the start of a file for a NUL byte
+# ------------------------------------------------------------------------------
+@lru_cache(maxsize=None)
+def _is_binary(path, _mtime):
+    """
+    Check the start of a file for a NUL byte
+
+    Args:
+        path: Path of the file to check (as a str)
+        _mtime: The file's mtime (only used as part of the cache key)
+
+    Returns:
+        True if there is a NUL byte in the start of the file
+    """
+
+    # read the start of the file as bytes
+    try:
+        with open(path, "rb") as a_file:
+            chunk = a_file.read(C.I_BIN_SNIFF)
+    except OSError:
+        return False
+
+    # text files never have NUL
+    return b"\0" in chunk
+
+
+# ------------------------------------------------------------------------------
+# Time a block of code for --profile
+# ------------------------------------------------------------------------------
+@contextmanager
+def profile(group, name):
+    """
+    Time a block of code for --profile
+
+    Args:
+        group: The group of the row (a C.S_KEY_PROF_ key)
+        name: The name of the row
+
+    Use as "with profile(group, name):" around a block. Does nothing if
+    --profile was not used.
+    """
+
+    # not profiling
+    prof = C.PROF
+    if prof is None:
+        yield
+        return
+
+    # time the block
+    counts = prof.start()
+    try:
+        yield
+    finally:
+        prof.stop(group, name, counts)
+
+
+# ------------------------------------------------------------------------------
+# Time the fix of one file for --profile
+# ------------------------------------------------------------------------------
+@contextmanager
+def profile_file(path):
+    """
+    Time the fix of one file for --profile
+
+    Args:
+        path: The file being fixed
+
+    Use as "with profile_file(path):" around the fix. The time is added to
+    the row for the file's type. Does nothing if --profile was not used.
+    """
+
+    # not profiling
+    prof = C.PROF
+    if prof is None:
+        yield
+        return
+
+    # get state before
+    stat_in = path.stat()
+    wall = time.perf_counter()
+    cpu = time.thread_time()
+
+    # do the fix
+    # NB: add the row even if the fix fails, same as profile
+    try:
+        yield
+    finally:
+
+        # get state after
+        wall = time.perf_counter() - wall
+        cpu = time.thread_time() - cpu
+        try:
+            stat_out = path.stat()
+        except OSError:
+            stat_out = stat_in
+        written = stat_out.st_mtime_ns != stat_in.st_mtime_ns
+
+        # add to type row
+        prof.add_file(
+            path,
+            wall,
+            cpu,
+            stat_in.st_size,
+            stat_out.st_size if written else 0,
+            written,
+        )
+
+
+# ------------------------------------------------------------------------------
+# Make a new index of the project
+# ------------------------------------------------------------------------------
+def make_index(dir_prj):
+    """
+    Make a new index of the project
+
+    Args:
+        dir_prj: The project dir to index
+
+    Returns:
+        The new PyPlateIndex
+
+    The index is kept in conf, so PyMaker/PyBaker and the conf actions all
+    share it.
+    """
+
+    # make a new index (walks the project)
+    index = PyPlateIndex(dir_prj)
+
+    # save for others
+    C.INDEX_PRJ = index
+    return index
+
+
+# ------------------------------------------------------------------------------
+# Get the index of the project
+# ------------------------------------------------------------------------------
+def get_index(dir_prj):
+    """
+    Get the index of the project
+
+    Args:
+        dir_prj: The project dir
+
+    Returns:
+        The PyPlateIndex made by make_index, or a new one if there is none
+        (or it is for a different dir)
+    """
+
+    # use the current index if it's for this project
+    index = C.INDEX_PRJ
+    if index is not None and index.dir_prj == Path(dir_prj):
+        return index
+
+    # make a new one
+    return make_index(dir_prj)
+
+
+# ------------------------------------------------------------------------------
+# Get the cache dir of a project
+# ------------------------------------------------------------------------------
+def get_cache_dir(dir_prj):
+    """
+    Get the cache dir of a project
+
+    Args:
+        dir_prj: The project dir
+
+    Returns:
+        The path to the project's dir in P_DIR_CACHE
+
+    Files that only make sense on this computer (like the mtimes in the
+    manifest) go here, not in the project, so they never end up in git. The
+    name of the dir is a hash of the full path of the project.
+    """
+
+    # hash the full path
+    str_prj = str(Path(dir_prj).resolve()).encode(C.S_ENCODING)
+    str_hash = hashlib.sha256(str_prj).hexdigest()[:16]
+
+    return P_DIR_CACHE / C.S_DIR_PRJ_CACHE / str_hash
+
+
+# ------------------------------------------------------------------------------
+# Move a path from under one dir to another
+# ------------------------------------------------------------------------------
+def _rebase(path, path_old, path_new):
+    """
+    Move a path from under one dir to another
+
+    Args:
+        path: The path to move
+        path_old: The old dir
+        path_new: The new dir
+
+    Returns:
+        The path under the new dir, or the same path if it is not under the
+        old dir
+    """
+
+    # not under old dir
+    if path != path_old and path_old not in path.parents:
+        return path
+
+    # swap the dirs
+    return path_new / path.relative_to(path_old)
+
+
+# ------------------------------------------------------------------------------
+# Check if a glob path part has wildcards
+# ------------------------------------------------------------------------------
+def _is_wild(part):
+    """
+    Check if a glob path part has wildcards
+
+    Args:
+        part: One part (between slashes) of a glob
+
+    Returns:
+        True if the part has any glob wildcards
+    """
+
+    return any(char in part for char in "*?[")
+
+
+# ------------------------------------------------------------------------------
+# Convert the parts of a glob to a regex
+# ------------------------------------------------------------------------------
+def _glob_to_regex(parts):
+    """
+    Convert the parts of a glob to a regex
+
+    Args:
+        parts: The parts (between slashes) of a glob
+
+    Returns:
+        A regex string to fullmatch a relative posix path
+
+    "**" matches zero or more dirs, "*" and "?" never match "/", and "[...]"
+    is a char class ("[!...]" negated), as in Path.glob.
+    """
+
+    # NB: "**" at the end matches the dir before it, and everything below it
+    tail = ""
+    if parts[-1] == "**":
+        parts = parts[:-1]
+        tail = "(?:/[^/]+)*" if len(parts) > 0 else ".+"
+
+    # the regex for each part
+    list_rx = []
+
+    # for each part
+    for part in parts:
+
+        # zero or more dirs (includes the slash after them)
+        if part == "**":
+            list_rx.append("(?:[^/]+/)*")
+            continue
+
+        # convert a normal part, one char (or char class) at a time
+        list_part = []
+        index = 0
+        while index < len(part):
+            char = part[index]
+            index += 1
+
+            # wildcards
+            if char == "*":
+                list_part.append("[^/]*")
+            elif char == "?":
+                list_part.append("[^/]")
+
+            # char class (if closed)
+            # NB: a "]" right after the "[" is part of the class
+            elif char == "[" and part.find("]", index + 1) != -1:
+                end = part.find("]", index + 1)
+                chars = part[index:end].replace("\\", "\\\\")
+                if chars.startswith("!"):
+                    chars = "^" + chars[1:]
+                elif chars.startswith("^"):
+                    chars = "\\" + chars
+                list_part.append(f"[{chars}]")
+                index = end + 1
+
+            # plain char
+            else:
+                list_part.append(re.escape(char))
+
+        # add part and slash
+        list_rx.append("".join(list_part) + "/")
+
+    # join parts and remove last slash
+    rx = "".join(list_rx)
+    if rx.endswith("/"):
+        rx = rx[:-1]
+
+    # add tail (if any)
+    return rx + tail
 
-# NB: these functions are used in pyplate/pymaker/pybaker, but also used in
-# conf. they are placed here and made public because they are not user-defined.
-
 
 # ------------------------------------------------------------------------------
-# Check if line or trailing comment is a switch
+# Copy a file, using a reflink if the filesystem supports it
 # ------------------------------------------------------------------------------
-def check_switches(code, comm, dict_type_rules, dict_sw_block, dict_sw_line):
+def copy_file(src, dst):
     """
-    Check if line or trailing comment is a switch
+    Copy a file, using a reflink if the filesystem supports it
 
     Args:
-        comm: The comment part of a line to check for switches
-        dict_type_rules: Dictionary containing the regex to look for
-        dict_sw: Dictionary of switch values for either block or line
-        switches
+        src: The file to copy
+        dst: The file to copy to
 
-    This method checks to see if a line or trailing comment contains a
-    valid switch for the values in dict_type_rules. If a valid switch is
-    found, it sets the appropriate flag in either dict_sw_block or
-    dict_sw_line.
+    On filesystems that support it (btrfs, xfs, etc), the copy shares its
+    blocks with the original until one of them changes, so no data is copied.
+    Otherwise it falls back to shutil.copy2, which uses the fastest copy the
+    OS has. Either way, the mode and times are copied.
     """
 
-    # switch does not appear anywhere in line
-    res = re.search(dict_type_rules[C.S_KEY_SW_SCH], comm)
-    if not res:
+    # try to clone file
+    try:
+        # NB: not on all platforms (ie. windows), so import it here
+        import fcntl  # pylint: disable=import-outside-toplevel
+
+        with open(src, "rb") as a_src, open(dst, "wb") as a_dst:
+            fcntl.ioctl(a_dst.fileno(), I_FICLONE, a_src.fileno())
+        shutil.copystat(src, dst)
         return
+    except (ImportError, OSError):
+        pass
 
-    # find all matches (case insensitive)
-    matches = re.finditer(dict_type_rules[C.S_KEY_SW_SCH], comm, flags=re.I)
+    # do a normal copy
+    shutil.copy2(src, dst)
 
-    # for each match
-    for match in matches:
 
-        # get key/val of switch
-        key = match.group(dict_type_rules[C.S_KEY_SW_KEY])
-        val = match.group(dict_type_rules[C.S_KEY_SW_VAL])
+# ------------------------------------------------------------------------------
+# Make a dir match a list of members, only copying what changed
+# ------------------------------------------------------------------------------
+def sync_tree(dir_dst, list_items):
+    """
+    Make a dir match a list of members, only copying what changed
 
-        # try a bool conversion
-        # NB: in honor of John Valby (ddg him!)
-        val_b = val.lower()
-        if val_b == "true":
-            val = True
-        elif val_b == "false":
-            val = False
+    Args:
+        dir_dst: The dir to sync
+        list_items: A list of (arcname, path) in the form of list_archive
+        (path is None for a dir with no source), parents before children
+
+    Anything in the dir that is not in the list (or is a file where the list
+    wants a dir, or the other way) is removed. Each file is copied only if
+    its size or mtime is not the same as the source. If only the mtime is
+    different, the contents are compared, and a file with the same contents
+    just gets the source's stats. Modes of files and dirs are kept the same
+    as the source.
+    """
 
-        # pick a dict based on if there is preceding code
-        if code.strip() == "":
-            dict_sw_block[key] = val
+    # get items by path rel to dir (root is "")
+    dir_dst = Path(dir_dst)
+    dict_items = {}
+    for arcname, path in list_items:
+        rel = "" if arcname == "." else arcname.removeprefix("./")
+        dict_items[rel] = path
+
+    # --------------------------------------------------------------------------
+    # remove stale dirs/files
+
+    # NB: bottom up, so a dir's children are checked before it
+    if dir_dst.is_dir():
+        for root, dirs, files in os.walk(dir_dst, topdown=False):
+            for name in [*files, *dirs]:
+                path = Path(root, name)
+                rel = path.relative_to(dir_dst).as_posix()
+                is_dir = path.is_dir() and not path.is_symlink()
+
+                # keep it if the list has the same kind of thing
+                if rel in dict_items and not path.is_symlink():
+                    src = dict_items[rel]
+                    want_dir = src is None or src.is_dir()
+                    if want_dir == is_dir:
+                        continue
+
+                # remove it
+                if is_dir:
+                    shutil.rmtree(path)
+                else:
+                    path.unlink()
+
+    # --------------------------------------------------------------------------
+    # copy new/changed
+
+    for rel, src in dict_items.items():
+        dst = dir_dst / rel
+
+        # make dir
+        if src is None or src.is_dir():
+            dst.mkdir(parents=True, exist_ok=True)
+            if src is not None:
+                shutil.copymode(src, dst)
+            continue
+
+        # copy file if changed
+        if not _is_same_file(src, dst):
+            copy_file(src, dst)
+
+
+# ------------------------------------------------------------------------------
+# Check if a copied file is still the same as its source
+# ------------------------------------------------------------------------------
+def _is_same_file(src, dst):
+    """
+    Check if a copied file is still the same as its source
+
+    Args:
+        src: The source file
+        dst: The copy
+
+    Returns:
+        True if the copy does not need to be made again
+
+    Files with the same size and mtime are the same. Files with the same size
+    but not mtime are compared byte by byte, and if they are the same the
+    copy gets the source's stats, so the next check is quick. The mode is
+    fixed if it is all that changed.
+    """
+
+    # no copy yet
+    try:
+        stat_dst = dst.stat()
+    except OSError:
+        return False
+
+    # quick check
+    stat_src = src.stat()
+    if stat_src.st_size != stat_dst.st_size:
+        return False
+
+    # same size, new mtime, check contents
+    if stat_src.st_mtime_ns != stat_dst.st_mtime_ns:
+        if not filecmp.cmp(src, dst, shallow=False):
+            return False
+        shutil.copystat(src, dst)
+        return True
+
+    # same file, maybe new mode
+    if stat_src.st_mode != stat_dst.st_mode:
+        shutil.copymode(src, dst)
+    return True
+
+
+# ------------------------------------------------------------------------------
+# Write text to a file, but only if it has changed
+# ------------------------------------------------------------------------------
+def write_if_changed(path, text):
+    """
+    Write text to a file, but only if it has changed
+
+    Args:
+        path: Path of the file to write
+        text: The new text of the file
+
+    Returns:
+        True if the file was written, False if it was unchanged
+
+    This function compares the new text to the file's current contents, and
+    skips the write if they are the same, so the file's mtime is not bumped.
+    Otherwise it writes to a temp file in the same dir and renames it over the
+    old file, so the file is never left half-written (see _replace_file for
+    links). The counts of written and skipped files are kept in conf.
+    """
+
+    # sanity check
+    # NB: write through symlinks to the real file, so the link stays a link
+    path = Path(os.path.realpath(path))
+
+    # get old text
+    # NB: don't translate newlines, so line endings are fixed same as before
+    text_old = None
+    if path.exists():
+        with open(path, "r", encoding=C.S_ENCODING, newline="") as a_file:
+            text_old = a_file.read()
+
+    # same text, skip write
+    if text == text_old:
+        with C.LOCK_WRITE:
+            C.I_FILES_SKIPPED += 1
+        return False
+
+    # new file, just write it (with default permissions)
+    if text_old is None:
+        with open(path, "w", encoding=C.S_ENCODING) as a_file:
+            a_file.write(text)
+
+    # old file, write a temp file next to it (so rename is atomic)
+    else:
+        fd, tmp = tempfile.mkstemp(
+            dir=path.parent, prefix=f".{path.name}.", suffix=".tmp"
+        )
+
+        try:
+            # write new text
+            with open(fd, "w", encoding=C.S_ENCODING) as a_file:
+                a_file.write(text)
+
+            # replace old file
+            _replace_file(tmp, path)
+        finally:
+            # throw away temp file on error
+            Path(tmp).unlink(missing_ok=True)
+
+    # count the write
+    with C.LOCK_WRITE:
+        C.I_FILES_WRITTEN += 1
+    return True
+
+
+# ------------------------------------------------------------------------------
+# Fix a file line by line into a temp file, and replace it if it changed
+# ------------------------------------------------------------------------------
+def stream_if_changed(path, fix_lines):
+    """
+    Fix a file line by line into a temp file, and replace it if it changed
+
+    Args:
+        path: Path of the file to fix
+        fix_lines: A generator function that takes an iterable of lines and
+        yields one fixed line for each
+
+    Returns:
+        True if the file was written, False if it was unchanged
+
+    This is the streaming version of write_if_changed, for files too big to
+    read into memory. The fixed lines are written to a temp file in the same
+    dir, which is renamed over the old file if any line changed, or deleted if
+    not (see _replace_file for links). The counts of written and skipped files
+    are kept in conf.
+    """
+
+    # sanity check
+    # NB: write through symlinks to the real file, so the link stays a link
+    path = Path(os.path.realpath(path))
+
+    # whether any line was changed
+    changed = False
+
+    # make a temp file next to the old one (so rename is atomic)
+    fd, tmp = tempfile.mkstemp(
+        dir=path.parent, prefix=f".{path.name}.", suffix=".tmp"
+    )
+
+    try:
+        with open(path, "r", encoding=C.S_ENCODING) as a_in, open(
+            fd, "w", encoding=C.S_ENCODING
+        ) as a_out:
+
+            # NB: tee only holds the line the fixer is working on
+            it_fix, it_old = itertools.tee(a_in)
+            for line_old, line_new in zip(it_old, fix_lines(it_fix)):
+                if line_new != line_old:
+                    changed = True
+                a_out.write(line_new)
+
+            # NB: reading translates newlines, writing does not put them back
+            if a_in.newlines not in [None, "\n"]:
+                changed = True
+
+        # replace old file
+        if changed:
+            _replace_file(tmp, path)
+    finally:
+        # throw away temp file if not used (or on error)
+        Path(tmp).unlink(missing_ok=True)
+
+    # count the write/skip
+    with C.LOCK_WRITE:
+        if changed:
+            C.I_FILES_WRITTEN += 1
         else:
-            dict_sw_line[key] = val
+            C.I_FILES_SKIPPED += 1
+    return changed
 
 
 # ------------------------------------------------------------------------------
-# Get the filetype-specific regexes (headers, comments. switches)
+# Move a temp file over an old file, keeping the old file's inode if needed
 # ------------------------------------------------------------------------------
-def get_type_rules(path):
+def _replace_file(tmp, path):
     """
-    Get the filetype-specific regexes (headers, comments. switches)
+    Move a temp file over an old file, keeping the old file's inode if needed
 
     Args:
-        path: Path of the file to get the dict of regexes for
+        tmp: Path of the temp file with the new contents
+        path: Path of the old file (not a symlink)
+
+    A rename gives the file a new inode, owned by us, which would break hard
+    links to the old file and change its owner. So if the old file has other
+    links, or someone else owns it, the new contents are copied into it
+    instead (not atomic, but the file is still the same file). Otherwise the
+    temp file gets the old file's permissions and is renamed over it.
+    """
+
+    # get old file's links and owner
+    stat = os.stat(path)
+    uid = os.geteuid() if hasattr(os, "geteuid") else stat.st_uid
+
+    # hard links or not ours, write in place
+    if stat.st_nlink > 1 or stat.st_uid != uid:
+        shutil.copyfile(tmp, path)
+
+    # keep old file's permissions and replace it
+    else:
+        shutil.copymode(path, tmp)
+        os.replace(tmp, path)
+
+
+# ------------------------------------------------------------------------------
+# Get the members of an archive of a dir
+# ------------------------------------------------------------------------------
+def list_archive(dir_in):
+    """
+    Get the members of an archive of a dir
+
+    Args:
+        dir_in: The dir to archive
 
     Returns:
-        The dict of regexes for this file type
+        A list of (arcname, path) for the dir and everything under it
+
+    The names are relative to the dir, starting with "./" (the same as
+    shutil.make_archive with root_dir), and sorted depth first, so the same
+    tree always gives the same list.
     """
 
-    # iterate over reps
-    for _key, val in C.D_TYPE_RULES.items():
+    # the members so far
+    list_items = []
 
-        # fix ets if necessary
-        exts = val[C.S_KEY_RULES_EXT]
+    # add a path, then its children
+    def _add(path, arcname):
+        list_items.append((arcname, path))
+        if path.is_dir() and not path.is_symlink():
+            for name in sorted(os.listdir(path)):
+                _add(path / name, f"{arcname}/{name}")
 
-        # lower case all exts
-        l_exts = [item.lower() for item in exts]
+    _add(Path(dir_in), ".")
+    return list_items
 
-        # add dots
-        l_exts = [
-            f".{item}" if not item.startswith(".") else item for item in l_exts
-        ]
 
-        # check if the suffix or the filename (for dot files) matches
-        # NB: also checks for dot files
-        if path.suffix.lower() in l_exts or path.name.lower() in l_exts:
-            return val[C.S_KEY_RULES_REP]
+# ------------------------------------------------------------------------------
+# Get the path of an archive
+# ------------------------------------------------------------------------------
+def get_archive_path(path_base, codec):
+    """
+    Get the path of an archive
 
-    # default result is py rep
-    return {}
+    Args:
+        path_base: The path of the archive, without the ext
+        codec: The key of the codec in D_ARC_CODECS
+
+    Returns:
+        The path of the archive, or None if the codec is not known
+    """
+
+    # unknown codec
+    if codec not in D_ARC_CODECS:
+        return None
+
+    # add codec's ext
+    ext, _open_codec = D_ARC_CODECS[codec]
+    return Path(f"{path_base}{ext}")
+
+
+# ------------------------------------------------------------------------------
+# Get the mtime of all members in an archive
+# ------------------------------------------------------------------------------
+def get_archive_mtime():
+    """
+    Get the mtime of all members in an archive
+
+    Returns:
+        The value of SOURCE_DATE_EPOCH, if it is set to a number, else
+        C.I_DIST_MTIME
+
+    See https://reproducible-builds.org/specs/source-date-epoch/
+    """
+
+    try:
+        return int(os.environ[S_ENV_SDE])
+    except (KeyError, ValueError):
+        return C.I_DIST_MTIME
+
+
+# ------------------------------------------------------------------------------
+# Get a hash of everything that goes into an archive
+# ------------------------------------------------------------------------------
+def hash_archive(list_items, codec, dict_cache):
+    """
+    Get a hash of everything that goes into an archive
+
+    Args:
+        list_items: A list of (arcname, path) in the form of make_archive
+        codec: The key of the codec in D_ARC_CODECS
+        dict_cache: The file hashes from the last call (see Returns)
+
+    Returns:
+        A tuple of (hash, dict of file hashes)
+
+    The hash covers the codec and its settings, the mtime, and the name,
+    mode and contents of each member, so two archives with the same hash are
+    the same. The file hashes are saved by arcname with the file's size and
+    mtime, so files that have not changed since the last call are not read
+    again, whether they come from the project or the dist folder, and the
+    dict does not change if the project is moved. Pass the returned dict back
+    in next time.
+    """
+
+    # hash the settings
+    hasher = hashlib.sha256()
+    list_set = [codec, get_archive_mtime(), C.I_DIST_BLOCK]
+    hasher.update(json.dumps(list_set).encode(C.S_ENCODING))
+
+    # file hashes used this time
+    dict_new = {}
+
+    # hash each member
+    for arcname, path in list_items:
+
+        # dirs (made or copied)
+        # NB: follow links, same as make_archive
+        if path is None or path.is_dir():
+            entry = [arcname, _get_arc_mode(0, True)]
+
+        # files
+        elif path.is_file():
+            stats = path.stat()
+            key = arcname
+            size_mtime = [stats.st_size, stats.st_mtime_ns]
+
+            # get hash of contents, if it changed
+            entry_old = dict_cache.get(key)
+            if entry_old and entry_old[:2] == size_mtime:
+                str_hash = entry_old[2]
+            else:
+                hasher_file = hashlib.sha256()
+                with open(path, "rb") as a_file:
+                    while chunk := a_file.read(C.I_DIST_BLOCK):
+                        hasher_file.update(chunk)
+                str_hash = hasher_file.hexdigest()
+            dict_new[key] = [*size_mtime, str_hash]
+
+            entry = [arcname, _get_arc_mode(stats.st_mode, False), str_hash]
+
+        # NB: sockets, etc are not archived
+        else:
+            continue
+
+        # add member
+        hasher.update(json.dumps(entry).encode(C.S_ENCODING))
+
+    return (hasher.hexdigest(), dict_new)
+
+
+# ------------------------------------------------------------------------------
+# Make an archive from a list of members
+# ------------------------------------------------------------------------------
+def make_archive(path_base, list_items, codec, jobs=1):
+    """
+    Make an archive from a list of members
+
+    Args:
+        path_base: The path of the archive, without the ext
+        list_items: A list of (arcname, path) to add, in order (path is
+        None for a dir with no file)
+        codec: The key of the codec in D_ARC_CODECS
+        jobs: The number of threads the codec may use (default: 1)
+
+    Returns:
+        The path to the archive
+
+    Raises:
+        ValueError if the codec is not known or not available
+        OSError if a file can't be read or the archive can't be written
+
+    Files are read straight from their paths into the archive, so they don't
+    need to be copied into one dir first. Members have no owner, the same
+    mtime (see get_archive_mtime), and a mode of 755 or 644 (see
+    _get_arc_mode), so the same files always make the same archive. The
+    archive is written to a unique temp file next to it and moved into place
+    when done, so two builds at once don't write the same temp file.
+    """
+
+    # get the codec and out file
+    path_out = get_archive_path(path_base, codec)
+    if path_out is None:
+        raise ValueError(C.S_ERR_CODEC.format(codec))
+    _ext, open_codec = D_ARC_CODECS[codec]
+
+    # make the temp file
+    fd, tmp = tempfile.mkstemp(
+        dir=path_out.parent, prefix=f".{path_out.name}.", suffix=".tmp"
+    )
+    path_tmp = Path(tmp)
+
+    try:
+        with open(fd, "wb") as a_file:
+
+            # NB: mkstemp makes it 600, use the same mode as a plain member
+            os.chmod(path_tmp, _get_arc_mode(0, False))
+
+            # NB: a stream tar, so nothing needs to seek
+            stream = open_codec(a_file, jobs)
+            try:
+                # NB: follow links, same as copying the files
+                with tarfile.open(
+                    fileobj=stream, mode="w|", dereference=True
+                ) as tar:
+                    for arcname, path in list_items:
+                        _add_member(tar, arcname, path)
+            finally:
+                stream.close()
+
+        # replace old archive
+        os.replace(path_tmp, path_out)
+    finally:
+        # throw away temp file on error
+        path_tmp.unlink(missing_ok=True)
+
+    return path_out
+
+
+# ------------------------------------------------------------------------------
+# Add one file/dir to an archive, with fixed owner, mtime, and mode
+# ------------------------------------------------------------------------------
+def _add_member(tar, arcname, path):
+    """
+    Add one file/dir to an archive, with fixed owner, mtime, and mode
+
+    Args:
+        tar: The TarFile to add to
+        arcname: The name of the member in the archive
+        path: The file/dir to add (or None for a dir with no file)
+    """
+
+    # NB: dirs made for a dist map have no file (see C.get_dist_map)
+    if path is None:
+        info = tarfile.TarInfo(arcname)
+        info.type = tarfile.DIRTYPE
+        info.mode = 0o755
+    else:
+        info = tar.gettarinfo(str(path), arcname)
+
+    # NB: sockets, etc
+    if info is None:
+        return
+
+    # no owner, fixed mtime and mode
+    info.uid = info.gid = 0
+    info.uname = info.gname = ""
+    info.mtime = get_archive_mtime()
+    info.mode = _get_arc_mode(info.mode, info.isdir())
+
+    # add contents of regular files
+    if info.isreg():
+        with open(path, "rb") as a_file:
+            tar.addfile(info, a_file)
+    else:
+        tar.addfile(info)
+
+
+# ------------------------------------------------------------------------------
+# Get the mode of a member in an archive
+# ------------------------------------------------------------------------------
+def _get_arc_mode(mode, is_dir):
+    """
+    Get the mode of a member in an archive
+
+    Args:
+        mode: The mode of the file
+        is_dir: Whether the member is a dir
+
+    Returns:
+        755 for dirs and files that anyone can run, 644 for other files
+
+    Only the run bits are kept, so the archive does not depend on the umask
+    of whoever made the files.
+    """
+
+    # dirs and scripts
+    if is_dir or mode & 0o111:
+        return 0o755
+
+    # other files
+    return 0o644
+
+
+# ------------------------------------------------------------------------------
+# Open a gzip stream
+# ------------------------------------------------------------------------------
+def _open_gz(fileobj, _jobs):
+    """
+    Open a gzip stream
+
+    Args:
+        fileobj: The binary file to write to
+        jobs: The number of threads to use (not used)
+
+    Returns:
+        A writable stream that compresses to the file
+    """
+
+    # NB: no name and mtime 0 in header, so the output is the same every time
+    return gzip.GzipFile(
+        filename="", mode="wb", compresslevel=9, fileobj=fileobj, mtime=0
+    )
+
+
+# ------------------------------------------------------------------------------
+# Open a parallel gzip stream
+# ------------------------------------------------------------------------------
+def _open_pgz(fileobj, jobs):
+    """
+    Open a parallel gzip stream
+
+    Args:
+        fileobj: The binary file to write to
+        jobs: The number of threads to use
+
+    Returns:
+        A writable stream that compresses to the file (see PyPlateGzip)
+    """
+
+    return PyPlateGzip(fileobj, level=9, jobs=jobs)
+
+
+# ------------------------------------------------------------------------------
+# Open an xz stream
+# ------------------------------------------------------------------------------
+def _open_xz(fileobj, _jobs):
+    """
+    Open an xz stream
+
+    Args:
+        fileobj: The binary file to write to
+        jobs: The number of threads to use (not used)
+
+    Returns:
+        A writable stream that compresses to the file
+    """
+
+    return lzma.LZMAFile(fileobj, "wb")
+
+
+# ------------------------------------------------------------------------------
+# Open a zstd stream
+# ------------------------------------------------------------------------------
+def _open_zst(fileobj, jobs):
+    """
+    Open a zstd stream
+
+    Args:
+        fileobj: The binary file to write to
+        jobs: The number of threads to use (zstandard only)
+
+    Returns:
+        A writable stream that compresses to the file
+
+    Raises:
+        ValueError if there is no zstd module
+    """
+
+    # NB: zstandard can use threads, and its stream does not close the file
+    if zstandard:
+        comp = zstandard.ZstdCompressor(threads=jobs)
+        return comp.stream_writer(fileobj, closefd=False)
+    if zstd:
+        return zstd.ZstdFile(fileobj, "wb")
+    raise ValueError(C.S_ERR_CODEC.format("zsttar"))
+
+
+# the archive codecs, by name (ext, function to open a stream)
+# NB: the names are the same as shutil's, where there is one
+D_ARC_CODECS = {
+    "gztar": (".tar.gz", _open_gz),
+    "pgztar": (".tar.gz", _open_pgz),
+    "xztar": (".tar.xz", _open_xz),
+    "zsttar": (".tar.zst", _open_zst),
+}
 
 
 # ------------------------------------------------------------------------------
@@ -22,9 +22,11 @@ directory).
 
 # system imports
 import argparse
+from concurrent.futures import ThreadPoolExecutor
 import gettext
 import json
 import locale
+import os
 from pathlib import Path
 import re
 import shlex
@@ -131,6 +133,13 @@ class CNInstallBase:
     # I18N: quiet option help
     S_ARG_QUIET_HELP = _("do not print any messages")
 
+    # link option strings
+    S_ARG_LINK_OPTION = "-l"
+    S_ARG_LINK_ACTION = "store_true"
+    S_ARG_LINK_DEST = "LINK_DEST"
+    # I18N: link option help
+    S_ARG_LINK_HELP = _("hard link files instead of copying, if on same disk")
+
     # help option strings
     S_ARG_HLP_OPTION = "-h"
     S_ARG_HLP_ACTION = "store_true"
@@ -196,6 +205,17 @@ class CNInstallBase:
     # NB: format param is pre/post script path
     S_CMD_EXTERNAL = "python {}"
 
+    # --------------------------------------------------------------------------
+    # copy stuff
+
+    # number of workers for copying files
+    I_COPY_JOBS = 8
+    # size of each chunk when copying files
+    I_COPY_BUF = 1048576  # in bytes (1 Mb)
+    # ioctl to make a reflink (copy-on-write clone) of a file (btrfs, xfs)
+    # NB: FICLONE from linux/fs.h
+    I_IOC_CLONE = 0x40049409
+
     # --------------------------------------------------------------------------
     # dry run messages
 
@@ -326,6 +346,7 @@ class CNInstallBase:
         self._arg_dry = False
         self._arg_force = False
         self._arg_quiet = False
+        self._arg_link = False
 
         # contents of install.json
         self._dict_cfg = {}
@@ -378,6 +399,14 @@ class CNInstallBase:
             help=self.S_ARG_QUIET_HELP,
         )
 
+        # add link option
+        self._parser.add_argument(
+            self.S_ARG_LINK_OPTION,
+            action=self.S_ARG_LINK_ACTION,
+            dest=self.S_ARG_LINK_DEST,
+            help=self.S_ARG_LINK_HELP,
+        )
+
         # always add help option
         self._parser.add_argument(
             self.S_ARG_HLP_OPTION,
@@ -426,6 +455,9 @@ class CNInstallBase:
         self._arg_quiet = self._dict_args.get(
             self.S_ARG_QUIET_DEST, self._arg_quiet
         )
+        self._arg_link = self._dict_args.get(
+            self.S_ARG_LINK_DEST, self._arg_link
+        )
 
         # print default about text
         if not self._arg_quiet:
@@ -611,6 +643,169 @@ class CNInstallBase:
             print(self.S_ERR_ERR, e)
             self._teardown(-1)
 
+    # --------------------------------------------------------------------------
+    # Copy files/dirs to their dests, using a pool of workers
+    # --------------------------------------------------------------------------
+    def _copy_items(self, list_items: list[tuple[Path, Path]]):
+        """
+        Copy files/dirs to their dests, using a pool of workers
+
+        Args:
+            list_items: A list of (src, dst), where src is a file or dir
+
+        Raises:
+            OSError if a file or dir can not be copied
+
+        Does the same as shutil.copytree(dirs_exist_ok=True) for dirs and
+        shutil.copy for files, but all the dirs are made first and then all
+        the files are copied at once by I_COPY_JOBS workers (see _copy_file).
+        """
+
+        # files to copy and dirs to fix
+        list_files = []
+        list_dirs = []
+
+        # for each item
+        for src, dst in list_items:
+
+            # if the source is a dir
+            if src.is_dir():
+
+                # make all the dirs and get all the files
+                # NB: follow links, same as copytree
+                for root, _dirs, files in os.walk(src, followlinks=True):
+                    src_root = Path(root)
+                    dst_root = dst / src_root.relative_to(src)
+                    dst_root.mkdir(parents=True, exist_ok=True)
+                    list_dirs.append((src_root, dst_root))
+
+                    # NB: check disk once per item, not per file
+                    if src_root == src:
+                        same_dev = src.stat().st_dev == dst.stat().st_dev
+
+                    for name in files:
+                        list_files.append(
+                            (src_root / name, dst_root / name, same_dev)
+                        )
+
+            # if the src is a file
+            else:
+                same_dev = src.stat().st_dev == dst.parent.stat().st_dev
+                list_files.append((src, dst, same_dev))
+
+        # copy all files at once
+        with ThreadPoolExecutor(max_workers=self.I_COPY_JOBS) as pool:
+            list_fut = [
+                pool.submit(self._copy_file, src, dst, same_dev)
+                for src, dst, same_dev in list_files
+            ]
+
+        # NB: raise the first error, same as the serial copy
+        for fut in list_fut:
+            fut.result()
+
+        # copy dir stats last, deepest first, since copying files changes them
+        for src, dst in reversed(list_dirs):
+            shutil.copystat(src, dst)
+
+    # --------------------------------------------------------------------------
+    # Copy one file, the fastest way possible
+    # --------------------------------------------------------------------------
+    def _copy_file(self, src: Path, dst: Path, same_dev: bool):
+        """
+        Copy one file, the fastest way possible
+
+        Args:
+            src: The file to copy
+            dst: The path to copy the file to
+            same_dev: Whether src and dst are on the same disk
+
+        Raises:
+            OSError if the file can not be copied
+
+        Tries a hard link (if -l was passed and both are on the same disk),
+        then a reflink (same disk, if the file system can), then
+        copy_file_range (done by the kernel, or the server on NFS), then a
+        plain copy with a large buffer.
+        """
+
+        # hard link, if asked for
+        if self._arg_link and same_dev:
+            try:
+                dst.unlink(missing_ok=True)
+                # NB: link the real file, same as copying a symlink's contents
+                os.link(src.resolve(), dst)
+                return
+            except OSError:
+                pass
+
+        # copy contents
+        with open(src, "rb") as f_src, open(dst, "wb") as f_dst:
+            if not same_dev or not self._clone_file(f_src, f_dst):
+                self._copy_range(f_src, f_dst)
+
+        # copy stats, same as copytree
+        shutil.copystat(src, dst)
+
+    # --------------------------------------------------------------------------
+    # Make a reflink of an open file
+    # --------------------------------------------------------------------------
+    def _clone_file(self, f_src, f_dst) -> bool:
+        """
+        Make a reflink of an open file
+
+        Args:
+            f_src: The file to copy, open for reading
+            f_dst: The file to copy to, open for writing
+
+        Returns:
+            True if the reflink was made, False if the file system can not
+        """
+
+        # NB: shares the blocks of src, so nothing is copied until one changes
+        try:
+            # NB: not on all platforms (ie. windows), so import it here
+            import fcntl  # pylint: disable=import-outside-toplevel
+
+            fcntl.ioctl(f_dst.fileno(), self.I_IOC_CLONE, f_src.fileno())
+            return True
+        except (ImportError, OSError):
+            return False
+
+    # --------------------------------------------------------------------------
+    # Copy the contents of an open file in large chunks
+    # --------------------------------------------------------------------------
+    def _copy_range(self, f_src, f_dst):
+        """
+        Copy the contents of an open file in large chunks
+
+        Args:
+            f_src: The file to copy, open for reading
+            f_dst: The file to copy to, open for writing
+
+        Raises:
+            OSError if the file can not be copied
+        """
+
+        # copy in kernel, if we can
+        copy_file_range = getattr(os, "copy_file_range", None)
+        size = 0
+        if copy_file_range is not None:
+            try:
+                while num := copy_file_range(
+                    f_src.fileno(), f_dst.fileno(), self.I_COPY_BUF
+                ):
+                    size += num
+                return
+            except OSError:
+                # NB: not there (old kernel, some file systems), but only fall
+                # back if nothing was copied yet
+                if size:
+                    raise
+
+        # copy in python
+        shutil.copyfileobj(f_src, f_dst, self.I_COPY_BUF)
+
     # --------------------------------------------------------------------------
     # Compare two semantic versions
     # --------------------------------------------------------------------------
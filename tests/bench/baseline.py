@@ -0,0 +1,454 @@
+# ------------------------------------------------------------------------------
+# Project : PyPlate                                                /          \
+# Filename: baseline.py                                           |     ()     |
+# Date    : 10/18/2026                                            |            |
+# Author  : cyclopticnerve                                        |   \____/   |
+# License : WTFPLv2                                                \          /
+# ------------------------------------------------------------------------------
+
+"""
+The dunder fixer as it was before the fix engine was rewritten
+
+This module is a copy of the old _do_fix, _fix_contents, _fix_header,
+_fix_text and _fix_path, without the object. It does a str.replace for each
+key in dict order, on every line, and expands the blacklist globs with
+Path.glob. The benchmarks fix a twin of each tree with it, and check that the
+new fixer made the same files.
+"""
+
+# ------------------------------------------------------------------------------
+# Imports
+# ------------------------------------------------------------------------------
+
+# system imports
+import os
+from pathlib import Path
+import re
+
+# local imports
+import synth
+
+# ------------------------------------------------------------------------------
+# Globals
+# ------------------------------------------------------------------------------
+
+# just shorten the name
+C = synth.C
+
+# bytes to check for NUL (the old fixer had no binary check, so use the same
+# size as the new one)
+I_BIN_SNIFF = C.I_BIN_SNIFF
+
+# ------------------------------------------------------------------------------
+# Public functions
+# ------------------------------------------------------------------------------
+
+
+# ------------------------------------------------------------------------------
+# Fix the contents and paths of a tree
+# ------------------------------------------------------------------------------
+def fix_tree(dir_prj, dict_rep, dict_bl=None, contents=True, paths=True):
+    """
+    Fix the contents and paths of a tree
+
+    Args:
+        dir_prj: The project dir
+        dict_rep: The dict of dunders and their replacements
+        dict_bl: The blacklist dict, or None to fix everything (default:
+        None)
+        contents: Whether to fix file contents (default: True)
+        paths: Whether to rename dirs/files (default: True)
+
+    Binary files are skipped, the same as the new fixer. All contents are
+    fixed before any path is renamed, deepest first, so no dir is renamed
+    while it is still being walked.
+    """
+
+    # expand the blacklist globs, same as the old _do_fix
+    dir_prj = Path(dir_prj)
+    dict_bl = dict_bl or {}
+    dict_glob = {}
+    for key in [
+        C.S_KEY_SKIP_ALL,
+        C.S_KEY_SKIP_CONTENTS,
+        C.S_KEY_SKIP_HEADER,
+        C.S_KEY_SKIP_CODE,
+    ]:
+        list_res = []
+        for item in dict_bl.get(key, []):
+            list_res.extend(dir_prj.glob(item))
+        dict_glob[key] = set(list_res)
+    skip_all = dict_glob[C.S_KEY_SKIP_ALL]
+    skip_contents = dict_glob[C.S_KEY_SKIP_CONTENTS]
+    skip_header = dict_glob[C.S_KEY_SKIP_HEADER]
+    skip_code = dict_glob[C.S_KEY_SKIP_CODE]
+
+    # walk the tree
+    list_paths = []
+    for root, root_dirs, root_files in os.walk(dir_prj):
+        root = Path(root)
+
+        # handle dirs in skip_all
+        if root in skip_all:
+            root_dirs.clear()
+            continue
+
+        # for each file item
+        for item in [root / f for f in root_files]:
+
+            # handle files in skip_all
+            if item in skip_all:
+                continue
+
+            # handle dirs/files in skip_contents
+            if (
+                contents
+                and root not in skip_contents
+                and item not in skip_contents
+                and not _is_binary(item)
+            ):
+                bl_hdr = root in skip_header or item in skip_header
+                bl_code = root in skip_code or item in skip_code
+                fix_file(item, dict_rep, bl_hdr, bl_code)
+
+            list_paths.append(item)
+
+        list_paths.append(root)
+
+    # rename deepest first
+    if paths:
+        list_paths.sort(key=lambda path: len(path.parts), reverse=True)
+        for item in list_paths:
+            name = fix_name(item.name, dict_rep)
+            if name != item.name:
+                item.rename(item.parent / name)
+
+
+# ------------------------------------------------------------------------------
+# Fix header or code for each line in a file
+# ------------------------------------------------------------------------------
+def fix_file(path, dict_rep, bl_hdr=False, bl_code=False):
+    """
+    Fix header or code for each line in a file
+
+    Args:
+        path: Path for replacing text
+        dict_rep: The dict of dunders and their replacements
+        bl_hdr: Whether the file is blacklisted for header lines (default:
+        False)
+        bl_code: Whether the file is blacklisted for code lines (default:
+        False)
+    """
+
+    # check for unknown file types
+    dict_type_rules = get_type_rules(path)
+    if not dict_type_rules:
+        _fix_text(path, dict_rep)
+        return
+
+    # switches start at default for each file
+    dict_sw_block = dict(C.D_SWITCH_DEF)
+    dict_sw_line = dict(dict_sw_block)
+
+    # open and read file
+    with open(path, "r", encoding=C.S_ENCODING) as a_file:
+        lines = a_file.readlines()
+
+    # for each line in array
+    for index, line in enumerate(lines):
+
+        # skip blank lines
+        if line.strip() == "":
+            continue
+
+        # split the line into code and comm
+        code = line
+        comm = ""
+        split_sch = dict_type_rules.get(C.S_KEY_SPLIT, None)
+        split_grp = dict_type_rules.get(C.S_KEY_SPLIT_COMM, None)
+        if split_sch and split_grp:
+            matches = re.finditer(split_sch, line)
+            matches = [match for match in matches if match.group(split_grp)]
+            for match in matches:
+                split_pos = match.start(split_grp)
+                code = line[:split_pos]
+                comm = line[split_pos:]
+
+            # check for switches
+            dict_sw_line = dict(dict_sw_block)
+            check_switches(
+                code, comm, dict_type_rules, dict_sw_block, dict_sw_line
+            )
+            repl = (
+                dict_sw_block[C.S_SW_REPLACE] is True
+                and dict_sw_line[C.S_SW_REPLACE] is True
+            ) or dict_sw_line[C.S_SW_REPLACE] is True
+            if not repl:
+                continue
+
+        # check for header
+        if not bl_hdr:
+            if re.search(dict_type_rules[C.S_KEY_HDR_SCH], line):
+                lines[index] = _fix_header(line, dict_type_rules, dict_rep)
+                continue
+
+        # must be code
+        if not bl_code:
+            lines[index] = fix_name(code, dict_rep) + comm
+
+    # open and write file
+    with open(path, "w", encoding=C.S_ENCODING) as a_file:
+        a_file.writelines(lines)
+
+
+# ------------------------------------------------------------------------------
+# Replace dunders in a string, one key at a time
+# ------------------------------------------------------------------------------
+def fix_name(text, dict_rep):
+    """
+    Replace dunders in a string, one key at a time
+
+    Args:
+        text: The string to replace dunders in
+        dict_rep: The dict of dunders and their replacements
+
+    Returns:
+        The string with all dunders replaced
+
+    This is the ordered replace the old _fix_code, _fix_text and _fix_path
+    all used.
+    """
+
+    # replace each key in dict order
+    for key, val in dict_rep.items():
+        if isinstance(val, str):
+            text = text.replace(key, val)
+
+    return text
+
+
+# ------------------------------------------------------------------------------
+# Check if line or trailing comment is a switch
+# ------------------------------------------------------------------------------
+def check_switches(code, comm, dict_type_rules, dict_sw_block, dict_sw_line):
+    """
+    Check if line or trailing comment is a switch
+
+    Args:
+        code: The code part of the line
+        comm: The comment part of the line
+        dict_type_rules: The type rules for the file
+        dict_sw_block: The block switches
+        dict_sw_line: The line switches
+    """
+
+    # switch does not appear anywhere in line
+    str_sch = dict_type_rules[C.S_KEY_SW_SCH]
+    if not re.search(str_sch, comm):
+        return
+
+    # find all matches (case insensitive)
+    for match in re.finditer(str_sch, comm, flags=re.I):
+        key = match.group(dict_type_rules[C.S_KEY_SW_KEY])
+        val = match.group(dict_type_rules[C.S_KEY_SW_VAL])
+        val_b = val.lower()
+        if val_b == "true":
+            val = True
+        elif val_b == "false":
+            val = False
+
+        # pick a dict based on if there is preceding code
+        if code.strip() == "":
+            dict_sw_block[key] = val
+        else:
+            dict_sw_line[key] = val
+
+
+# ------------------------------------------------------------------------------
+# Get the filetype-specific regexes (headers, comments. switches)
+# ------------------------------------------------------------------------------
+def get_type_rules(path):
+    """
+    Get the filetype-specific regexes (headers, comments. switches)
+
+    Args:
+        path: Path of the file to get the dict of regexes for
+
+    Returns:
+        The dict of (uncompiled) regexes for this file type
+    """
+
+    # iterate over reps
+    for val in C.D_TYPE_RULES.values():
+        l_exts = [item.lower() for item in val[C.S_KEY_RULES_EXT]]
+        l_exts = [
+            f".{item}" if not item.startswith(".") else item for item in l_exts
+        ]
+        if path.suffix.lower() in l_exts or path.name.lower() in l_exts:
+            return val[C.S_KEY_RULES_REP]
+
+    return {}
+
+
+# ------------------------------------------------------------------------------
+# Compare a tree fixed by the new fixer to one fixed by this module
+# ------------------------------------------------------------------------------
+def diff_trees(dir_new, dir_old):
+    """
+    Compare a tree fixed by the new fixer to one fixed by this module
+
+    Args:
+        dir_new: The tree fixed by the new fixer
+        dir_old: The tree fixed by fix_tree
+
+    Returns:
+        A sorted list of the rel paths that are only in one tree or have
+        different contents (empty if the trees are the same)
+
+    The pyplate dir is not compared, since only the new fixer saves its
+    config there.
+    """
+
+    # get rel paths and contents of each tree
+    dict_new = _read_tree(Path(dir_new))
+    dict_old = _read_tree(Path(dir_old))
+
+    # find any difference
+    return sorted(
+        rel
+        for rel in dict_new.keys() | dict_old.keys()
+        if dict_new.get(rel) != dict_old.get(rel)
+    )
+
+
+# ------------------------------------------------------------------------------
+# Write a file, even if it has not changed
+# ------------------------------------------------------------------------------
+def write_text(path, text):
+    """
+    Write a file, even if it has not changed
+
+    Args:
+        path: The file to write
+        text: The new contents of the file
+
+    This is how the conf.py fix functions wrote files before
+    write_if_changed.
+    """
+
+    # open and write file
+    with open(path, "w", encoding=C.S_ENCODING) as a_file:
+        a_file.write(text)
+
+
+# ------------------------------------------------------------------------------
+# Private functions
+# ------------------------------------------------------------------------------
+
+
+# ------------------------------------------------------------------------------
+# Replace dunders inside a file header
+# ------------------------------------------------------------------------------
+def _fix_header(line, dict_type_rules, dict_rep):
+    """
+    Replace dunders inside a file header
+
+    Args:
+        line: The header line
+        dict_type_rules: The type rules for the file
+        dict_rep: The dict of dunders and their replacements
+
+    Returns:
+        The new header line
+    """
+
+    # break apart header line
+    res = re.search(dict_type_rules[C.S_KEY_HDR_SCH], line)
+    if not res:
+        return line
+    lead = res.group(dict_type_rules[C.S_KEY_LEAD])
+    val = res.group(dict_type_rules[C.S_KEY_VAL])
+    pad = res.group(dict_type_rules[C.S_KEY_CAPTION_PAD])
+
+    # keep the right-aligned text where it was
+    tmp_val = fix_name(str(val), dict_rep)
+    val_diff = len(tmp_val) - len(val)
+    tmp_rat = pad.lstrip()
+    pad = " " * (len(pad) - len(tmp_rat) - val_diff)
+
+    return lead + tmp_val + pad + tmp_rat + "\n"
+
+
+# ------------------------------------------------------------------------------
+# Replace dunders in each line of a file with no type rules
+# ------------------------------------------------------------------------------
+def _fix_text(path, dict_rep):
+    """
+    Replace dunders in each line of a file with no type rules
+
+    Args:
+        path: The path to the file to fix
+        dict_rep: The dict of dunders and their replacements
+    """
+
+    # open and read file
+    with open(path, "r", encoding=C.S_ENCODING) as a_file:
+        lines = a_file.readlines()
+
+    # replace in each non-blank line
+    lines = [
+        line if line.strip() == "" else fix_name(line, dict_rep)
+        for line in lines
+    ]
+
+    # open and write file
+    with open(path, "w", encoding=C.S_ENCODING) as a_file:
+        a_file.writelines(lines)
+
+
+# ------------------------------------------------------------------------------
+# Check the start of a file for a NUL byte
+# ------------------------------------------------------------------------------
+def _is_binary(path):
+    """
+    Check the start of a file for a NUL byte
+
+    Args:
+        path: Path of the file to check
+
+    Returns:
+        True if there is a NUL byte in the start of the file
+    """
+
+    with open(path, "rb") as a_file:
+        return b"\0" in a_file.read(I_BIN_SNIFF)
+
+
+# ------------------------------------------------------------------------------
+# Get the rel paths and contents of a tree
+# ------------------------------------------------------------------------------
+def _read_tree(dir_prj):
+    """
+    Get the rel paths and contents of a tree
+
+    Args:
+        dir_prj: The project dir
+
+    Returns:
+        A dict of rel path to file bytes (None for dirs), not counting the
+        pyplate dir
+    """
+
+    # skip the config made by the fix
+    dir_pp = dir_prj / C.S_PRJ_PP_DIR
+    dict_tree = {}
+    for path in dir_prj.rglob("*"):
+        if dir_pp == path or dir_pp in path.parents:
+            continue
+        rel = str(path.relative_to(dir_prj))
+        dict_tree[rel] = path.read_bytes() if path.is_file() else None
+
+    return dict_tree
+
+
+# -)
@@ -0,0 +1,206 @@
+# ------------------------------------------------------------------------------
+# Project : PyPlate                                                /          \
+# Filename: conftest.py                                           |     ()     |
+# Date    : 10/18/2026                                            |            |
+# Author  : cyclopticnerve                                        |   \____/   |
+# License : WTFPLv2                                                \          /
+# ------------------------------------------------------------------------------
+
+# pylint: disable=protected-access
+
+"""
+Shared fixtures for the benchmarks
+
+This module adds the --bench-size option and the fixtures that make synthetic
+trees and the PyPlateBase objects that fix them.
+"""
+
+# ------------------------------------------------------------------------------
+# Imports
+# ------------------------------------------------------------------------------
+
+# system imports
+import itertools
+from pathlib import Path
+import sys
+
+# pip imports
+import pytest
+
+# local imports
+import synth
+
+# ------------------------------------------------------------------------------
+# Constants
+# ------------------------------------------------------------------------------
+
+# dirs
+P_DIR_PRJ = Path(__file__).parents[2].resolve()
+P_DIR_SRC = P_DIR_PRJ / "src"
+
+# ------------------------------------------------------------------------------
+# local imports
+
+# fudge the path to import src stuff (same as pymaker/pybaker)
+sys.path.append(str(P_DIR_SRC))
+import pyplate_base as B
+
+# ------------------------------------------------------------------------------
+# Globals
+# ------------------------------------------------------------------------------
+
+# bench size option
+S_OPT_SIZE = "--bench-size"
+S_OPT_SIZE_DEF = "medium"
+S_OPT_SIZE_HELP = "size of synthetic trees for benchmarks (default: medium)"
+
+# ------------------------------------------------------------------------------
+# Hooks
+# ------------------------------------------------------------------------------
+
+
+# ------------------------------------------------------------------------------
+# Add the bench size option
+# ------------------------------------------------------------------------------
+def pytest_addoption(parser):
+    """
+    Add the bench size option
+
+    Args:
+        parser: The pytest option parser
+    """
+
+    parser.addoption(
+        S_OPT_SIZE,
+        choices=list(synth.D_SIZES),
+        default=S_OPT_SIZE_DEF,
+        help=S_OPT_SIZE_HELP,
+    )
+
+
+# ------------------------------------------------------------------------------
+# Fixtures
+# ------------------------------------------------------------------------------
+
+
+# ------------------------------------------------------------------------------
+# Get the tree size args for the --bench-size option
+# ------------------------------------------------------------------------------
+@pytest.fixture(scope="session")
+def bench_size(request):
+    """
+    Get the tree size args for the --bench-size option
+
+    Args:
+        request: The pytest request
+
+    Returns:
+        The dict of args to pass to synth.make_tree
+    """
+
+    return synth.D_SIZES[request.config.getoption(S_OPT_SIZE)]
+
+
+# ------------------------------------------------------------------------------
+# Get a function that makes a new synthetic tree each call
+# ------------------------------------------------------------------------------
+@pytest.fixture
+def make_tree(tmp_path, bench_size):
+    """
+    Get a function that makes a new synthetic tree each call
+
+    Args:
+        tmp_path: The pytest temp dir for the test
+        bench_size: The size args for the tree
+
+    Returns:
+        A function that takes the same args as synth.make_tree (except
+        dir_prj) and returns the new project dir
+
+    Each call makes a new dir, so rounds that change the tree (like _do_fix)
+    always start from the same files.
+    """
+
+    # number each tree so they don't collide
+    counter = itertools.count()
+
+    # the function to return
+    def _make_tree(**kwargs):
+        dir_prj = tmp_path / f"tree_{next(counter)}"
+        synth.make_tree(dir_prj, **(bench_size | kwargs))
+        return dir_prj
+
+    return _make_tree
+
+
+# ------------------------------------------------------------------------------
+# Get a function that makes a PyPlateBase ready to fix a project
+# ------------------------------------------------------------------------------
+@pytest.fixture
+def make_base(tmp_path, monkeypatch):
+    """
+    Get a function that makes a PyPlateBase ready to fix a project
+
+    Args:
+        tmp_path: The pytest temp dir for the test
+        monkeypatch: The pytest monkeypatch fixture
+
+    Returns:
+        A function that takes a project dir and a project type (default: "c")
+        and returns a PyPlateBase with its dicts and reps set up
+
+    The cache dir (for the manifest) is moved into the temp dir, so the
+    benchmarks never touch the user's cache.
+    """
+
+    # keep manifests out of the user's cache
+    monkeypatch.setattr(B, "P_DIR_CACHE", tmp_path / "cache")
+
+    # the function to return
+    def _make_base(dir_prj, prj_type="c"):
+
+        # set up the object like pymaker does before the fix
+        obj = B.PyPlateBase()
+        obj._dir_prj = dir_prj
+        obj._dict_prv, obj._dict_pub = synth.make_dicts(prj_type)
+
+        # make reps and sub dicts
+        obj._fix_dicts()
+
+        return obj
+
+    return _make_base
+
+
+# ------------------------------------------------------------------------------
+# Get a function that makes a new tree, its twin, and a PyPlateBase to fix it
+# ------------------------------------------------------------------------------
+@pytest.fixture
+def make_fix(make_tree, make_base):
+    """
+    Get a function that makes a new tree, its twin, and a PyPlateBase to fix
+    it
+
+    Args:
+        make_tree: The fixture to make synthetic trees
+        make_base: The fixture to make PyPlateBase objects
+
+    Returns:
+        A function that takes the same args as synth.make_tree (except
+        dir_prj) and returns a tuple of (obj, dir_twin)
+
+    The twin is made from the same args (and seed), so it has the same files
+    as the tree before the fix. The benchmarks fix it with the old fixer in
+    baseline.py, and check that the new fixer made the same files.
+    """
+
+    # the function to return
+    def _make_fix(**kwargs):
+        obj = make_base(make_tree(**kwargs))
+        dir_twin = make_tree(**kwargs)
+        return (obj, dir_twin)
+
+    return _make_fix
+
+
+# -)
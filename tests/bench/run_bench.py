@@ -0,0 +1,176 @@
+#! /usr/bin/env python
+# ------------------------------------------------------------------------------
+# Project : PyPlate                                                /          \
+# Filename: run_bench.py                                          |     ()     |
+# Date    : 10/18/2026                                            |            |
+# Author  : cyclopticnerve                                        |   \____/   |
+# License : WTFPLv2                                                \          /
+# ------------------------------------------------------------------------------
+
+"""
+Run the benchmarks and compare them to the last saved run
+
+This script runs the benchmarks in this dir with pytest-benchmark, saves the
+results as JSON in the results dir, and compares them to the last saved run
+(or the run given by --compare). If any benchmark's mean is slower than the
+--fail percent, the script returns non-zero.
+
+Save a run from the main branch, then run again on a branch to see the
+difference. Commit a results file when you want a PR to show its numbers.
+
+Needs pytest and pytest-benchmark:
+    pip install pytest pytest-benchmark
+"""
+
+# ------------------------------------------------------------------------------
+# Imports
+# ------------------------------------------------------------------------------
+
+# system imports
+import argparse
+from pathlib import Path
+import sys
+
+# pip imports
+import pytest
+
+# ------------------------------------------------------------------------------
+# Constants
+# ------------------------------------------------------------------------------
+
+# dirs
+P_DIR_BENCH = Path(__file__).parent.resolve()
+P_DIR_RESULTS = P_DIR_BENCH / "results"
+
+# ------------------------------------------------------------------------------
+# Globals
+# ------------------------------------------------------------------------------
+
+# program description
+S_PROG_DESC = "Run the PyPlate benchmarks and compare to the last run"
+
+# size option
+S_ARG_SIZE_OPTION = "--size"
+S_ARG_SIZE_DEST = "SIZE"
+S_ARG_SIZE_HELP = "size of synthetic trees (small, medium, large)"
+S_ARG_SIZE_DEF = "medium"
+
+# name option
+S_ARG_NAME_OPTION = "--name"
+S_ARG_NAME_DEST = "NAME"
+S_ARG_NAME_HELP = "name to save results under (default: don't save)"
+
+# compare option
+S_ARG_CMP_OPTION = "--compare"
+S_ARG_CMP_DEST = "CMP"
+S_ARG_CMP_HELP = "saved run to compare to (default: the last one)"
+
+# fail option
+S_ARG_FAIL_OPTION = "--fail"
+S_ARG_FAIL_DEST = "FAIL"
+S_ARG_FAIL_HELP = "fail if a mean is slower by this percent (default: 10)"
+S_ARG_FAIL_DEF = 10
+
+# pytest args
+S_PT_ONLY = "--benchmark-only"
+S_PT_STORAGE = "--benchmark-storage=file://{}"
+S_PT_SAVE = "--benchmark-save={}"
+S_PT_CMP = "--benchmark-compare"
+S_PT_CMP_ID = "--benchmark-compare={}"
+S_PT_CMP_FAIL = "--benchmark-compare-fail=mean:{}%"
+S_PT_SIZE = "--bench-size={}"
+
+# ------------------------------------------------------------------------------
+# Public functions
+# ------------------------------------------------------------------------------
+
+
+# ------------------------------------------------------------------------------
+# Run the benchmarks
+# ------------------------------------------------------------------------------
+def main():
+    """
+    Run the benchmarks
+
+    Returns:
+        The exit code from pytest
+
+    Parses the args, builds the pytest command line and runs it in this
+    process.
+    """
+
+    # --------------------------------------------------------------------------
+    # get args
+
+    parser = argparse.ArgumentParser(description=S_PROG_DESC)
+    parser.add_argument(
+        S_ARG_SIZE_OPTION,
+        dest=S_ARG_SIZE_DEST,
+        help=S_ARG_SIZE_HELP,
+        default=S_ARG_SIZE_DEF,
+    )
+    parser.add_argument(
+        S_ARG_NAME_OPTION,
+        dest=S_ARG_NAME_DEST,
+        help=S_ARG_NAME_HELP,
+    )
+    parser.add_argument(
+        S_ARG_CMP_OPTION,
+        dest=S_ARG_CMP_DEST,
+        help=S_ARG_CMP_HELP,
+    )
+    parser.add_argument(
+        S_ARG_FAIL_OPTION,
+        dest=S_ARG_FAIL_DEST,
+        help=S_ARG_FAIL_HELP,
+        type=int,
+        default=S_ARG_FAIL_DEF,
+    )
+    args = parser.parse_args()
+
+    # --------------------------------------------------------------------------
+    # make pytest args
+
+    # run benchmarks in this dir, keep results in results dir
+    list_args = [
+        str(P_DIR_BENCH),
+        S_PT_ONLY,
+        S_PT_STORAGE.format(P_DIR_RESULTS),
+        S_PT_SIZE.format(args.SIZE),
+    ]
+
+    # save results
+    if args.NAME:
+        list_args.append(S_PT_SAVE.format(args.NAME))
+
+    # compare to a saved run, if there is one
+    # NB: results are saved in a subdir per machine/python
+    if args.CMP:
+        list_args.append(S_PT_CMP_ID.format(args.CMP))
+    elif any(P_DIR_RESULTS.glob("*/*.json")):
+        list_args.append(S_PT_CMP)
+
+    # fail on slower means
+    if S_PT_CMP in list_args or args.CMP:
+        list_args.append(S_PT_CMP_FAIL.format(args.FAIL))
+
+    # --------------------------------------------------------------------------
+    # run
+
+    return pytest.main(list_args)
+
+
+# ------------------------------------------------------------------------------
+# Code to run when called from command line
+# ------------------------------------------------------------------------------
+if __name__ == "__main__":
+
+    # Code to run when called from command line
+
+    # This is the top level code of the program, called when the Python file is
+    # invoked from the command line.
+
+    # run and pass the result back to the shell
+    sys.exit(main())
+
+# -)
@@ -0,0 +1,656 @@
+#! /usr/bin/env python
+# ------------------------------------------------------------------------------
+# Project : PyPlate                                                /          \
+# Filename: run_e2e.py                                            |     ()     |
+# Date    : 10/18/2026                                            |            |
+# Author  : cyclopticnerve                                        |   \____/   |
+# License : WTFPLv2                                                \          /
+# ------------------------------------------------------------------------------
+
+"""
+Time making, baking and installing projects from end to end
+
+This script makes a project of each type with pymaker (using -t --batch), bakes
+it with pybaker (using -v), unpacks the dist archive and runs its install.py
+(using -f), all in a temp dir with a temp HOME. Nothing is asked, so it runs
+without a user.
+
+The external tools (git, mkdocs, pip, venv, gettext) are replaced by fakes on
+PATH that do (almost) nothing, so it runs offline and the times are for
+PyPlate only. Each stage is run --rounds times on a new project, and the best
+time is kept.
+
+Results are saved as JSON in results/e2e, and compared to the last saved run
+(or the run given by --compare). If any stage is slower than the --fail
+percent, the script returns non-zero.
+
+Run it with the python that runs PyPlate (the one that has cnlib).
+"""
+
+# ------------------------------------------------------------------------------
+# Imports
+# ------------------------------------------------------------------------------
+
+# system imports
+import argparse
+import json
+import os
+from pathlib import Path
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+# ------------------------------------------------------------------------------
+# Constants
+# ------------------------------------------------------------------------------
+
+# dirs
+P_DIR_BENCH = Path(__file__).parent.resolve()
+P_DIR_PRJ = P_DIR_BENCH.parents[1]
+P_DIR_RESULTS = P_DIR_BENCH / "results" / "e2e"
+
+# entry points
+P_PYMAKER = P_DIR_PRJ / "src" / "pymaker.py"
+P_PYBAKER = P_DIR_PRJ / "src" / "pybaker.py"
+
+# ------------------------------------------------------------------------------
+# Globals
+# ------------------------------------------------------------------------------
+
+# program description
+S_PROG_DESC = "Time making, baking and installing PyPlate projects"
+
+# types option
+S_ARG_TYPES_OPTION = "--types"
+S_ARG_TYPES_DEST = "TYPES"
+S_ARG_TYPES_HELP = "project types to run (default: cgp)"
+S_ARG_TYPES_DEF = "cgp"
+
+# rounds option
+S_ARG_ROUNDS_OPTION = "--rounds"
+S_ARG_ROUNDS_DEST = "ROUNDS"
+S_ARG_ROUNDS_HELP = "times to run each stage (default: 3)"
+S_ARG_ROUNDS_DEF = 3
+
+# name option
+S_ARG_NAME_OPTION = "--name"
+S_ARG_NAME_DEST = "NAME"
+S_ARG_NAME_HELP = "name to save results under (default: don't save)"
+
+# compare option
+S_ARG_CMP_OPTION = "--compare"
+S_ARG_CMP_DEST = "CMP"
+S_ARG_CMP_HELP = "saved run to compare to (default: the last one)"
+
+# fail option
+S_ARG_FAIL_OPTION = "--fail"
+S_ARG_FAIL_DEST = "FAIL"
+S_ARG_FAIL_HELP = "fail if a stage is slower by this percent (default: 10)"
+S_ARG_FAIL_DEF = 10
+
+# keep option
+S_ARG_KEEP_OPTION = "--keep"
+S_ARG_KEEP_DEST = "KEEP"
+S_ARG_KEEP_HELP = "keep the temp dir (for looking at logs)"
+
+# the version to bake
+S_BAKE_VER = "0.0.1"
+
+# the name of each project
+# NB: key is type, val is name (dir is name with underscores)
+D_NAMES = {
+    "c": "E2E CLI",
+    "g": "E2E GUI",
+    "p": "E2E PKG",
+}
+
+# types that have an install.py in dist
+L_INSTALL = ["c", "g"]
+
+# stages, in order
+S_STAGE_MAKE = "make"
+S_STAGE_BAKE = "bake"
+S_STAGE_INST = "install"
+
+# keys in results file
+S_KEY_PYTHON = "python"
+S_KEY_PLATFORM = "platform"
+S_KEY_ROUNDS = "rounds"
+S_KEY_STAGES = "stages"
+S_KEY_MIN = "min"
+S_KEY_MEAN = "mean"
+S_KEY_TIMES = "times"
+S_KEY_ERRORS = "errors"
+
+# output
+S_RES_EXT = ".json"
+S_STAGE_FMT = "{}/{}"
+S_HDR_FMT = "{:<16}{:>10}{:>10}{:>10}{:>9}"
+S_ROW_FMT = "{:<16}{:>10.3f}{:>10.3f}{:>10}{:>9}"
+L_HDR_COLS = ["stage", "min", "mean", "base", "change"]
+S_NONE = "-"
+S_PCT_FMT = "{:+.1f}%"
+S_MSG_RUN = "Running {} round {}..."
+S_MSG_SAVED = "Saved results to {}"
+S_MSG_CMP = "Comparing to {}"
+S_MSG_SLOWER = "{} is {:.1f}% slower than the baseline"
+S_ERR_STAGE = "Stage {} failed (exit code {}), see {}"
+S_ERR_NO_ARCHIVE = "No archive in {}"
+
+# the fake tools
+# NB: sh, so they start fast and don't need PyPlate's python
+S_FAKE_NOP = """#!/bin/sh
+# fake {0} for the e2e benchmarks: do nothing
+exit 0
+"""
+S_FAKE_GIT = """#!/bin/sh
+# fake git for the e2e benchmarks: make an empty repo for init
+if [ "$1" = "init" ]; then
+    mkdir -p .git
+fi
+exit 0
+"""
+S_FAKE_OUT = """#!/bin/sh
+# fake {0} for the e2e benchmarks: make an empty file for -o
+while [ $# -gt 0 ]; do
+    if [ "$1" = "-o" ]; then
+        touch "$2"
+    fi
+    shift
+done
+exit 0
+"""
+S_FAKE_PYTHON = """#!/bin/sh
+# fake python for the e2e benchmarks: fake venv and pip, run everything else
+# with the real python
+DIR_FAKES="{0}"
+if [ "$1" = "-m" ] && [ "$2" = "venv" ]; then
+    for DIR_VENV; do :; done
+    mkdir -p "$DIR_VENV/bin"
+    printf 'PATH="%s/bin:$PATH"\\nexport PATH\\n' "$DIR_VENV" \\
+        > "$DIR_VENV/bin/activate"
+    exit 0
+fi
+if [ "$1" = "-m" ] && [ "$2" = "pip" ]; then
+    shift 2
+    exec "$DIR_FAKES/pip" "$@"
+fi
+exec "{1}" "$@"
+"""
+
+# the fakes to put on PATH
+# NB: key is name, val is script (formatted with name)
+D_FAKES = {
+    "git": S_FAKE_GIT,
+    "mkdocs": S_FAKE_NOP,
+    "pip": S_FAKE_NOP,
+    "pip3": S_FAKE_NOP,
+    "xgettext": S_FAKE_OUT,
+    "msgfmt": S_FAKE_OUT,
+    "msgmerge": S_FAKE_NOP,
+    "code": S_FAKE_NOP,
+}
+
+# env for stages
+# NB: in case something finds the real pip, don't let it go online
+D_ENV = {
+    "PIP_NO_INDEX": "1",
+    "PIP_DISABLE_PIP_VERSION_CHECK": "1",
+}
+
+# ------------------------------------------------------------------------------
+# Public functions
+# ------------------------------------------------------------------------------
+
+
+# ------------------------------------------------------------------------------
+# Run the end-to-end benchmarks
+# ------------------------------------------------------------------------------
+def main():
+    """
+    Run the end-to-end benchmarks
+
+    Returns:
+        0 if all stages passed and none were slower than --fail, 1 otherwise
+    """
+
+    # --------------------------------------------------------------------------
+    # get args
+
+    parser = argparse.ArgumentParser(description=S_PROG_DESC)
+    parser.add_argument(
+        S_ARG_TYPES_OPTION,
+        dest=S_ARG_TYPES_DEST,
+        help=S_ARG_TYPES_HELP,
+        default=S_ARG_TYPES_DEF,
+    )
+    parser.add_argument(
+        S_ARG_ROUNDS_OPTION,
+        dest=S_ARG_ROUNDS_DEST,
+        help=S_ARG_ROUNDS_HELP,
+        type=int,
+        default=S_ARG_ROUNDS_DEF,
+    )
+    parser.add_argument(
+        S_ARG_NAME_OPTION,
+        dest=S_ARG_NAME_DEST,
+        help=S_ARG_NAME_HELP,
+    )
+    parser.add_argument(
+        S_ARG_CMP_OPTION,
+        dest=S_ARG_CMP_DEST,
+        help=S_ARG_CMP_HELP,
+    )
+    parser.add_argument(
+        S_ARG_FAIL_OPTION,
+        dest=S_ARG_FAIL_DEST,
+        help=S_ARG_FAIL_HELP,
+        type=int,
+        default=S_ARG_FAIL_DEF,
+    )
+    parser.add_argument(
+        S_ARG_KEEP_OPTION,
+        dest=S_ARG_KEEP_DEST,
+        help=S_ARG_KEEP_HELP,
+        action="store_true",
+    )
+    args = parser.parse_args()
+
+    # --------------------------------------------------------------------------
+    # run stages
+
+    # find the baseline before we save a new one
+    path_base = _get_baseline(args.CMP)
+
+    # make a temp dir for everything
+    dir_tmp = Path(tempfile.mkdtemp(prefix="pyplate_e2e_"))
+    try:
+        dict_res = _run_all(dir_tmp, args.TYPES, args.ROUNDS)
+    finally:
+        if not args.KEEP:
+            shutil.rmtree(dir_tmp, ignore_errors=True)
+        else:
+            print(dir_tmp)
+
+    # --------------------------------------------------------------------------
+    # report
+
+    # load baseline
+    dict_base = {}
+    if path_base:
+        print(S_MSG_CMP.format(path_base))
+        with open(path_base, "r", encoding="UTF-8") as a_file:
+            dict_base = json.load(a_file)
+
+    # print table and find slower stages
+    list_slow = _report(dict_res, dict_base, args.FAIL)
+
+    # save results
+    if args.NAME:
+        P_DIR_RESULTS.mkdir(parents=True, exist_ok=True)
+        path_res = P_DIR_RESULTS / f"{args.NAME}{S_RES_EXT}"
+        with open(path_res, "w", encoding="UTF-8") as a_file:
+            json.dump(dict_res, a_file, indent=4)
+        print(S_MSG_SAVED.format(path_res))
+
+    # fail on errors or slower stages
+    for stage, pct in list_slow:
+        print(S_MSG_SLOWER.format(stage, pct))
+    if list_slow or dict_res[S_KEY_ERRORS]:
+        return 1
+    return 0
+
+
+# ------------------------------------------------------------------------------
+# Private functions
+# ------------------------------------------------------------------------------
+
+
+# ------------------------------------------------------------------------------
+# Run all the stages for all the types
+# ------------------------------------------------------------------------------
+def _run_all(dir_tmp, types, rounds):
+    """
+    Run all the stages for all the types
+
+    Args:
+        dir_tmp: The temp dir to run in
+        types: The string of project types to run
+        rounds: The number of times to run each stage
+
+    Returns:
+        The results dict (see _make_results)
+    """
+
+    # make the fakes and the env
+    env = _make_env(dir_tmp)
+
+    # stage name: list of times
+    dict_times = {}
+    list_errs = []
+
+    # run each round of each type
+    for prj_type in types:
+        for i in range(rounds):
+            print(S_MSG_RUN.format(D_NAMES[prj_type], i + 1), flush=True)
+            dir_round = dir_tmp / f"{prj_type}_{i}"
+            dir_round.mkdir()
+
+            # run the stages in order, stop at the first error
+            try:
+                for stage, secs in _run_round(dir_round, prj_type, env):
+                    key = S_STAGE_FMT.format(prj_type, stage)
+                    dict_times.setdefault(key, []).append(secs)
+            except RuntimeError as e:
+                print(e)
+                list_errs.append(str(e))
+
+    return _make_results(dict_times, rounds, list_errs)
+
+
+# ------------------------------------------------------------------------------
+# Run the stages for one project
+# ------------------------------------------------------------------------------
+def _run_round(dir_round, prj_type, env):
+    """
+    Run the stages for one project
+
+    Args:
+        dir_round: The dir to make the project in
+        prj_type: The short type of the project
+        env: The env for the stages
+
+    Yields:
+        A tuple of (stage, secs) for each stage
+
+    Raises:
+        RuntimeError if a stage fails
+    """
+
+    # paths for this round
+    name_prj = D_NAMES[prj_type]
+    dir_prj = dir_round / name_prj.replace(" ", "_")
+    dir_inst = dir_round / "install"
+
+    # --------------------------------------------------------------------------
+    # make
+
+    # make the batch file
+    path_batch = dir_round / "batch.json"
+    dict_batch = {"projects": [{"name": name_prj, "type": prj_type}]}
+    with open(path_batch, "w", encoding="UTF-8") as a_file:
+        json.dump(dict_batch, a_file)
+
+    # run pymaker in the round dir
+    # NB: -t to use the actions in D_PM_ACT, without it the actions are not
+    # set until the fix
+    cmd = [sys.executable, str(P_PYMAKER), "-t", "--batch", str(path_batch)]
+    secs = _run_stage(S_STAGE_MAKE, cmd, dir_round, env, dir_round)
+    yield (S_STAGE_MAKE, secs)
+
+    # --------------------------------------------------------------------------
+    # bake
+
+    # run pybaker in the project dir
+    cmd = [sys.executable, str(P_PYBAKER), "-v", S_BAKE_VER]
+    secs = _run_stage(S_STAGE_BAKE, cmd, dir_prj, env, dir_round)
+    yield (S_STAGE_BAKE, secs)
+
+    # --------------------------------------------------------------------------
+    # install
+
+    # only apps have an install.py
+    if prj_type not in L_INSTALL:
+        return
+
+    # unpack and install (both are timed, the user has to do both)
+    start = time.perf_counter()
+    path_arc = _find_archive(dir_prj / "dist")
+    shutil.unpack_archive(path_arc, dir_inst)
+    cmd = [sys.executable, "install.py", "-f"]
+    _run_stage(S_STAGE_INST, cmd, dir_inst, env, dir_round)
+    yield (S_STAGE_INST, time.perf_counter() - start)
+
+
+# ------------------------------------------------------------------------------
+# Run one stage and time it
+# ------------------------------------------------------------------------------
+def _run_stage(stage, cmd, cwd, env, dir_round):
+    """
+    Run one stage and time it
+
+    Args:
+        stage: The name of the stage (for the log file)
+        cmd: The command to run
+        cwd: The dir to run the command in
+        env: The env to run the command in
+        dir_round: The dir for the log file
+
+    Returns:
+        The wall time of the command, in seconds
+
+    Raises:
+        RuntimeError if the command fails
+
+    The output goes to a log file in the round dir. Input is closed, so a
+    stage that asks a question fails instead of hanging.
+    """
+
+    # log file for output
+    path_log = dir_round / f"{stage}.log"
+
+    # run and time
+    with open(path_log, "w", encoding="UTF-8") as a_file:
+        start = time.perf_counter()
+        res = subprocess.run(
+            cmd,
+            cwd=cwd,
+            env=env,
+            stdin=subprocess.DEVNULL,
+            stdout=a_file,
+            stderr=subprocess.STDOUT,
+            check=False,
+        )
+        secs = time.perf_counter() - start
+
+    # check for fail
+    if res.returncode != 0:
+        raise RuntimeError(S_ERR_STAGE.format(stage, res.returncode, path_log))
+
+    return secs
+
+
+# ------------------------------------------------------------------------------
+# Make the fake tools and the env that uses them
+# ------------------------------------------------------------------------------
+def _make_env(dir_tmp):
+    """
+    Make the fake tools and the env that uses them
+
+    Args:
+        dir_tmp: The temp dir to put the fakes and HOME in
+
+    Returns:
+        The env dict for running stages
+    """
+
+    # make the fakes
+    dir_fakes = dir_tmp / "bin"
+    dir_fakes.mkdir()
+    dict_fakes = {key: val.format(key) for key, val in D_FAKES.items()}
+
+    # python needs the real python
+    str_py = S_FAKE_PYTHON.format(dir_fakes, sys.executable)
+    dict_fakes["python"] = str_py
+    dict_fakes["python3"] = str_py
+
+    # write and make executable
+    for key, val in dict_fakes.items():
+        path = dir_fakes / key
+        path.write_text(val, encoding="UTF-8")
+        path.chmod(0o755)
+
+    # make the fake home
+    dir_home = dir_tmp / "home"
+    dir_home.mkdir()
+
+    # fakes first on PATH, new HOME and cache
+    env = dict(os.environ)
+    env.update(D_ENV)
+    env["PATH"] = os.pathsep.join([str(dir_fakes), env.get("PATH", "")])
+    env["HOME"] = str(dir_home)
+    env["XDG_CACHE_HOME"] = str(dir_home / ".cache")
+
+    return env
+
+
+# ------------------------------------------------------------------------------
+# Find the archive pybaker made
+# ------------------------------------------------------------------------------
+def _find_archive(dir_dist):
+    """
+    Find the archive pybaker made
+
+    Args:
+        dir_dist: The dist dir of the project
+
+    Returns:
+        The path to the first file that shutil can unpack
+
+    Raises:
+        RuntimeError if there is no archive
+    """
+
+    # get all the exts shutil knows
+    exts = [ext for fmt in shutil.get_unpack_formats() for ext in fmt[1]]
+
+    # find the first match
+    for path in sorted(dir_dist.iterdir()):
+        if path.is_file() and any(path.name.endswith(e) for e in exts):
+            return path
+
+    raise RuntimeError(S_ERR_NO_ARCHIVE.format(dir_dist))
+
+
+# ------------------------------------------------------------------------------
+# Make the results dict from the times
+# ------------------------------------------------------------------------------
+def _make_results(dict_times, rounds, list_errs):
+    """
+    Make the results dict from the times
+
+    Args:
+        dict_times: Dict of stage name to list of times
+        rounds: The number of rounds that were asked for
+        list_errs: The list of error messages
+
+    Returns:
+        The results dict, ready to save as JSON
+    """
+
+    # best and mean of each stage
+    dict_stages = {
+        key: {
+            S_KEY_MIN: min(val),
+            S_KEY_MEAN: statistics.mean(val),
+            S_KEY_TIMES: val,
+        }
+        for key, val in dict_times.items()
+    }
+
+    return {
+        S_KEY_PYTHON: platform.python_version(),
+        S_KEY_PLATFORM: platform.platform(),
+        S_KEY_ROUNDS: rounds,
+        S_KEY_STAGES: dict_stages,
+        S_KEY_ERRORS: list_errs,
+    }
+
+
+# ------------------------------------------------------------------------------
+# Print the results and find slower stages
+# ------------------------------------------------------------------------------
+def _report(dict_res, dict_base, fail):
+    """
+    Print the results and find slower stages
+
+    Args:
+        dict_res: The results of this run
+        dict_base: The results of the baseline run (may be empty)
+        fail: The percent slower that counts as a regression
+
+    Returns:
+        A list of (stage, pct) for stages that are slower than fail
+    """
+
+    # header
+    print()
+    print(S_HDR_FMT.format(*L_HDR_COLS))
+
+    # each stage
+    # NB: compare best times, they are the least noisy
+    list_slow = []
+    dict_stages_base = dict_base.get(S_KEY_STAGES, {})
+    for key, val in dict_res[S_KEY_STAGES].items():
+        str_base = str_pct = S_NONE
+        base = dict_stages_base.get(key, None)
+        if base:
+            str_base = f"{base[S_KEY_MIN]:.3f}"
+            pct = (val[S_KEY_MIN] - base[S_KEY_MIN]) / base[S_KEY_MIN] * 100
+            str_pct = S_PCT_FMT.format(pct)
+            if pct > fail:
+                list_slow.append((key, pct))
+        print(
+            S_ROW_FMT.format(
+                key, val[S_KEY_MIN], val[S_KEY_MEAN], str_base, str_pct
+            )
+        )
+    print()
+
+    return list_slow
+
+
+# ------------------------------------------------------------------------------
+# Get the path to the baseline results
+# ------------------------------------------------------------------------------
+def _get_baseline(name):
+    """
+    Get the path to the baseline results
+
+    Args:
+        name: The name of the saved run, or None for the newest
+
+    Returns:
+        The path to the results file, or None if there is none
+    """
+
+    # use the name
+    if name:
+        path = P_DIR_RESULTS / f"{name}{S_RES_EXT}"
+        return path if path.exists() else None
+
+    # use the newest
+    list_res = sorted(
+        P_DIR_RESULTS.glob(f"*{S_RES_EXT}"), key=lambda p: p.stat().st_mtime
+    )
+    return list_res[-1] if list_res else None
+
+
+# ------------------------------------------------------------------------------
+# Code to run when called from command line
+# ------------------------------------------------------------------------------
+if __name__ == "__main__":
+
+    # Code to run when called from command line
+
+    # This is the top level code of the program, called when the Python file is
+    # invoked from the command line.
+
+    # run and pass the result back to the shell
+    sys.exit(main())
+
+# -)
@@ -0,0 +1,350 @@
+# ------------------------------------------------------------------------------
+# Project : PyPlate                                                /          \
+# Filename: synth.py                                              |     ()     |
+# Date    : 10/18/2026                                            |            |
+# Author  : cyclopticnerve                                        |   \____/   |
+# License : WTFPLv2                                                \          /
+# ------------------------------------------------------------------------------
+
+"""
+Make synthetic projects for the benchmarks
+
+This module makes project trees of a known size, so the fix engine can be
+timed on the same input every run. The tree is made from a seed, so two runs
+with the same args make the same files.
+"""
+
+# ------------------------------------------------------------------------------
+# Imports
+# ------------------------------------------------------------------------------
+
+# system imports
+import copy
+from pathlib import Path
+import random
+import shutil
+import sys
+
+# ------------------------------------------------------------------------------
+# Constants
+# ------------------------------------------------------------------------------
+
+# dirs
+P_DIR_PRJ = Path(__file__).parents[2].resolve()
+
+# ------------------------------------------------------------------------------
+# local imports
+
+# fudge the path to import conf stuff
+sys.path.append(str(P_DIR_PRJ))
+import conf.conf as C
+
+# ------------------------------------------------------------------------------
+# Globals
+# ------------------------------------------------------------------------------
+
+# default size of a tree
+I_FILES_DEF = 100
+I_LINES_DEF = 100
+F_DUNDER_DEF = 0.2
+F_SWITCH_DEF = 0.02
+F_BINARY_DEF = 0.05
+I_SEED_DEF = 0
+
+# size of each binary file
+I_BINARY_SIZE = 4096
+
+# named sizes for the benchmarks and the runner
+D_SIZES = {
+    "small": {
+        "num_files": 20,
+        "num_lines": 50,
+    },
+    "medium": {
+        "num_files": I_FILES_DEF,
+        "num_lines": I_LINES_DEF,
+    },
+    "large": {
+        "num_files": 500,
+        "num_lines": 400,
+    },
+}
+
+# the values to use for the project dunders
+# NB: these are the values pymaker would calculate for a project named
+# "Bench Project"
+D_PRV_PRJ = {
+    "__PP_TYPE_PRJ__": "c",
+    "__PP_NAME_PRJ__": "Bench Project",
+    "__PP_NAME_PRJ_BIG__": "Bench_Project",
+    "__PP_NAME_PRJ_SMALL__": "bench_project",
+    "__PP_NAME_PRJ_PASCAL__": "BenchProject",
+    "__PP_NAME_SEC_BIG__": "Bench_Win",
+    "__PP_NAME_SEC_SMALL__": "bench_win",
+    "__PP_NAME_SEC_PASCAL__": "BenchWin",
+    "__PP_NAME_VENV__": ".venv-bench_project",
+    "__PP_DATE__": "01/01/2026",
+    "__PP_VER_MMR__": "0.0.1",
+    "__PP_VER_DISP__": "Version 0.0.1",
+}
+
+# the subdirs of a tree
+# NB: some have dunders so _fix_path has work to do
+L_DIRS = [
+    "src",
+    "src/__PP_NAME_PRJ_SMALL__",
+    "conf",
+    "docs",
+    "docs/__PP_NAME_PRJ_BIG__",
+    "tests",
+]
+
+# file types to make, and the comment chars for each
+# NB: val is (start, end) of a comment
+D_EXT_COMM = {
+    ".py": ("# ", ""),
+    ".toml": ("# ", ""),
+    ".md": ("<!-- ", " -->"),
+    ".json": ("// ", ""),
+    ".txt": ("", ""),
+}
+
+# ext for binary files
+S_EXT_BINARY = ".png"
+
+# the header lines for text files
+L_HEADER = [
+    "Project : __PP_NAME_PRJ_BIG__",
+    "Filename: {}",
+    "Date    : __PP_DATE__",
+    "Author  : __PP_AUTHOR__",
+    "License : __PP_LICENSE_NAME__",
+]
+
+# the lines that make up the body of a text file
+S_LINE_PLAIN = "value_{0} = compute(value_{1}, 'text {0}')"
+S_LINE_DUNDER = "value_{0} = '{1}'  {2}the {3} thing{4}"
+S_LINE_SWITCH = "{0}{1}: {2}={3}{4}"
+
+# ------------------------------------------------------------------------------
+# Public functions
+# ------------------------------------------------------------------------------
+
+
+# ------------------------------------------------------------------------------
+# Make the private and public dicts for a bench project
+# ------------------------------------------------------------------------------
+def make_dicts(prj_type="c"):
+    """
+    Make the private and public dicts for a bench project
+
+    Args:
+        prj_type: The short type of the project (default: "c")
+
+    Returns:
+        A tuple of (dict_prv, dict_pub), made from the defaults in conf.py
+        and D_PRV_PRJ
+    """
+
+    # start with the defaults for everything
+    dict_prv_prj = copy.deepcopy(C.D_PRV_PRJ)
+    dict_prv_prj.update(D_PRV_PRJ)
+    dict_prv_prj["__PP_TYPE_PRJ__"] = prj_type
+
+    # private dict
+    dict_prv = {
+        C.S_KEY_PRV_ALL: copy.deepcopy(C.D_PRV_ALL),
+        C.S_KEY_PRV_PRJ: dict_prv_prj,
+    }
+
+    # public dict
+    dict_pub = {
+        C.S_KEY_PUB_META: copy.deepcopy(C.D_PUB_META),
+        C.S_KEY_PUB_BL: copy.deepcopy(C.D_PUB_BL),
+        C.S_KEY_PUB_DIST: copy.deepcopy(C.D_PUB_DIST),
+        C.S_KEY_PUB_DOCS: copy.deepcopy(C.D_PUB_DOCS),
+        C.S_KEY_PUB_I18N: copy.deepcopy(C.D_PUB_I18N),
+        C.S_KEY_PUB_INST: copy.deepcopy(C.D_PUB_INST),
+        C.S_KEY_PUB_ACT: copy.deepcopy(C.D_PUB_ACT),
+    }
+
+    return (dict_prv, dict_pub)
+
+
+# ------------------------------------------------------------------------------
+# Make a synthetic project tree
+# ------------------------------------------------------------------------------
+def make_tree(
+    dir_prj,
+    num_files=I_FILES_DEF,
+    num_lines=I_LINES_DEF,
+    dunder_density=F_DUNDER_DEF,
+    switch_density=F_SWITCH_DEF,
+    binary_ratio=F_BINARY_DEF,
+    seed=I_SEED_DEF,
+):
+    """
+    Make a synthetic project tree
+
+    Args:
+        dir_prj: The dir to make the tree in (it is made if it does not exist)
+        num_files: The number of files to make (default: I_FILES_DEF)
+        num_lines: The number of body lines in each text file (default:
+        I_LINES_DEF)
+        dunder_density: The fraction of lines (and file names) that have a
+        dunder (default: F_DUNDER_DEF)
+        switch_density: The fraction of lines that are switches (default:
+        F_SWITCH_DEF)
+        binary_ratio: The fraction of files that are binary (default:
+        F_BINARY_DEF)
+        seed: The seed for the random choices (default: I_SEED_DEF)
+
+    Returns:
+        The list of files that were made
+
+    Text files get a header and a body. Header lines always have dunders,
+    body lines have a dunder, a switch, or neither, based on the densities.
+    Binary files are random bytes with a NUL, so they are skipped by the fix.
+    """
+
+    # same seed, same tree
+    rand = random.Random(seed)
+    dir_prj = Path(dir_prj)
+
+    # the dunders we can put in text
+    list_keys = sorted(C.D_PRV_ALL) + sorted(D_PRV_PRJ)
+
+    # make the project's pyplate dir, so the fix can save its config
+    (dir_prj / C.S_PRJ_PRV_DIR).mkdir(parents=True, exist_ok=True)
+
+    # make the subdirs
+    for item in L_DIRS:
+        (dir_prj / item).mkdir(parents=True, exist_ok=True)
+
+    # make each file
+    list_files = []
+    for i in range(num_files):
+
+        # pick a dir and a name
+        path_dir = dir_prj / rand.choice(L_DIRS)
+        name = f"file_{i}"
+        if rand.random() < dunder_density:
+            name = f"file_{i}-__PP_NAME_PRJ_SMALL__"
+
+        # make a binary file
+        if rand.random() < binary_ratio:
+            path = path_dir / f"{name}{S_EXT_BINARY}"
+            data = b"\x00" + rand.randbytes(I_BINARY_SIZE - 1)
+            path.write_bytes(data)
+            list_files.append(path)
+            continue
+
+        # make a text file
+        ext = rand.choice(list(D_EXT_COMM))
+        path = path_dir / f"{name}{ext}"
+        lines = _make_lines(
+            rand,
+            path.name,
+            num_lines,
+            list_keys,
+            dunder_density,
+            switch_density,
+        )
+        path.write_text("".join(lines), encoding=C.S_ENCODING)
+        list_files.append(path)
+
+    return list_files
+
+
+# ------------------------------------------------------------------------------
+# Make a project from the template
+# ------------------------------------------------------------------------------
+def make_project(dir_prj, prj_type="c"):
+    """
+    Make a project from the template
+
+    Args:
+        dir_prj: The dir to copy the template to
+        prj_type: The short type of the project (default: "c")
+
+    Returns:
+        The project dir
+
+    Copies the "all" template and the template for the type, the same as
+    pymaker does before it fixes anything. This gives the conf.py fix
+    functions real files to work on.
+    """
+
+    # get the template subdir for the type
+    dir_type = [item[2] for item in C.L_TYPES if item[0] == prj_type][0]
+    dir_tmp = P_DIR_PRJ / C.S_DIR_TEMPLATE
+
+    # copy all, then type
+    dir_prj = Path(dir_prj)
+    shutil.copytree(dir_tmp / C.S_DIR_ALL, dir_prj, dirs_exist_ok=True)
+    shutil.copytree(dir_tmp / dir_type, dir_prj, dirs_exist_ok=True)
+
+    return dir_prj
+
+
+# ------------------------------------------------------------------------------
+# Private functions
+# ------------------------------------------------------------------------------
+
+
+# ------------------------------------------------------------------------------
+# Make the lines of a text file
+# ------------------------------------------------------------------------------
+def _make_lines(rand, name, num_lines, list_keys, dunder_density, sw_density):
+    """
+    Make the lines of a text file
+
+    Args:
+        rand: The Random to use for choices
+        name: The file name to put in the header
+        num_lines: The number of body lines
+        list_keys: The dunders to pick from
+        dunder_density: The fraction of lines that have a dunder
+        sw_density: The fraction of lines that are switches
+
+    Returns:
+        The list of lines, each ending in a newline
+    """
+
+    # get the comment chars for this file type
+    comm_start, comm_end = D_EXT_COMM[Path(name).suffix]
+
+    # the header
+    lines = [
+        f"{comm_start}{line.format(name)}{comm_end}\n" for line in L_HEADER
+    ]
+    lines.append("\n")
+
+    # the body
+    for i in range(num_lines):
+        chance = rand.random()
+
+        # a switch, block or line
+        if chance < sw_density:
+            val = rand.choice(["True", "False"])
+            line = S_LINE_SWITCH.format(
+                comm_start, C.S_SW_MARKER, C.S_SW_REPLACE, val, comm_end
+            )
+
+        # a dunder in code and in a trailing comment
+        elif chance < sw_density + dunder_density:
+            key = rand.choice(list_keys)
+            line = S_LINE_DUNDER.format(
+                i, key, comm_start, rand.choice(list_keys), comm_end
+            )
+
+        # plain code
+        else:
+            line = S_LINE_PLAIN.format(i, max(i - 1, 0))
+
+        lines.append(f"{line}\n")
+
+    return lines
+
+
+# -)
@@ -0,0 +1,205 @@
+# ------------------------------------------------------------------------------
+# Project : PyPlate                                                /          \
+# Filename: test_bench_conf.py                                    |     ()     |
+# Date    : 10/18/2026                                            |            |
+# Author  : cyclopticnerve                                        |   \____/   |
+# License : WTFPLv2                                                \          /
+# ------------------------------------------------------------------------------
+
+# pylint: disable=protected-access
+
+"""
+Benchmarks for the metadata fix functions in conf.py
+
+Each benchmark runs on a GUI project made from the template and fixed by
+_do_fix, so the files look the same as when pymaker calls do_after_fix. The
+file contents are put back before each round, and the result is checked
+after timing.
+"""
+
+# ------------------------------------------------------------------------------
+# Imports
+# ------------------------------------------------------------------------------
+
+# pip imports
+import pytest
+
+# local imports
+import baseline
+import synth
+
+# skip all if no benchmark plugin
+pytest.importorskip("pytest_benchmark")
+
+# ------------------------------------------------------------------------------
+# Globals
+# ------------------------------------------------------------------------------
+
+# just shorten the name
+C = synth.C
+
+# rounds for each benchmark
+I_ROUNDS = 20
+
+# the project type that has files for all the fix functions
+S_PRJ_TYPE = "g"
+
+# the fix functions and the glob for the files they fix
+# NB: _fix_install and _fix_po are not here, their files are made later by
+# actions
+D_FIX_FUNCS = {
+    "_fix_readme": C.S_FILE_README,
+    "_fix_pyproject": C.S_FILE_TOML,
+    "_fix_desktop": "**/*.desktop",
+    "_fix_ui": "**/*.ui",
+    "_fix_src": "**/*.py",
+    "_fix_mkdocs": C.S_FILE_MKDOCS_YML,
+}
+
+# ------------------------------------------------------------------------------
+# Fixtures
+# ------------------------------------------------------------------------------
+
+
+# ------------------------------------------------------------------------------
+# Make a fixed project from the template
+# ------------------------------------------------------------------------------
+@pytest.fixture
+def fixed_project(tmp_path, make_base):
+    """
+    Make a fixed project from the template
+
+    Args:
+        tmp_path: The pytest temp dir for the test
+        make_base: The fixture to make PyPlateBase objects
+
+    Returns:
+        The PyPlateBase that fixed the project
+    """
+
+    # copy template and fix dunders
+    dir_prj = synth.make_project(tmp_path / "prj", S_PRJ_TYPE)
+    obj = make_base(dir_prj, S_PRJ_TYPE)
+    obj._do_fix()
+
+    return obj
+
+
+# ------------------------------------------------------------------------------
+# Tests
+# ------------------------------------------------------------------------------
+
+
+# ------------------------------------------------------------------------------
+# Time a fix function on all of its files in a project
+# ------------------------------------------------------------------------------
+@pytest.mark.parametrize("func_name", list(D_FIX_FUNCS))
+def test_conf_fix(benchmark, monkeypatch, fixed_project, func_name):
+    """
+    Time a fix function on all of its files in a project
+
+    Args:
+        benchmark: The pytest-benchmark fixture
+        monkeypatch: The pytest monkeypatch fixture
+        fixed_project: The PyPlateBase that fixed the project
+        func_name: The name of the fix function in conf.py
+    """
+
+    # get the function and the args it needs
+    func = getattr(C, func_name)
+    obj = fixed_project
+    dict_prv_prj = obj._dict_prv[C.S_KEY_PRV_PRJ]
+
+    # NB: _fix_mkdocs wants all of pub, the rest want meta
+    dict_pub = obj._dict_pub_meta
+    if func_name == "_fix_mkdocs":
+        dict_pub = obj._dict_pub
+
+    # get the files
+    paths = sorted(obj._dir_prj.glob(D_FIX_FUNCS[func_name]))
+    assert paths
+
+    # fix each file
+    def _fix_all():
+        for path in paths:
+            func(path, dict_prv_prj, dict_pub)
+
+    _bench_fix(benchmark, monkeypatch, paths, _fix_all)
+
+
+# ------------------------------------------------------------------------------
+# Time the dispatcher on every file in a project
+# ------------------------------------------------------------------------------
+def test_conf_fix_files(benchmark, monkeypatch, fixed_project):
+    """
+    Time the dispatcher on every file in a project
+
+    Args:
+        benchmark: The pytest-benchmark fixture
+        monkeypatch: The pytest monkeypatch fixture
+        fixed_project: The PyPlateBase that fixed the project
+    """
+
+    # get all the files that _fix_files might change
+    obj = fixed_project
+    globs = D_FIX_FUNCS.values()
+    paths = sorted({path for item in globs for path in obj._dir_prj.glob(item)})
+
+    # fix each file
+    def _fix_all():
+        for path in paths:
+            C._fix_files(path, obj._dict_prv, obj._dict_pub)
+
+    _bench_fix(benchmark, monkeypatch, paths, _fix_all)
+
+
+# ------------------------------------------------------------------------------
+# Private functions
+# ------------------------------------------------------------------------------
+
+
+# ------------------------------------------------------------------------------
+# Time a fix of some files and check the result
+# ------------------------------------------------------------------------------
+def _bench_fix(benchmark, monkeypatch, paths, fix_all):
+    """
+    Time a fix of some files and check the result
+
+    Args:
+        benchmark: The pytest-benchmark fixture
+        monkeypatch: The pytest monkeypatch fixture
+        paths: The files that fix_all changes
+        fix_all: A function that fixes all the files
+
+    The file contents are put back before each round. After timing, the
+    result is checked against the old functions, which were the same apart
+    from always writing the file (see baseline.write_text). Then the fix is
+    run again on its own output, which must not write anything.
+    """
+
+    # keep the original contents
+    dict_orig = {path: path.read_bytes() for path in paths}
+
+    # put the original contents back
+    def _setup():
+        for path, data in dict_orig.items():
+            path.write_bytes(data)
+
+    benchmark.pedantic(fix_all, setup=_setup, rounds=I_ROUNDS)
+    dict_new = {path: path.read_bytes() for path in paths}
+
+    # same result as always writing
+    _setup()
+    with monkeypatch.context() as mp:
+        mp.setattr(C.PP, "write_if_changed", baseline.write_text)
+        fix_all()
+    assert dict_new == {path: path.read_bytes() for path in paths}
+
+    # a second fix changes nothing and writes nothing
+    dict_stat = {path: path.stat().st_mtime_ns for path in paths}
+    fix_all()
+    assert dict_new == {path: path.read_bytes() for path in paths}
+    assert dict_stat == {path: path.stat().st_mtime_ns for path in paths}
+
+
+# -)
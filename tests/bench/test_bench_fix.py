@@ -0,0 +1,346 @@
+# ------------------------------------------------------------------------------
+# Project : PyPlate                                                /          \
+# Filename: test_bench_fix.py                                     |     ()     |
+# Date    : 10/18/2026                                            |            |
+# Author  : cyclopticnerve                                        |   \____/   |
+# License : WTFPLv2                                                \          /
+# ------------------------------------------------------------------------------
+
+# pylint: disable=protected-access
+
+"""
+Benchmarks for the dunder-fix engine in pyplate_base
+
+Each benchmark runs on a synthetic tree from synth.py. Rounds that change the
+tree get a new tree (or the old contents) in their setup, so only the fix
+itself is timed. After timing, the result is checked against the old fixer
+in baseline.py.
+"""
+
+# ------------------------------------------------------------------------------
+# Imports
+# ------------------------------------------------------------------------------
+
+# system imports
+from pathlib import Path
+
+# pip imports
+import pytest
+
+# local imports
+import baseline
+import pyplate_base as B
+import synth
+
+# skip all if no benchmark plugin
+pytest.importorskip("pytest_benchmark")
+
+# ------------------------------------------------------------------------------
+# Globals
+# ------------------------------------------------------------------------------
+
+# rounds for benchmarks that need a setup for each round
+I_ROUNDS = 5
+
+# ------------------------------------------------------------------------------
+# Tests
+# ------------------------------------------------------------------------------
+
+
+# ------------------------------------------------------------------------------
+# Time a full fix of a new tree
+# ------------------------------------------------------------------------------
+def test_do_fix(benchmark, make_fix):
+    """
+    Time a full fix of a new tree
+
+    Args:
+        benchmark: The pytest-benchmark fixture
+        make_fix: The fixture to make trees and PyPlateBase objects
+    """
+
+    # make a new tree and object for each round
+    # NB: keep the last one to check
+    list_last = []
+
+    def _setup():
+        list_last[:] = [make_fix()]
+        return ((list_last[0][0],), {})
+
+    benchmark.pedantic(
+        lambda obj: obj._do_fix(), setup=_setup, rounds=I_ROUNDS
+    )
+
+    # same files as the old fixer
+    obj, dir_twin = list_last[0]
+    _fix_twin(obj, dir_twin)
+    assert not baseline.diff_trees(obj._dir_prj, dir_twin)
+
+
+# ------------------------------------------------------------------------------
+# Time a fix of a tree that has not changed since the last fix
+# ------------------------------------------------------------------------------
+def test_do_fix_unchanged(benchmark, make_fix):
+    """
+    Time a fix of a tree that has not changed since the last fix
+
+    Args:
+        benchmark: The pytest-benchmark fixture
+        make_fix: The fixture to make trees and PyPlateBase objects
+
+    This is the pybaker case, where the manifest lets most files be skipped.
+    """
+
+    # fix once to make the manifest
+    obj, dir_twin = make_fix()
+    obj._do_fix()
+
+    benchmark(obj._do_fix)
+
+    # fixing again changed nothing
+    _fix_twin(obj, dir_twin)
+    assert not baseline.diff_trees(obj._dir_prj, dir_twin)
+
+
+# ------------------------------------------------------------------------------
+# Time fixing the contents of every text file in a tree
+# ------------------------------------------------------------------------------
+def test_fix_contents(benchmark, make_fix):
+    """
+    Time fixing the contents of every text file in a tree
+
+    Args:
+        benchmark: The pytest-benchmark fixture
+        make_fix: The fixture to make trees and PyPlateBase objects
+    """
+
+    # make one tree and keep the original contents
+    obj, dir_twin = make_fix()
+    dict_orig = {
+        path: path.read_bytes()
+        for path in _get_files(obj._dir_prj)
+        if not B.is_binary(path)
+    }
+
+    # put the original contents back before each round
+    def _setup():
+        for path, data in dict_orig.items():
+            path.write_bytes(data)
+
+    # fix each file
+    def _fix_all():
+        for path in dict_orig:
+            obj._fix_contents(path)
+
+    benchmark.pedantic(_fix_all, setup=_setup, rounds=I_ROUNDS)
+
+    # same contents as the old fixer (no blacklist, no renames)
+    baseline.fix_tree(dir_twin, obj._dict_rep, paths=False)
+    assert not baseline.diff_trees(obj._dir_prj, dir_twin)
+
+
+# ------------------------------------------------------------------------------
+# Time renaming every dir/file in a tree
+# ------------------------------------------------------------------------------
+def test_fix_path(benchmark, make_fix):
+    """
+    Time renaming every dir/file in a tree
+
+    Args:
+        benchmark: The pytest-benchmark fixture
+        make_fix: The fixture to make trees and PyPlateBase objects
+    """
+
+    # make a new tree (with no body lines) for each round
+    # NB: keep the last one to check
+    list_last = []
+
+    def _setup():
+        obj, dir_twin = make_fix(num_lines=0)
+        list_last[:] = [(obj, dir_twin)]
+
+        # NB: deepest first, same as _do_fix
+        paths = list(_get_files(obj._dir_prj, dirs=True))
+        paths.sort(key=lambda path: len(path.parts), reverse=True)
+        return ((obj, paths), {})
+
+    # rename each path
+    def _fix_all(obj, paths):
+        for path in paths:
+            obj._fix_path(path)
+
+    benchmark.pedantic(_fix_all, setup=_setup, rounds=I_ROUNDS)
+
+    # same paths as the old fixer (no contents)
+    # NB: the pyplate dir is not renamed, so the blacklist gives the same
+    # paths as _get_files
+    obj, dir_twin = list_last[0]
+    baseline.fix_tree(dir_twin, obj._dict_rep, contents=False)
+    assert not baseline.diff_trees(obj._dir_prj, dir_twin)
+
+
+# ------------------------------------------------------------------------------
+# Time checking every line of the python files in a tree for switches
+# ------------------------------------------------------------------------------
+def test_check_switches(benchmark, make_tree):
+    """
+    Time checking every line of the python files in a tree for switches
+
+    Args:
+        benchmark: The pytest-benchmark fixture
+        make_tree: The fixture to make synthetic trees
+    """
+
+    # get the split lines of all py files
+    # NB: a high switch density, so the slow path is timed too
+    dir_prj = make_tree(switch_density=0.2)
+    rules = B.get_type_rules(Path("file.py"))
+    list_split = []
+    for path in _get_files(dir_prj):
+        if path.suffix == ".py":
+            lines = path.read_text(encoding=B.C.S_ENCODING).splitlines()
+            list_split.extend(_split_line(line, rules) for line in lines)
+
+    # check each line
+    # NB: return the switches after each line, to check below
+    def _check_all(func=B.check_switches, rules=rules):
+        list_res = []
+        dict_sw_block = dict(B.C.D_SWITCH_DEF)
+        for code, comm in list_split:
+            dict_sw_line = dict(dict_sw_block)
+            func(code, comm, rules, dict_sw_block, dict_sw_line)
+            list_res.append((dict(dict_sw_block), dict_sw_line))
+        return list_res
+
+    list_res = benchmark(_check_all)
+
+    # same switches as the old fixer
+    rules_old = baseline.get_type_rules(Path("file.py"))
+    assert list_res == _check_all(baseline.check_switches, rules_old)
+
+
+# ------------------------------------------------------------------------------
+# Time getting the type rules for every file in a tree
+# ------------------------------------------------------------------------------
+def test_get_type_rules(benchmark, make_tree):
+    """
+    Time getting the type rules for every file in a tree
+
+    Args:
+        benchmark: The pytest-benchmark fixture
+        make_tree: The fixture to make synthetic trees
+    """
+
+    # get all the files
+    paths = list(_get_files(make_tree(num_lines=0)))
+
+    # get rules for each file
+    def _get_all():
+        return [B.get_type_rules(path) for path in paths]
+
+    list_rules = benchmark(_get_all)
+
+    # same rules as the old fixer
+    for path, rules in zip(paths, list_rules):
+        assert _uncompile(rules) == baseline.get_type_rules(path)
+
+
+# ------------------------------------------------------------------------------
+# Private functions
+# ------------------------------------------------------------------------------
+
+
+# ------------------------------------------------------------------------------
+# Fix a tree's twin with the old fixer
+# ------------------------------------------------------------------------------
+def _fix_twin(obj, dir_twin):
+    """
+    Fix a tree's twin with the old fixer
+
+    Args:
+        obj: The PyPlateBase that fixed the tree
+        dir_twin: The twin of the tree (see make_fix)
+    """
+
+    # same reps and blacklist as the new fixer
+    baseline.fix_tree(dir_twin, obj._dict_rep, obj._dict_pub_bl)
+
+
+# ------------------------------------------------------------------------------
+# Get type rules as they are in conf.py
+# ------------------------------------------------------------------------------
+def _uncompile(rules):
+    """
+    Get type rules as they are in conf.py
+
+    Args:
+        rules: The rules from get_type_rules
+
+    Returns:
+        A copy of the rules with the patterns as strings, and without the
+        case insensitive switch pattern that get_type_rules adds
+    """
+
+    # get the pattern of each compiled regex
+    return {
+        key: getattr(val, "pattern", val)
+        for key, val in rules.items()
+        if key != B.C.S_KEY_SW_SCH_I
+    }
+
+
+# ------------------------------------------------------------------------------
+# Get the files in a tree, not counting the pyplate dir
+# ------------------------------------------------------------------------------
+def _get_files(dir_prj, dirs=False):
+    """
+    Get the files in a tree, not counting the pyplate dir
+
+    Args:
+        dir_prj: The project dir
+        dirs: Whether to get dirs too (default: False)
+
+    Yields:
+        Each file (and dir) under the project dir
+    """
+
+    # skip the config made by the fix
+    dir_pp = dir_prj / synth.C.S_PRJ_PP_DIR
+    for path in dir_prj.rglob("*"):
+        if dir_pp == path or dir_pp in path.parents:
+            continue
+        if dirs or path.is_file():
+            yield path
+
+
+# ------------------------------------------------------------------------------
+# Split a line into code and comment, the same way _fix_lines does
+# ------------------------------------------------------------------------------
+def _split_line(line, rules):
+    """
+    Split a line into code and comment, the same way _fix_lines does
+
+    Args:
+        line: The line to split
+        rules: The type rules for the line's file
+
+    Returns:
+        A tuple of (code, comm)
+    """
+
+    # assume no comment
+    code = line
+    comm = ""
+
+    # use the last match with a comment
+    split_grp = rules[B.C.S_KEY_SPLIT_COMM]
+    for match in rules[B.C.S_KEY_SPLIT].finditer(line):
+        if match.group(split_grp):
+            split_pos = match.start(split_grp)
+            code = line[:split_pos]
+            comm = line[split_pos:]
+
+    return (code, comm)
+
+
+# -)
@@ -0,0 +1,105 @@
+# ------------------------------------------------------------------------------
+# Project : PyPlate                                                /          \
+# Filename: conftest.py                                           |     ()     |
+# Date    : 10/18/2026                                            |            |
+# Author  : cyclopticnerve                                        |   \____/   |
+# License : WTFPLv2                                                \          /
+# ------------------------------------------------------------------------------
+
+# pylint: disable=protected-access
+
+"""
+Shared fixtures for the unit tests
+
+This module adds the fixture that makes a PyPlateBase ready to fix files in a
+temp project, without running pymaker or pybaker.
+"""
+
+# ------------------------------------------------------------------------------
+# Imports
+# ------------------------------------------------------------------------------
+
+# system imports
+from pathlib import Path
+import sys
+
+# pip imports
+import pytest
+
+# ------------------------------------------------------------------------------
+# Constants
+# ------------------------------------------------------------------------------
+
+# dirs
+P_DIR_PRJ = Path(__file__).parents[2].resolve()
+P_DIR_SRC = P_DIR_PRJ / "src"
+
+# ------------------------------------------------------------------------------
+# local imports
+
+# fudge the path to import src stuff (same as pymaker/pybaker)
+sys.path.append(str(P_DIR_SRC))
+import pyplate_base as B
+
+# ------------------------------------------------------------------------------
+# Globals
+# ------------------------------------------------------------------------------
+
+# the reps used by the tests
+# NB: the same shape as the real reps, with a non-str value that is skipped
+D_REP = {
+    "__PP_NAME_PRJ__": "My Project",
+    "__PP_NAME_PRJ_SMALL__": "my_project",
+    "__PP_VER_MMR__": "1.2.3",
+    "__PP_DATE__": "01/01/2026",
+    "__PP_AUTHOR__": "Some One",
+    "__PP_FLAG__": True,
+}
+
+# ------------------------------------------------------------------------------
+# Fixtures
+# ------------------------------------------------------------------------------
+
+
+# ------------------------------------------------------------------------------
+# Get a function that makes a PyPlateBase ready to fix files
+# ------------------------------------------------------------------------------
+@pytest.fixture
+def make_base(tmp_path, monkeypatch):
+    """
+    Get a function that makes a PyPlateBase ready to fix files
+
+    Args:
+        tmp_path: The pytest temp dir for the test
+        monkeypatch: The pytest monkeypatch fixture
+
+    Returns:
+        A function that takes a rep dict (default: D_REP) and returns a
+        PyPlateBase whose project dir is tmp_path / "prj"
+
+    The cache dir (for the manifest) is moved into the temp dir, so the tests
+    never touch the user's cache.
+    """
+
+    # keep manifests out of the user's cache
+    monkeypatch.setattr(B, "P_DIR_CACHE", tmp_path / "cache")
+
+    # the function to return
+    def _make_base(dict_rep=None):
+
+        # make the project dir
+        dir_prj = tmp_path / "prj"
+        dir_prj.mkdir(exist_ok=True)
+
+        # set up the reps like _fix_dicts does
+        obj = B.PyPlateBase()
+        obj._dir_prj = dir_prj
+        obj._dict_rep = dict(D_REP if dict_rep is None else dict_rep)
+        obj._reps = B.PyPlateReps(obj._dict_rep)
+
+        return obj
+
+    return _make_base
+
+
+# -)
@@ -0,0 +1,85 @@
+# ------------------------------------------------------------------------------
+# Project : PyPlate                                                /          \
+# Filename: test_archive.py                                       |     ()     |
+# Date    : 10/18/2026                                            |            |
+# Author  : cyclopticnerve                                        |   \____/   |
+# License : WTFPLv2                                                \          /
+# ------------------------------------------------------------------------------
+
+"""
+Tests for make_archive
+
+The archive is written to a unique temp file next to it, which is moved into
+place when done, or thrown away if the archive can't be made.
+"""
+
+# ------------------------------------------------------------------------------
+# Imports
+# ------------------------------------------------------------------------------
+
+# system imports
+import tarfile
+
+# pip imports
+import pytest
+
+# local imports
+import pyplate_base as B
+
+# ------------------------------------------------------------------------------
+# Tests
+# ------------------------------------------------------------------------------
+
+
+# ------------------------------------------------------------------------------
+# Check an archive is made with a plain file mode and no temp file left
+# ------------------------------------------------------------------------------
+def test_make_archive(tmp_path):
+    """
+    Check an archive is made with a plain file mode and no temp file left
+
+    Args:
+        tmp_path: The pytest temp dir for the test
+    """
+
+    # a dir to archive
+    dir_in = tmp_path / "in"
+    dir_in.mkdir()
+    (dir_in / "file.txt").write_text("text\n", encoding="utf-8")
+    dir_out = tmp_path / "out"
+    dir_out.mkdir()
+
+    path_out = B.make_archive(dir_out / "arc", B.list_archive(dir_in), "gztar")
+
+    # archive has the file, and is the only thing in the dir
+    with tarfile.open(path_out) as tar:
+        assert "./file.txt" in tar.getnames()
+    assert path_out.stat().st_mode & 0o777 == 0o644
+    assert list(dir_out.iterdir()) == [path_out]
+
+
+# ------------------------------------------------------------------------------
+# Check a failed archive leaves no temp file and keeps the old archive
+# ------------------------------------------------------------------------------
+def test_make_archive_fail(tmp_path):
+    """
+    Check a failed archive leaves no temp file and keeps the old archive
+
+    Args:
+        tmp_path: The pytest temp dir for the test
+    """
+
+    # an old archive
+    path_old = tmp_path / "arc.tar.gz"
+    path_old.write_bytes(b"old")
+
+    # NB: the file is missing, so the archive can't be made
+    list_items = [("./missing.txt", tmp_path / "missing.txt")]
+    with pytest.raises(OSError):
+        B.make_archive(tmp_path / "arc", list_items, "gztar")
+
+    assert list(tmp_path.iterdir()) == [path_old]
+    assert path_old.read_bytes() == b"old"
+
+
+# -)
@@ -0,0 +1,65 @@
+# ------------------------------------------------------------------------------
+# Project : PyPlate                                                /          \
+# Filename: test_copy.py                                          |     ()     |
+# Date    : 10/18/2026                                            |            |
+# Author  : cyclopticnerve                                        |   \____/   |
+# License : WTFPLv2                                                \          /
+# ------------------------------------------------------------------------------
+
+"""
+Tests for copy_file
+
+copy_file tries a reflink first, and falls back to a normal copy. Either way
+the copy must have the same contents, mode and mtime, even on platforms with
+no fcntl.
+"""
+
+# ------------------------------------------------------------------------------
+# Imports
+# ------------------------------------------------------------------------------
+
+# system imports
+import sys
+
+# pip imports
+import pytest
+
+# local imports
+import pyplate_base as B
+
+# ------------------------------------------------------------------------------
+# Tests
+# ------------------------------------------------------------------------------
+
+
+# ------------------------------------------------------------------------------
+# Check a copy has the same contents, mode and mtime
+# ------------------------------------------------------------------------------
+@pytest.mark.parametrize("has_fcntl", [True, False])
+def test_copy_file(tmp_path, monkeypatch, has_fcntl):
+    """
+    Check a copy has the same contents, mode and mtime
+
+    Args:
+        tmp_path: The pytest temp dir for the test
+        monkeypatch: The pytest monkeypatch fixture
+        has_fcntl: Whether fcntl can be imported
+    """
+
+    # NB: None in sys.modules makes the import fail
+    if not has_fcntl:
+        monkeypatch.setitem(sys.modules, "fcntl", None)
+
+    src = tmp_path / "src.py"
+    src.write_bytes(b"x = 1\n" * 1000)
+    src.chmod(0o751)
+    dst = tmp_path / "dst.py"
+
+    B.copy_file(src, dst)
+
+    assert dst.read_bytes() == src.read_bytes()
+    assert dst.stat().st_mode == src.stat().st_mode
+    assert dst.stat().st_mtime_ns == src.stat().st_mtime_ns
+
+
+# -)
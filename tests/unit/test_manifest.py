@@ -0,0 +1,269 @@
+# ------------------------------------------------------------------------------
+# Project : PyPlate                                                /          \
+# Filename: test_manifest.py                                      |     ()     |
+# Date    : 10/18/2026                                            |            |
+# Author  : cyclopticnerve                                        |   \____/   |
+# License : WTFPLv2                                                \          /
+# ------------------------------------------------------------------------------
+
+# pylint: disable=protected-access
+
+"""
+Tests for the fix manifest
+
+_fix_file skips a file only if it has the same contents and was fixed with
+the same reps and blacklist flags as the last fix. These tests count the
+calls to _fix_contents to see which files were fixed again.
+"""
+
+# ------------------------------------------------------------------------------
+# Imports
+# ------------------------------------------------------------------------------
+
+# system imports
+import os
+
+# pip imports
+import pytest
+
+# local imports
+import pyplate_base as B
+
+# ------------------------------------------------------------------------------
+# Globals
+# ------------------------------------------------------------------------------
+
+# the file to fix
+S_FILE = "file.txt"
+S_TEXT = "name = __PP_NAME_PRJ__\n"
+
+# ------------------------------------------------------------------------------
+# Fixtures
+# ------------------------------------------------------------------------------
+
+
+# ------------------------------------------------------------------------------
+# Make a base that counts its fixes, and a file it has already fixed
+# ------------------------------------------------------------------------------
+@pytest.fixture
+def fixed(make_base, monkeypatch):
+    """
+    Make a base that counts its fixes, and a file it has already fixed
+
+    Args:
+        make_base: The fixture to make PyPlateBase objects
+        monkeypatch: The pytest monkeypatch fixture
+
+    Returns:
+        A tuple of (obj, path, entry, list_fixed), where entry is the
+        manifest entry after the first fix, and list_fixed gets the path of
+        each file _fix_contents is called for after that
+    """
+
+    # make the base and the file
+    obj = make_base()
+    path = obj._dir_prj / S_FILE
+    path.write_text(S_TEXT, encoding=B.C.S_ENCODING)
+
+    # first fix
+    entry = obj._fix_file(path, False, False, None, obj._get_reps_hash())
+
+    # count the fixes from now on
+    list_fixed = []
+    fix_contents = obj._fix_contents
+
+    def _fix_contents(path, bl_hdr=False, bl_code=False):
+        list_fixed.append(path)
+        fix_contents(path, bl_hdr, bl_code)
+
+    monkeypatch.setattr(obj, "_fix_contents", _fix_contents)
+
+    return (obj, path, entry, list_fixed)
+
+
+# ------------------------------------------------------------------------------
+# Tests
+# ------------------------------------------------------------------------------
+
+
+# ------------------------------------------------------------------------------
+# Check the first fix fixes the file and records its state
+# ------------------------------------------------------------------------------
+def test_first_fix(fixed):
+    """
+    Check the first fix fixes the file and records its state
+
+    Args:
+        fixed: The fixture with a file that has been fixed once
+    """
+
+    _obj, path, entry, _list_fixed = fixed
+    stat = path.stat()
+
+    assert path.read_text(encoding=B.C.S_ENCODING) == "name = My Project\n"
+    assert entry[B.C.S_KEY_MAN_MTIME] == stat.st_mtime_ns
+    assert entry[B.C.S_KEY_MAN_SIZE] == stat.st_size
+
+
+# ------------------------------------------------------------------------------
+# Check an unchanged file is skipped
+# ------------------------------------------------------------------------------
+def test_unchanged(fixed):
+    """
+    Check an unchanged file is skipped
+
+    Args:
+        fixed: The fixture with a file that has been fixed once
+    """
+
+    obj, path, entry, list_fixed = fixed
+
+    entry_new = obj._fix_file(path, False, False, entry, obj._get_reps_hash())
+
+    assert not list_fixed
+    assert entry_new == entry
+
+
+# ------------------------------------------------------------------------------
+# Check a change in reps fixes the file again
+# ------------------------------------------------------------------------------
+def test_reps_changed(fixed):
+    """
+    Check a change in reps fixes the file again
+
+    Args:
+        fixed: The fixture with a file that has been fixed once
+    """
+
+    obj, path, entry, list_fixed = fixed
+
+    # new reps, new hash
+    obj._dict_rep["__PP_VER_MMR__"] = "9.9.9"
+    obj._reps = B.PyPlateReps(obj._dict_rep)
+    str_reps = obj._get_reps_hash()
+    assert not entry[B.C.S_KEY_MAN_REPS].startswith(str_reps)
+
+    obj._fix_file(path, False, False, entry, str_reps)
+
+    assert list_fixed == [path]
+
+
+# ------------------------------------------------------------------------------
+# Check a change in blacklist flags fixes the file again
+# ------------------------------------------------------------------------------
+@pytest.mark.parametrize("bl_hdr, bl_code", [(True, False), (False, True)])
+def test_flags_changed(fixed, bl_hdr, bl_code):
+    """
+    Check a change in blacklist flags fixes the file again
+
+    Args:
+        fixed: The fixture with a file that has been fixed once
+        bl_hdr: Whether the file is blacklisted for header lines
+        bl_code: Whether the file is blacklisted for code lines
+    """
+
+    obj, path, entry, list_fixed = fixed
+
+    obj._fix_file(path, bl_hdr, bl_code, entry, obj._get_reps_hash())
+
+    assert list_fixed == [path]
+
+
+# ------------------------------------------------------------------------------
+# Check a change in size fixes the file again
+# ------------------------------------------------------------------------------
+def test_size_changed(fixed):
+    """
+    Check a change in size fixes the file again
+
+    Args:
+        fixed: The fixture with a file that has been fixed once
+    """
+
+    obj, path, entry, list_fixed = fixed
+
+    # add a dunder (new size and mtime)
+    with open(path, "a", encoding=B.C.S_ENCODING) as a_file:
+        a_file.write("ver = __PP_VER_MMR__\n")
+
+    entry_new = obj._fix_file(path, False, False, entry, obj._get_reps_hash())
+
+    assert list_fixed == [path]
+    assert "ver = 1.2.3\n" in path.read_text(encoding=B.C.S_ENCODING)
+    assert entry_new[B.C.S_KEY_MAN_SIZE] == path.stat().st_size
+
+
+# ------------------------------------------------------------------------------
+# Check a change in mtime only (same contents) does not fix the file again
+# ------------------------------------------------------------------------------
+def test_mtime_changed(fixed):
+    """
+    Check a change in mtime only (same contents) does not fix the file again
+
+    Args:
+        fixed: The fixture with a file that has been fixed once
+
+    The contents are hashed, and since the hash is the same, the file is
+    skipped but the entry gets the new mtime.
+    """
+
+    obj, path, entry, list_fixed = fixed
+
+    # touch the file
+    mtime = entry[B.C.S_KEY_MAN_MTIME] + 1_000_000_000
+    os.utime(path, ns=(mtime, mtime))
+
+    entry_new = obj._fix_file(path, False, False, entry, obj._get_reps_hash())
+
+    assert not list_fixed
+    assert entry_new[B.C.S_KEY_MAN_MTIME] == mtime
+    assert entry_new[B.C.S_KEY_MAN_HASH] == entry[B.C.S_KEY_MAN_HASH]
+
+
+# ------------------------------------------------------------------------------
+# Check new contents of the same size fix the file again
+# ------------------------------------------------------------------------------
+def test_contents_changed(fixed):
+    """
+    Check new contents of the same size fix the file again
+
+    Args:
+        fixed: The fixture with a file that has been fixed once
+    """
+
+    obj, path, entry, list_fixed = fixed
+
+    # same size, new contents, new mtime
+    text = path.read_text(encoding=B.C.S_ENCODING).replace("My", "Yo")
+    path.write_text(text, encoding=B.C.S_ENCODING)
+    mtime = entry[B.C.S_KEY_MAN_MTIME] + 1_000_000_000
+    os.utime(path, ns=(mtime, mtime))
+    assert path.stat().st_size == entry[B.C.S_KEY_MAN_SIZE]
+
+    obj._fix_file(path, False, False, entry, obj._get_reps_hash())
+
+    assert list_fixed == [path]
+
+
+# ------------------------------------------------------------------------------
+# Check the manifest is saved in the cache, not the project
+# ------------------------------------------------------------------------------
+def test_save_load(fixed):
+    """
+    Check the manifest is saved in the cache, not the project
+
+    Args:
+        fixed: The fixture with a file that has been fixed once
+    """
+
+    obj, _path, entry, _list_fixed = fixed
+
+    obj._save_manifest({S_FILE: entry})
+
+    path_man = B.get_cache_dir(obj._dir_prj) / B.C.S_FILE_MANIFEST
+    assert path_man.is_file()
+    assert obj._dir_prj not in path_man.parents
+    assert obj._load_manifest() == {S_FILE: entry}
+
+
+# -)
@@ -0,0 +1,154 @@
+# ------------------------------------------------------------------------------
+# Project : PyPlate                                                /          \
+# Filename: test_needs_fix.py                                     |     ()     |
+# Date    : 10/18/2026                                            |            |
+# Author  : cyclopticnerve                                        |   \____/   |
+# License : WTFPLv2                                                \          /
+# ------------------------------------------------------------------------------
+
+# pylint: disable=protected-access
+
+"""
+Tests for the fix prefilter
+
+_needs_fix lets lines and files skip all regex work. It may say True for text
+the fixers would not change, but must never say False for text they would.
+"""
+
+# ------------------------------------------------------------------------------
+# Imports
+# ------------------------------------------------------------------------------
+
+# system imports
+from pathlib import Path
+
+# pip imports
+import pytest
+
+# local imports
+import pyplate_base as B
+
+# ------------------------------------------------------------------------------
+# Globals
+# ------------------------------------------------------------------------------
+
+# lines that must be fixed
+L_NEEDS = [
+    # header with a dunder
+    "# Project : __PP_NAME_PRJ__              /  \\\n",
+    # header with a tab in the pad (turned into spaces)
+    "# Project : Name\t\t/  \\\n",
+    # switch markers, block and trailing
+    "# pyplate: replace=false\n",
+    "x = 1  # pyplate: replace=true\n",
+    # dunder in code
+    "x = '__PP_VER_MMR__'\n",
+    # no final newline (a header adds one)
+    "# Project : Name   /  \\",
+    "x = 1",
+    # non-ascii
+    "# Author  : Zoë    /  \\\n",
+    "x = 'ü'\n",
+]
+
+# lines that can skip the fixers
+L_CLEAN = [
+    "# Project : Name              /  \\\n",
+    "x = compute(y, 'text')\n",
+    "\n",
+]
+
+# ------------------------------------------------------------------------------
+# Tests
+# ------------------------------------------------------------------------------
+
+
+# ------------------------------------------------------------------------------
+# Check lines that need fixing are not skipped
+# ------------------------------------------------------------------------------
+@pytest.mark.parametrize("line", L_NEEDS)
+def test_needs_fix(make_base, line):
+    """
+    Check lines that need fixing are not skipped
+
+    Args:
+        make_base: The fixture to make PyPlateBase objects
+        line: The line to check
+    """
+
+    obj = make_base()
+    assert obj._needs_fix(line)
+
+    # NB: a file with the line in it too
+    assert obj._needs_fix(f"x = 1\n{line}")
+
+
+# ------------------------------------------------------------------------------
+# Check clean lines are skipped, and the fixers would not change them
+# ------------------------------------------------------------------------------
+@pytest.mark.parametrize("line", L_CLEAN)
+def test_clean(make_base, line):
+    """
+    Check clean lines are skipped, and the fixers would not change them
+
+    Args:
+        make_base: The fixture to make PyPlateBase objects
+        line: The line to check
+    """
+
+    obj = make_base()
+    assert not obj._needs_fix(line)
+    assert _fix_line(obj, line) == line
+
+
+# ------------------------------------------------------------------------------
+# Check every line the fixers would change is not skipped
+# ------------------------------------------------------------------------------
+@pytest.mark.parametrize("line", L_NEEDS + L_CLEAN)
+def test_never_misses(make_base, line):
+    """
+    Check every line the fixers would change is not skipped
+
+    Args:
+        make_base: The fixture to make PyPlateBase objects
+        line: The line to check
+    """
+
+    obj = make_base()
+    if _fix_line(obj, line) != line:
+        assert obj._needs_fix(line)
+
+
+# ------------------------------------------------------------------------------
+# Private functions
+# ------------------------------------------------------------------------------
+
+
+# ------------------------------------------------------------------------------
+# Fix one line of a python file without the prefilter
+# ------------------------------------------------------------------------------
+def _fix_line(obj, line):
+    """
+    Fix one line of a python file without the prefilter
+
+    Args:
+        obj: The PyPlateBase to fix with
+        line: The line to fix
+
+    Returns:
+        The fixed line
+    """
+
+    # turn off the prefilter for this object
+    obj._needs_fix = lambda _text: True
+
+    # fix the line as a python file
+    rules = B.get_type_rules(Path("file.py"))
+    res = "".join(obj._fix_lines([line], rules, False, False))
+
+    # put the prefilter back
+    del obj._needs_fix
+    return res
+
+
+# -)
@@ -0,0 +1,119 @@
+# ------------------------------------------------------------------------------
+# Project : PyPlate                                                /          \
+# Filename: test_pack.py                                          |     ()     |
+# Date    : 10/18/2026                                            |            |
+# Author  : cyclopticnerve                                        |   \____/   |
+# License : WTFPLv2                                                \          /
+# ------------------------------------------------------------------------------
+
+# pylint: disable=protected-access
+
+"""
+Tests for PyPlatePack
+
+A pack keeps its file open from when it is loaded until it is closed. After
+it is closed, no files are packed, so callers copy them from their sources.
+"""
+
+# ------------------------------------------------------------------------------
+# Imports
+# ------------------------------------------------------------------------------
+
+# pip imports
+import pytest
+
+# local imports
+import pyplate_base as B
+
+# ------------------------------------------------------------------------------
+# Fixtures
+# ------------------------------------------------------------------------------
+
+
+# ------------------------------------------------------------------------------
+# Make some files to pack
+# ------------------------------------------------------------------------------
+@pytest.fixture
+def list_src(tmp_path):
+    """
+    Make some files to pack
+
+    Args:
+        tmp_path: The pytest temp dir for the test
+
+    Returns:
+        The list of files
+    """
+
+    list_files = []
+    for index in range(3):
+        path = tmp_path / f"file{index}.txt"
+        path.write_text(f"file {index}\n" * (index + 1), encoding="utf-8")
+        list_files.append(path)
+
+    return list_files
+
+
+# ------------------------------------------------------------------------------
+# Tests
+# ------------------------------------------------------------------------------
+
+
+# ------------------------------------------------------------------------------
+# Check a with block closes the pack
+# ------------------------------------------------------------------------------
+@pytest.mark.parametrize("built", [True, False])
+def test_with(tmp_path, list_src, built):
+    """
+    Check a with block closes the pack
+
+    Args:
+        tmp_path: The pytest temp dir for the test
+        list_src: The fixture with files to pack
+        built: Whether the pack is built (True) or loaded from disk (False)
+    """
+
+    path_pack = tmp_path / "test.pack"
+
+    # build the pack first to load it
+    if not built:
+        with B.PyPlatePack(path_pack, list_src):
+            pass
+
+    # read while open
+    with B.PyPlatePack(path_pack, list_src) as pack:
+        a_file = pack._file_pack
+        assert pack.read(list_src[1]) == list_src[1].read_bytes()
+
+    # file closed, nothing packed
+    assert a_file.closed
+    assert pack._file_pack is None
+    assert pack.get_entry(list_src[1]) is None
+    assert pack.read(list_src[1]) is None
+
+
+# ------------------------------------------------------------------------------
+# Check a closed pack copies every file from its source
+# ------------------------------------------------------------------------------
+def test_closed(tmp_path, list_src):
+    """
+    Check a closed pack copies every file from its source
+
+    Args:
+        tmp_path: The pytest temp dir for the test
+        list_src: The fixture with files to pack
+    """
+
+    pack = B.PyPlatePack(tmp_path / "test.pack", list_src)
+    pack.close()
+
+    # NB: closing again does nothing
+    pack.close()
+
+    # every file is left for the caller to copy
+    dict_files = {tmp_path / f"dst{i}": src for i, src in enumerate(list_src)}
+    assert pack.copy_all(dict(dict_files)) == dict_files
+    assert [item[3] for item in pack.read_plan(dict_files)] == [None] * 3
+
+
+# -)
@@ -0,0 +1,184 @@
+# ------------------------------------------------------------------------------
+# Project : PyPlate                                                /          \
+# Filename: test_reps.py                                          |     ()     |
+# Date    : 10/18/2026                                            |            |
+# Author  : cyclopticnerve                                        |   \____/   |
+# License : WTFPLv2                                                \          /
+# ------------------------------------------------------------------------------
+
+"""
+Tests for PyPlateReps
+
+PyPlateReps.replace must always give the same result as calling str.replace
+for each key in dict order, which is what the fixers did before it.
+"""
+
+# ------------------------------------------------------------------------------
+# Imports
+# ------------------------------------------------------------------------------
+
+# system imports
+import random
+
+# pip imports
+import pytest
+
+# local imports
+import pyplate_base as B
+
+# ------------------------------------------------------------------------------
+# Globals
+# ------------------------------------------------------------------------------
+
+# reps like the real ones, with a non-str value that is skipped
+D_REP = {
+    "__PP_NAME_PRJ__": "My Project",
+    "__PP_NAME_PRJ_SMALL__": "my_project",
+    "__PP_VER_MMR__": "1.2.3",
+    "__PP_FLAG__": True,
+}
+
+# reps where one key is inside another, so the order matters
+D_REP_OVERLAP = {
+    "__PP_NAME__": "a",
+    "__PP_NAME_BIG__": "b",
+    "NAME": "c",
+}
+
+# reps where a replacement makes a new key
+# NB: "__PP_A__" makes "__PP_B__" (replaced later), "__PP_C__" makes
+# "__PP_A__" (already replaced, so left alone)
+D_REP_CHAIN = {
+    "__PP_A__": "__PP_B__",
+    "__PP_B__": "bee",
+    "__PP_C__": "__PP_A__",
+    "__PP_D__": "__PP_",
+    "__PP_E__": "D__",
+}
+
+# strings to try with each rep dict
+L_TEXT = [
+    "",
+    "no dunders here\n",
+    "__PP_NAME_PRJ__",
+    "x = '__PP_NAME_PRJ__' + '__PP_NAME_PRJ_SMALL__'\n",
+    "__PP_NAME_PRJ____PP_VER_MMR__",
+    "__PP___PP_NAME_PRJ____",
+    "__PP_FLAG__ stays, it is not a str\n",
+    "__PP_NAME_BIG__ and __PP_NAME__ and NAME\n",
+    "__PP_A__ __PP_B__ __PP_C__\n",
+    "__PP_C____PP_A__",
+    "__PP_D____PP_E__",
+    "__PP___PP_D__E__",
+]
+
+# number of random strings for the fuzz test
+I_FUZZ = 2000
+
+# ------------------------------------------------------------------------------
+# Tests
+# ------------------------------------------------------------------------------
+
+
+# ------------------------------------------------------------------------------
+# Check replace against the ordered replace
+# ------------------------------------------------------------------------------
+@pytest.mark.parametrize("dict_rep", [D_REP, D_REP_OVERLAP, D_REP_CHAIN])
+@pytest.mark.parametrize("text", L_TEXT)
+def test_replace(dict_rep, text):
+    """
+    Check replace against the ordered replace
+
+    Args:
+        dict_rep: The reps to use
+        text: The string to replace dunders in
+    """
+
+    reps = B.PyPlateReps(dict_rep)
+    assert reps.replace(text) == _replace_ordered(text, dict_rep)
+
+
+# ------------------------------------------------------------------------------
+# Check replace against the ordered replace for random strings
+# ------------------------------------------------------------------------------
+@pytest.mark.parametrize("dict_rep", [D_REP, D_REP_OVERLAP, D_REP_CHAIN])
+def test_replace_fuzz(dict_rep):
+    """
+    Check replace against the ordered replace for random strings
+
+    Args:
+        dict_rep: The reps to use
+
+    The strings are made of pieces of the keys and values, so dunders are
+    often next to each other, split up, or inside each other.
+    """
+
+    # same seed, same strings
+    rand = random.Random(0)
+    pieces = [
+        *dict_rep,
+        *(val for val in dict_rep.values() if isinstance(val, str)),
+        "__",
+        "_",
+        "PP",
+        "__PP_",
+        " ",
+        "\n",
+    ]
+
+    # check each string
+    reps = B.PyPlateReps(dict_rep)
+    for _ in range(I_FUZZ):
+        text = "".join(rand.choices(pieces, k=rand.randint(1, 8)))
+        assert reps.replace(text) == _replace_ordered(text, dict_rep), text
+
+
+# ------------------------------------------------------------------------------
+# Check might_match never misses a string that replace would change
+# ------------------------------------------------------------------------------
+@pytest.mark.parametrize("dict_rep", [D_REP, D_REP_OVERLAP, D_REP_CHAIN, {}])
+@pytest.mark.parametrize("text", L_TEXT)
+def test_might_match(dict_rep, text):
+    """
+    Check might_match never misses a string that replace would change
+
+    Args:
+        dict_rep: The reps to use
+        text: The string to check
+    """
+
+    reps = B.PyPlateReps(dict_rep)
+    if not reps.might_match(text):
+        assert reps.replace(text) == text
+
+
+# ------------------------------------------------------------------------------
+# Private functions
+# ------------------------------------------------------------------------------
+
+
+# ------------------------------------------------------------------------------
+# Replace dunders in a string, one key at a time
+# ------------------------------------------------------------------------------
+def _replace_ordered(text, dict_rep):
+    """
+    Replace dunders in a string, one key at a time
+
+    Args:
+        text: The string to replace dunders in
+        dict_rep: The reps to use
+
+    Returns:
+        The string with all dunders replaced, the same way the fixers did
+        before PyPlateReps
+    """
+
+    # replace each key in dict order
+    for key, val in dict_rep.items():
+        if isinstance(val, str):
+            text = text.replace(key, val)
+
+    return text
+
+
+# -)
@@ -0,0 +1,174 @@
+# ------------------------------------------------------------------------------
+# Project : PyPlate                                                /          \
+# Filename: test_stream.py                                        |     ()     |
+# Date    : 10/18/2026                                            |            |
+# Author  : cyclopticnerve                                        |   \____/   |
+# License : WTFPLv2                                                \          /
+# ------------------------------------------------------------------------------
+
+# pylint: disable=protected-access
+
+"""
+Tests for the streaming fixer
+
+Files bigger than C.I_STREAM_SIZE are fixed line by line into a temp file by
+stream_if_changed. The result must be the same as fixing the file in memory
+with write_if_changed.
+"""
+
+# ------------------------------------------------------------------------------
+# Imports
+# ------------------------------------------------------------------------------
+
+# pip imports
+import pytest
+
+# local imports
+import pyplate_base as B
+
+# ------------------------------------------------------------------------------
+# Globals
+# ------------------------------------------------------------------------------
+
+# the files to fix, by name
+# NB: names pick the type rules (.py has header/split/switch rules, .md only
+# has header rules, .txt has no rules)
+D_FILES = {
+    "hdr.py": (
+        "# Project : __PP_NAME_PRJ__                /  \\\n"
+        "# Version : __PP_VER_MMR__                 \\__/\n"
+        "\n"
+        "name = '__PP_NAME_PRJ__'  # __PP_NAME_PRJ_SMALL__\n"
+    ),
+    "switch.py": (
+        "a = '__PP_NAME_PRJ__'\n"
+        "# pyplate: replace=false\n"
+        "b = '__PP_NAME_PRJ__'\n"
+        "c = '__PP_NAME_PRJ__'  # pyplate: replace=true\n"
+        "# pyplate: replace=true\n"
+        "d = '__PP_NAME_PRJ__'  # pyplate: replace=false\n"
+        "e = '__PP_NAME_PRJ__'\n"
+    ),
+    "odd.py": (
+        "# Author  : __PP_AUTHOR__\t\t   ü\n"
+        "x = 'ünïcode __PP_DATE__'\n"
+        "y = 'no newline __PP_VER_MMR__'"
+    ),
+    "crlf.py": "a = '__PP_NAME_PRJ__'\r\nb = 1\r\n",
+    "clean.py": "# no dunders here\nx = 1\n",
+    "doc.md": (
+        "<!-- Project : __PP_NAME_PRJ__     / -->\n"
+        "\n"
+        "Made by __PP_AUTHOR__ on __PP_DATE__\n"
+    ),
+    "plain.txt": "__PP_NAME_PRJ__\n\n__PP_VER_MMR__ and __PP_FLAG__",
+}
+
+# ------------------------------------------------------------------------------
+# Tests
+# ------------------------------------------------------------------------------
+
+
+# ------------------------------------------------------------------------------
+# Check a streamed fix gives the same file as an in-memory fix
+# ------------------------------------------------------------------------------
+@pytest.mark.parametrize("name", list(D_FILES))
+@pytest.mark.parametrize("bl_hdr, bl_code", [(False, False), (True, True)])
+def test_stream_same(make_base, monkeypatch, name, bl_hdr, bl_code):
+    """
+    Check a streamed fix gives the same file as an in-memory fix
+
+    Args:
+        make_base: The fixture to make PyPlateBase objects
+        monkeypatch: The pytest monkeypatch fixture
+        name: The name of the file in D_FILES
+        bl_hdr: Whether the file is blacklisted for header lines
+        bl_code: Whether the file is blacklisted for code lines
+    """
+
+    # make two copies of the file
+    obj = make_base()
+    path_mem = obj._dir_prj / "mem" / name
+    path_str = obj._dir_prj / "str" / name
+    for path in [path_mem, path_str]:
+        path.parent.mkdir()
+        path.write_bytes(D_FILES[name].encode(B.C.S_ENCODING))
+
+    # fix in memory
+    res_mem = _count_writes(
+        monkeypatch, lambda: obj._fix_contents(path_mem, bl_hdr, bl_code)
+    )
+
+    # fix streamed (every file is bigger than 0)
+    monkeypatch.setattr(B.C, "I_STREAM_SIZE", 0)
+    res_str = _count_writes(
+        monkeypatch, lambda: obj._fix_contents(path_str, bl_hdr, bl_code)
+    )
+
+    # same contents, and both wrote (or skipped)
+    assert path_str.read_bytes() == path_mem.read_bytes()
+    assert res_str == res_mem
+
+    # NB: make sure there was something to fix
+    if not bl_code and name != "clean.py":
+        assert res_mem == (1, 0)
+
+
+# ------------------------------------------------------------------------------
+# Check a streamed fix of a clean file does not write it
+# ------------------------------------------------------------------------------
+def test_stream_unchanged(make_base, monkeypatch):
+    """
+    Check a streamed fix of a clean file does not write it
+
+    Args:
+        make_base: The fixture to make PyPlateBase objects
+        monkeypatch: The pytest monkeypatch fixture
+    """
+
+    # make a clean file
+    obj = make_base()
+    path = obj._dir_prj / "clean.py"
+    path.write_text(D_FILES["clean.py"], encoding=B.C.S_ENCODING)
+    mtime = path.stat().st_mtime_ns
+
+    # fix streamed
+    monkeypatch.setattr(B.C, "I_STREAM_SIZE", 0)
+    res = _count_writes(monkeypatch, lambda: obj._fix_contents(path))
+
+    # no write, no temp files left
+    assert res == (0, 1)
+    assert path.stat().st_mtime_ns == mtime
+    assert [item.name for item in obj._dir_prj.iterdir()] == ["clean.py"]
+
+
+# ------------------------------------------------------------------------------
+# Private functions
+# ------------------------------------------------------------------------------
+
+
+# ------------------------------------------------------------------------------
+# Count the files written and skipped by a fix
+# ------------------------------------------------------------------------------
+def _count_writes(monkeypatch, func):
+    """
+    Count the files written and skipped by a fix
+
+    Args:
+        monkeypatch: The pytest monkeypatch fixture
+        func: The function that does the fix
+
+    Returns:
+        A tuple of (written, skipped)
+    """
+
+    # start from zero
+    monkeypatch.setattr(B.C, "I_FILES_WRITTEN", 0)
+    monkeypatch.setattr(B.C, "I_FILES_SKIPPED", 0)
+
+    func()
+
+    return (B.C.I_FILES_WRITTEN, B.C.I_FILES_SKIPPED)
+
+
+# -)
@@ -0,0 +1,160 @@
+# ------------------------------------------------------------------------------
+# Project : PyPlate                                                /          \
+# Filename: test_write.py                                         |     ()     |
+# Date    : 10/18/2026                                            |            |
+# Author  : cyclopticnerve                                        |   \____/   |
+# License : WTFPLv2                                                \          /
+# ------------------------------------------------------------------------------
+
+"""
+Tests for writing fixed files
+
+write_if_changed and stream_if_changed replace a file with a temp file. A
+symlink must stay a symlink (with the real file fixed), and a file with hard
+links must stay the same file, so all its links see the new contents.
+"""
+
+# ------------------------------------------------------------------------------
+# Imports
+# ------------------------------------------------------------------------------
+
+# system imports
+import os
+
+# pip imports
+import pytest
+
+# local imports
+import pyplate_base as B
+
+# ------------------------------------------------------------------------------
+# Globals
+# ------------------------------------------------------------------------------
+
+# the old and new text of the file
+S_OLD = "name = __PP_NAME_PRJ__\n"
+S_NEW = "name = My Project\n"
+
+# ------------------------------------------------------------------------------
+# Fixtures
+# ------------------------------------------------------------------------------
+
+
+# ------------------------------------------------------------------------------
+# Get a function that writes a file either way
+# ------------------------------------------------------------------------------
+@pytest.fixture(params=["write", "stream"])
+def write(request):
+    """
+    Get a function that writes a file either way
+
+    Args:
+        request: The pytest request for the param
+
+    Returns:
+        A function that takes a path and writes S_NEW to it, using
+        write_if_changed or stream_if_changed
+    """
+
+    # in memory
+    if request.param == "write":
+        return lambda path: B.write_if_changed(path, S_NEW)
+
+    # streamed
+    def _fix_lines(lines):
+        for line in lines:
+            yield line.replace("__PP_NAME_PRJ__", "My Project")
+
+    return lambda path: B.stream_if_changed(path, _fix_lines)
+
+
+# ------------------------------------------------------------------------------
+# Tests
+# ------------------------------------------------------------------------------
+
+
+# ------------------------------------------------------------------------------
+# Check a plain file is written with its old permissions
+# ------------------------------------------------------------------------------
+def test_write_plain(tmp_path, write):
+    """
+    Check a plain file is written with its old permissions
+
+    Args:
+        tmp_path: The pytest temp dir for the test
+        write: The fixture to write a file
+    """
+
+    path = tmp_path / "file.py"
+    path.write_text(S_OLD, encoding=B.C.S_ENCODING)
+    path.chmod(0o754)
+
+    assert write(path)
+
+    assert path.read_text(encoding=B.C.S_ENCODING) == S_NEW
+    assert path.stat().st_mode & 0o777 == 0o754
+    assert [item.name for item in tmp_path.iterdir()] == ["file.py"]
+
+
+# ------------------------------------------------------------------------------
+# Check writing through a symlink fixes the real file and keeps the link
+# ------------------------------------------------------------------------------
+def test_write_symlink(tmp_path, write):
+    """
+    Check writing through a symlink fixes the real file and keeps the link
+
+    Args:
+        tmp_path: The pytest temp dir for the test
+        write: The fixture to write a file
+    """
+
+    # real file in another dir, link to it
+    (tmp_path / "real").mkdir()
+    (tmp_path / "prj").mkdir()
+    path_real = tmp_path / "real" / "file.py"
+    path_real.write_text(S_OLD, encoding=B.C.S_ENCODING)
+    path_link = tmp_path / "prj" / "file.py"
+    path_link.symlink_to(path_real)
+
+    assert write(path_link)
+
+    assert path_link.is_symlink()
+    assert path_link.resolve() == path_real.resolve()
+    assert path_real.read_text(encoding=B.C.S_ENCODING) == S_NEW
+
+    # no temp files left in either dir
+    assert [item.name for item in path_real.parent.iterdir()] == ["file.py"]
+    assert [item.name for item in path_link.parent.iterdir()] == ["file.py"]
+
+
+# ------------------------------------------------------------------------------
+# Check writing a hard linked file keeps it the same file
+# ------------------------------------------------------------------------------
+def test_write_hardlink(tmp_path, write):
+    """
+    Check writing a hard linked file keeps it the same file
+
+    Args:
+        tmp_path: The pytest temp dir for the test
+        write: The fixture to write a file
+    """
+
+    path = tmp_path / "file.py"
+    path.write_text(S_OLD, encoding=B.C.S_ENCODING)
+    path_other = tmp_path / "other.py"
+    os.link(path, path_other)
+    ino = path.stat().st_ino
+
+    assert write(path)
+
+    # same inode, both names see the new text
+    assert path.stat().st_ino == ino
+    assert path.stat().st_nlink == 2
+    assert path_other.read_text(encoding=B.C.S_ENCODING) == S_NEW
+    assert sorted(item.name for item in tmp_path.iterdir()) == [
+        "file.py",
+        "other.py",
+    ]
+
+
+# -)